@@ -5,15 +5,33 @@
 #name2    - Yoav Malichi
 
 
+import heapq
+import random
+import weakref
+from itertools import islice
+from operator import attrgetter
+
+
 """A class representing a node in an AVL tree"""
 
 
 class AVLNode(object):
 	"""Constructor, you are allowed to add more fields.
+	The fields are declared in __slots__ so a node carries no per-instance __dict__,
+	which keeps the memory footprint of every element of the list small.
+	The fields that only some lists use (the aggregate and the owner) are slots of AVLExtendedNode, and read
+	as None on an AVLNode.
 
 	@type value: str
 	@param value: data of your node
 	"""
+	__slots__ = ('value', 'left', 'right', 'parent', 'size', 'height', 'lazy')
+
+	# the aggregate of the subtree of self [see AVLExtendedNode]
+	agg = None
+	# the owner token of the list that may modify self in place [see AVLExtendedNode]
+	owner = None
+
 	def __init__(self, value):
 		self.value = value
 		self.left = None
@@ -21,6 +39,9 @@ class AVLNode(object):
 		self.parent = None
 		self.size = 0
 		self.height = -1
+		# the pending reversal and range update of the subtrees of the sons of self, None if there are none:
+		# a tuple (flip, assign, delta, aggregator) [see flipSubtree, applyTag and pushDown]
+		self.lazy = None
 
 
 	"""returns the left child
@@ -100,6 +121,87 @@ class AVLNode(object):
 		if self.isRealNode():
 			self.size = self.left.size + 1 + self.right.size
 
+	"""reverses the subtree of self lazily
+	The sons of self are swapped now, and the reversal of their subtrees is left pending in self.lazy.
+	If the aggregate of the list depends on the order of the values, the aggregate of self is flipped now too,
+	and the aggregator is kept in self.lazy so that the sons are flipped with it [see AVLAggregate.reversible]
+
+	@type aggregator: AVLAggregate
+	@param aggregator: the aggregator of the list, None if it has none
+	@Time complexity: O(1)
+	"""
+	def flipSubtree(self, aggregator=None):
+		self.left, self.right = self.right, self.left
+		lazy = self.lazy
+		if aggregator is None or aggregator.flip is None:
+			if lazy is None:
+				self.lazy = FLIP
+			elif lazy is FLIP:
+				self.lazy = None
+			else:
+				self.lazy = (not lazy[0],) + lazy[1:]
+			return
+		self.agg = aggregator.flip(self.agg)
+		if lazy is None:
+			self.lazy = (True, NO_ASSIGN, 0, aggregator)
+		elif lazy[0] and lazy[1] is NO_ASSIGN and not lazy[2]:
+			self.lazy = None
+		else:
+			self.lazy = (not lazy[0], lazy[1], lazy[2], aggregator)
+
+	"""applies a range update to the subtree of self lazily
+	The value and the aggregate of self are updated now, and the update of the subtrees of its sons is left
+	pending in self.lazy, composed with the update that may already be pending there
+
+	@param assign: the value assigned to the items of the subtree, NO_ASSIGN for none
+	@param delta: the number added to the items of the subtree (after the assignment), 0 for none
+	@type aggregator: AVLAggregate
+	@param aggregator: the aggregator of the list, None if it has none
+	@Time complexity: O(1) (assuming the aggregator's repeat and addDelta are O(1))
+	"""
+	def applyTag(self, assign, delta, aggregator):
+		if assign is not NO_ASSIGN:
+			self.value = assign
+			if aggregator is not None:
+				self.agg = aggregator.repeat(aggregator.liftValue(assign), self.size)
+		if delta:
+			self.value = self.value + delta
+			if aggregator is not None:
+				self.agg = aggregator.addDelta(self.agg, delta, self.size)
+		if self.height > 0:
+			lazy = self.lazy
+			if lazy is None:
+				self.lazy = (False, assign, delta, aggregator)
+			elif assign is not NO_ASSIGN:
+				self.lazy = (lazy[0], assign, delta, aggregator)
+			else:
+				self.lazy = (lazy[0], lazy[1], lazy[2] + delta, aggregator)
+
+	"""pushes a pending reversal and a pending range update down to the sons of self
+	A set flip flag means that the sons of self were swapped, but their subtrees are yet to be reversed,
+	and an update (an assignment and/or a delta) means that it was applied to self but not yet to the subtrees
+	of its sons. Nodes are pushed before their sons are read, so the left/right pointers and the values of a node
+	are up to date once all of its ancestors were pushed.
+
+	@Time complexity: O(1)
+	"""
+	def pushDown(self):
+		lazy = self.lazy
+		if lazy is None:
+			return
+		flip, assign, delta, aggregator = lazy
+		if flip:
+			if self.left.height != -1:
+				self.left.flipSubtree(aggregator)
+			if self.right.height != -1:
+				self.right.flipSubtree(aggregator)
+		if assign is not NO_ASSIGN or delta:
+			if self.left.height != -1:
+				self.left.applyTag(assign, delta, aggregator)
+			if self.right.height != -1:
+				self.right.applyTag(assign, delta, aggregator)
+		self.lazy = None
+
 	"""recomputes the height of a Node inplace
 
 	@returns: None
@@ -183,6 +285,841 @@ class AVLNode(object):
 		return self.getHeight() == 0
 
 
+"""A node with the fields that only some lists maintain
+
+The nodes of a list with an AVLAggregate hold the aggregate of their subtree in agg, and the nodes that
+a list creates once it shares nodes with another list [see AVLTreeList.fork] hold its owner token in owner.
+Lists that use neither create plain AVLNodes, which are 2 slots smaller.
+"""
+
+
+class AVLExtendedNode(AVLNode):
+	__slots__ = ('agg', 'owner')
+
+	"""Constructor
+
+	@type value: str
+	@param value: data of the node
+	"""
+	def __init__(self, value):
+		AVLNode.__init__(self, value)
+		self.agg = None
+		self.owner = None
+
+
+"""A class representing the virtual node of an AVL tree
+
+There is a single shared instance, VIRTUAL_NODE, that is used as the left/right son of every
+node in the tree that has no real son. It is immutable: setting its parent is ignored (a shared
+node has no single parent), and any other change raises an AttributeError.
+"""
+
+
+class AVLVirtualNode(AVLNode):
+	__slots__ = ()
+
+	"""Constructor
+	
+	@Time complexity: O(1)
+	"""
+	def __init__(self):
+		for field, fieldValue in (('value', None), ('left', None), ('right', None), ('parent', None), ('size', 0), ('height', -1), ('lazy', None)):
+			object.__setattr__(self, field, fieldValue)
+
+	def __setattr__(self, name, value):
+		raise AttributeError("the virtual node is shared and can not be modified")
+
+	"""ignores the parent, the shared virtual node has no single parent
+
+	@type node: AVLNode
+	@param node: a node
+	@Time complexity: O(1)
+	"""
+	def setParent(self, node):
+		pass
+
+
+VIRTUAL_NODE = AVLVirtualNode()
+
+"""The assigned value of a range update that assigns nothing [see AVLNode.applyTag]"""
+NO_ASSIGN = object()
+
+"""The pending operations of a node whose subtree reversal is the only pending one [see AVLNode.flipSubtree]"""
+FLIP = (True, NO_ASSIGN, 0, None)
+
+
+"""A pool of detached AVLNodes, recycled by the lists that use it
+
+Nodes removed by AVLTreeList.delete are released to the pool, and AVLTreeList.insert acquires its
+new node from the pool before allocating a new one. A pool can be shared by several lists, also by lists
+with plain nodes and lists with extended ones [see AVLExtendedNode], so it keeps a free stack per node class.
+"""
+
+
+class AVLNodePool(object):
+	"""Constructor
+
+	@type maxSize: int
+	@param maxSize: the maximal number of nodes kept in the pool, released nodes beyond it are dropped
+	"""
+	def __init__(self, maxSize=1024):
+		self.maxSize = maxSize
+		# the free nodes of every node class
+		self.nodes = {AVLNode: [], AVLExtendedNode: []}
+		self.count = 0
+		self.hits = 0
+		self.misses = 0
+
+	"""returns a leaf node holding value, a recycled node if the pool is not empty
+
+	@type value: str
+	@param value: data of the node
+	@type nodeClass: type
+	@param nodeClass: AVLNode or AVLExtendedNode, the class of the returned node
+	@rtype: AVLNode
+	@returns: a real leaf with virtual sons and no parent
+	@Time complexity: O(1)
+	"""
+	def acquire(self, value, nodeClass=AVLNode):
+		nodes = self.nodes[nodeClass]
+		if nodes:
+			self.hits += 1
+			self.count -= 1
+			node = nodes.pop()
+		else:
+			self.misses += 1
+			node = nodeClass(value)
+		node.value = value
+		node.left = VIRTUAL_NODE
+		node.right = VIRTUAL_NODE
+		node.parent = None
+		node.size = 1
+		node.height = 0
+		node.lazy = None
+		return node
+
+	"""keeps a detached node for later use, unless the pool is full
+
+	@type node: AVLNode
+	@pre: node is not linked to any tree
+	@Time complexity: O(1)
+	"""
+	def release(self, node):
+		if self.count < self.maxSize:
+			# drop the references so the pool does not keep the value or other nodes alive
+			node.value = node.lazy = None
+			if node.agg is not None:
+				node.agg = None
+			if node.owner is not None:
+				node.owner = None
+			node.left = node.right = node.parent = None
+			self.nodes[type(node)].append(node)
+			self.count += 1
+
+	"""returns the number of nodes in the pool
+
+	@rtype: int
+	@Time complexity: O(1)
+	"""
+	def size(self):
+		return self.count
+
+
+"""An entry of a value index [see AVLValueIndex], a node of a treap of the nodes of the list holding a value
+
+The entries of a value are ordered by the index of their node in the list, which is not stored: it is computed
+when needed [see AVLTreeList.nodeIndex]. The random priorities keep the treap balanced in expectation, so a
+treap of k entries has an expected depth of O(log(k)) and is split or joined in O(log(k)) expected.
+"""
+
+
+class AVLValueIndexEntry(object):
+	"""Constructor, a single entry
+
+	@type node: AVLNode
+	@param node: a node of the list
+	"""
+	__slots__ = ('node', 'left', 'right', 'size', 'priority', 'flip')
+
+	def __init__(self, node):
+		self.node = node
+		self.left = None
+		self.right = None
+		# the number of entries in the treap of self
+		self.size = 1
+		self.priority = random.random()
+		# True if the order of the entries below self is reversed, and the sons of self were not swapped yet
+		self.flip = False
+
+
+"""A hash index from values to the nodes holding them, used by AVLTreeList.search
+
+Every value is mapped to a treap of its nodes, in the order of the list [see AVLValueIndexEntry], so the first
+and the last occurrences of a value are found in O(log(k)) expected and their indices in O(logn) more
+[see AVLTreeList.nodeIndex], where k is the number of nodes holding the value.
+A node is added or removed by finding its position with O(log(k)) calls to nodeIndex. The nodes of a value that
+are consecutive in the treap (such as the ones of a range of the list) are moved by a split and a join of the
+treap, in O(log(k)) expected, however many they are.
+An index belongs to a single list: split moves the entries of the smaller part to a new index, and concat
+merges the smaller index into the larger one, so a list that is dropped takes its index along.
+The values must be hashable.
+"""
+
+
+class AVLValueIndex(object):
+	"""Constructor, an empty index
+	"""
+	def __init__(self):
+		# the root entry of the treap of every value
+		self.roots = {}
+
+	"""returns the number of entries in a treap
+
+	@type entry: AVLValueIndexEntry
+	@param entry: the root of a treap, None for an empty one
+	@rtype: int
+	@Time complexity: O(1)
+	"""
+	@staticmethod
+	def entrySize(entry):
+		return 0 if entry is None else entry.size
+
+	"""swaps the sons of an entry whose treap is reversed, and passes the reversal on to them
+
+	@type entry: AVLValueIndexEntry
+	@Time complexity: O(1)
+	"""
+	@staticmethod
+	def pushFlip(entry):
+		if entry.flip:
+			entry.left, entry.right = entry.right, entry.left
+			if entry.left is not None:
+				entry.left.flip = not entry.left.flip
+			if entry.right is not None:
+				entry.right.flip = not entry.right.flip
+			entry.flip = False
+
+	"""splits a treap into its first count entries and the others
+
+	@type entry: AVLValueIndexEntry
+	@param entry: the root of a treap, None for an empty one
+	@type count: int
+	@pre: 0 <= count <= the size of the treap
+	@rtype: tuple
+	@returns: the roots of the 2 treaps (None for an empty one)
+	@Time complexity: O(log(k)) expected
+	"""
+	@staticmethod
+	def splitEntries(entry, count):
+		if entry is None:
+			return None, None
+		AVLValueIndex.pushFlip(entry)
+		leftSize = AVLValueIndex.entrySize(entry.left)
+		if count <= leftSize:
+			first, entry.left = AVLValueIndex.splitEntries(entry.left, count)
+			entry.size -= AVLValueIndex.entrySize(first)
+			return first, entry
+		entry.right, rest = AVLValueIndex.splitEntries(entry.right, count - leftSize - 1)
+		entry.size -= AVLValueIndex.entrySize(rest)
+		return entry, rest
+
+	"""joins 2 treaps, the entries of the first one come first
+
+	@type first: AVLValueIndexEntry
+	@type second: AVLValueIndexEntry
+	@param first, second: the roots of the treaps, None for an empty one
+	@rtype: AVLValueIndexEntry
+	@returns: the root of the joined treap
+	@Time complexity: O(log(k)) expected
+	"""
+	@staticmethod
+	def joinEntries(first, second):
+		if first is None:
+			return second
+		if second is None:
+			return first
+		size = first.size + second.size
+		if first.priority > second.priority:
+			AVLValueIndex.pushFlip(first)
+			first.right = AVLValueIndex.joinEntries(first.right, second)
+			first.size = size
+			return first
+		AVLValueIndex.pushFlip(second)
+		second.left = AVLValueIndex.joinEntries(first, second.left)
+		second.size = size
+		return second
+
+	"""returns a treap of nodes, in their order
+
+	The treap is built as a cartesian tree of the priorities, with a stack of its rightmost path.
+
+	@type nodes: iterable
+	@param nodes: nodes in the order of the list
+	@rtype: AVLValueIndexEntry
+	@returns: the root of the treap, None if there are no nodes
+	@Time complexity: O(len(nodes)) expected
+	"""
+	@staticmethod
+	def buildEntries(nodes):
+		stack = []
+		for node in nodes:
+			entry = AVLValueIndexEntry(node)
+			last = None
+			while stack and stack[-1].priority < entry.priority:
+				last = stack.pop()
+			entry.left = last
+			if stack:
+				stack[-1].right = entry
+			stack.append(entry)
+		if not stack:
+			return None
+		# the sizes, sons before their parents
+		entries = [stack[0]]
+		for entry in entries:
+			if entry.left is not None:
+				entries.append(entry.left)
+			if entry.right is not None:
+				entries.append(entry.right)
+		for entry in reversed(entries):
+			entry.size = 1 + AVLValueIndex.entrySize(entry.left) + AVLValueIndex.entrySize(entry.right)
+		return stack[0]
+
+	"""returns the number of entries of a treap whose node comes before a given point of the list
+
+	@type entry: AVLValueIndexEntry
+	@param entry: the root of a treap, None for an empty one
+	@type before: function
+	@param before: returns whether a node comes before the point, True for a prefix of the entries
+	@rtype: int
+	@Time complexity: O(log(k)) expected calls to before
+	"""
+	@staticmethod
+	def countBefore(entry, before):
+		count = 0
+		while entry is not None:
+			AVLValueIndex.pushFlip(entry)
+			if before(entry.node):
+				count += AVLValueIndex.entrySize(entry.left) + 1
+				entry = entry.right
+			else:
+				entry = entry.left
+		return count
+
+	"""returns the number of entries of a treap whose node has an index lower than index
+
+	@type entry: AVLValueIndexEntry
+	@param entry: the root of a treap, None for an empty one
+	@type nodeIndex: function
+	@param nodeIndex: returns the index of a node in the list [see AVLTreeList.nodeIndex]
+	@rtype: int
+	@Time complexity: O(log(k)) expected calls to nodeIndex
+	"""
+	@staticmethod
+	def position(entry, index, nodeIndex):
+		return AVLValueIndex.countBefore(entry, lambda node: nodeIndex(node) < index)
+
+	"""adds nodes of a value at a position of its treap
+
+	@type value: str
+	@type position: int
+	@param position: the number of entries of value that come before the nodes
+	@type entries: AVLValueIndexEntry
+	@param entries: the root of a treap of the nodes
+	@Time complexity: O(log(k)) expected
+	"""
+	def insertEntries(self, value, position, entries):
+		root = self.roots.get(value)
+		if root is None:
+			self.roots[value] = entries
+			return
+		first, rest = self.splitEntries(root, position)
+		self.roots[value] = self.joinEntries(self.joinEntries(first, entries), rest)
+
+	"""removes consecutive entries of a value from its treap
+
+	@type value: str
+	@type position: int
+	@param position: the number of entries of value that come before the removed ones
+	@type count: int
+	@param count: the number of removed entries
+	@Time complexity: O(log(k)) expected
+	"""
+	def removeEntries(self, value, position, count):
+		first, rest = self.splitEntries(self.roots[value], position)
+		rest = self.splitEntries(rest, count)[1]
+		root = self.joinEntries(first, rest)
+		if root is None:
+			del self.roots[value]
+		else:
+			self.roots[value] = root
+
+	"""adds a node under its current value
+
+	@type node: AVLNode
+	@type index: int
+	@param index: the index of node in the list
+	@type nodeIndex: function
+	@param nodeIndex: returns the index of a node in the list
+	@Time complexity: O(log(k)*logn) expected [see position]
+	"""
+	def insert(self, node, index, nodeIndex):
+		position = self.position(self.roots.get(node.value), index, nodeIndex)
+		self.insertEntries(node.value, position, AVLValueIndexEntry(node))
+
+	"""adds a node under its current value, after all the nodes of the index
+
+	@type node: AVLNode
+	@Time complexity: O(log(k)) expected
+	"""
+	def append(self, node):
+		root = self.roots.get(node.value)
+		self.roots[node.value] = self.joinEntries(root, AVLValueIndexEntry(node))
+
+	"""adds nodes under their current values, after all the nodes of the index
+
+	@type nodes: iterable
+	@param nodes: nodes in the order of the list
+	@Time complexity: O(len(nodes) + d*log(k)) expected, where d is the number of distinct values of the nodes
+	"""
+	def extend(self, nodes):
+		for value, run in self.runs(nodes).items():
+			root = self.roots.get(value)
+			self.roots[value] = self.joinEntries(root, self.buildEntries(run))
+
+	"""removes a node, which is held under its current value, from the index
+
+	@type node: AVLNode
+	@type index: int
+	@param index: the index of node in the list
+	@type nodeIndex: function
+	@param nodeIndex: returns the index of a node in the list
+	@Time complexity: O(log(k)*logn) expected [see position]
+	"""
+	def remove(self, node, index, nodeIndex):
+		position = self.position(self.roots[node.value], index, nodeIndex)
+		self.removeEntries(node.value, position, 1)
+
+	"""groups nodes by their values
+
+	@type nodes: iterable
+	@param nodes: nodes in the order of the list
+	@rtype: dict
+	@returns: a dictionary from the values to python lists of their nodes, in order
+	@Time complexity: O(len(nodes)) expected
+	"""
+	@staticmethod
+	def runs(nodes):
+		runs = {}
+		for node in nodes:
+			run = runs.get(node.value)
+			if run is None:
+				runs[node.value] = [node]
+			else:
+				run.append(node)
+		return runs
+
+	"""removes the consecutive nodes of a range of the list from the index
+
+	@type nodes: list
+	@param nodes: the nodes of the range, in order, held under their current values
+	@type index: int
+	@param index: the index of nodes[0] in the list
+	@Time complexity: O(len(nodes) + d*log(k)*logn) expected, where d is the number of distinct values
+	"""
+	def removeRange(self, nodes, index, nodeIndex):
+		# the nodes of a value in the range are consecutive in its treap, the first one is the first at index or after
+		for value, run in self.runs(nodes).items():
+			position = self.position(self.roots[value], index, nodeIndex)
+			self.removeEntries(value, position, len(run))
+
+	"""adds the consecutive nodes of a range of the list to the index, under their current values
+
+	@type nodes: list
+	@param nodes: the nodes of the range, in order
+	@type index: int
+	@param index: the index of nodes[0] in the list
+	@Time complexity: O(len(nodes) + d*log(k)*logn) expected [see removeRange]
+	"""
+	def insertRange(self, nodes, index, nodeIndex):
+		for value, run in self.runs(nodes).items():
+			position = self.position(self.roots.get(value), index, nodeIndex)
+			self.insertEntries(value, position, self.buildEntries(run))
+
+	"""moves the entries of a prefix or a suffix of the list to a new index
+
+	@type counts: dict
+	@param counts: the number of nodes of every value in the prefix/suffix, at least 1
+	@type prefix: bool
+	@param prefix: True to move the first nodes of every value, False to move the last ones
+	@rtype: AVLValueIndex
+	@returns: an index of the moved nodes
+	@Time complexity: O(len(counts)*log(k)) expected
+	"""
+	def detach(self, counts, prefix):
+		index = AVLValueIndex()
+		for value, count in counts.items():
+			root = self.roots[value]
+			if prefix:
+				moved, root = self.splitEntries(root, count)
+			else:
+				root, moved = self.splitEntries(root, root.size - count)
+			index.roots[value] = moved
+			if root is None:
+				del self.roots[value]
+			else:
+				self.roots[value] = root
+		return index
+
+	"""adds the entries of an index of the list that comes after (or before) the list of self
+
+	@type index: AVLValueIndex
+	@param index: an index that is not used afterwards
+	@type before: bool
+	@param before: True if the nodes of index come before the nodes of self
+	@Time complexity: O(len(index.roots)*log(k)) expected
+	"""
+	def merge(self, index, before=False):
+		for value, entries in index.roots.items():
+			root = self.roots.get(value)
+			if before:
+				self.roots[value] = self.joinEntries(entries, root)
+			else:
+				self.roots[value] = self.joinEntries(root, entries)
+
+	"""reverses the order of the nodes of every value, after the list is reversed, lazily [see AVLValueIndexEntry]
+
+	@Time complexity: O(number of distinct values)
+	"""
+	def reverse(self):
+		for root in self.roots.values():
+			root.flip = not root.flip
+
+	"""returns the first or the last node holding a value
+	The treap is read without pushing its reversals down, so concurrent reads do not modify it.
+
+	@type value: str
+	@type first: bool
+	@param first: True for the first node, False for the last one
+	@rtype: AVLNode
+	@returns: the node, None if no node holds value
+	@Time complexity: O(log(k)) expected
+	"""
+	def end(self, value, first=True):
+		entry = self.roots.get(value)
+		if entry is None:
+			return None
+		flipped = False
+		while True:
+			flipped ^= entry.flip
+			son = entry.left if first != flipped else entry.right
+			if son is None:
+				return entry.node
+			entry = son
+
+	"""returns the nodes holding a value, without modifying the index [see end]
+
+	@type value: str
+	@rtype: list
+	@returns: the nodes holding value in the order of the list, an empty list if there are none
+	@Time complexity: O(k)
+	"""
+	def find(self, value):
+		nodes = []
+		stack = []
+		entry, flipped = self.roots.get(value), False
+		while stack or entry is not None:
+			while entry is not None:
+				flipped ^= entry.flip
+				stack.append((entry, flipped))
+				entry = entry.right if flipped else entry.left
+			entry, flipped = stack.pop()
+			nodes.append(entry.node)
+			entry = entry.left if flipped else entry.right
+		return nodes
+
+	"""returns the number of nodes in the index
+
+	@rtype: int
+	@Time complexity: O(number of distinct values)
+	"""
+	def size(self):
+		return sum(root.size for root in self.roots.values())
+
+
+"""An associative aggregate (a monoid) of the values of a list, maintained in every node for its subtree
+
+The aggregate of a node is combine(left.agg, lift(value), right.agg), and it is recomputed with the size
+of the node, so AVLTreeList.aggregate(i, j) combines O(logn) subtree aggregates instead of j-i values.
+combine must be associative, and identity must be neutral for it.
+For the lazy range updates of AVLTreeList (assign_range, add_range) the aggregate of a whole subtree is
+updated without visiting it: repeat gives the aggregate of a value repeated n times (by default with O(logn)
+combines), and addDelta the aggregate after adding a number to every value (add_range needs it).
+A reversed subtree keeps the aggregate of a commutative aggregator. Otherwise a list keeps in every node the
+pair of the aggregates of its subtree in order and in reverse order [see reversible], and a reversal swaps them.
+"""
+
+
+class AVLAggregate(object):
+	"""Constructor
+
+	@type combine: function
+	@param combine: an associative function of 2 aggregates
+	@param identity: the aggregate of an empty range
+	@type lift: function
+	@param lift: maps a value to its aggregate, None for the value itself
+	@type repeat: function
+	@param repeat: repeat(agg, n) is the aggregate of n values whose aggregate is agg, None for the default
+	@type addDelta: function
+	@param addDelta: addDelta(agg, delta, n) is the aggregate of n values after adding delta to each of them,
+	None if it can not be computed from agg
+	@type commutative: bool
+	@param commutative: True if combine is commutative, so that a list keeps a single aggregate in every node
+	"""
+	def __init__(self, combine, identity, lift=None, repeat=None, addDelta=None, commutative=False):
+		self.combine = combine
+		self.identity = identity
+		self.lift = lift
+		if repeat is not None:
+			self.repeat = repeat
+		self.addDelta = addDelta
+		self.commutative = commutative
+		self.flip = None
+		self.forward = None
+		self.pairs = None
+
+	"""returns the aggregator that a list maintains in its nodes for this aggregator
+	A commutative aggregator is returned as is. Otherwise the returned aggregator keeps pairs (aggregate of the
+	values in order, aggregate of the values in reverse order), so that a reversed subtree gets its aggregate by
+	swapping the pair (flip) instead of by recomputing it. The pair aggregator is created once per aggregator,
+	so the lists of the same aggregator keep the same pair aggregator and concat needs no recomputation.
+
+	@rtype: AVLAggregate
+	@Time complexity: O(1)
+	"""
+	def reversible(self):
+		if self.commutative or self.flip is not None:
+			return self
+		if self.pairs is None:
+			combine = self.combine
+			repeat = self.repeat
+			addDelta = self.addDelta
+			lift = self.liftValue
+			pairs = AVLAggregate(lambda a, b: (combine(a[0], b[0]), combine(b[1], a[1])),
+								 (self.identity, self.identity), lambda value: (lift(value),) * 2,
+								 lambda agg, n: (repeat(agg[0], n), repeat(agg[1], n)))
+			if addDelta is not None:
+				pairs.addDelta = lambda agg, delta, n: (addDelta(agg[0], delta, n), addDelta(agg[1], delta, n))
+			pairs.flip = lambda agg: (agg[1], agg[0])
+			pairs.forward = self
+			self.pairs = pairs
+		return self.pairs
+
+	"""returns the aggregate of the values in order, from an aggregate of this aggregator
+
+	@rtype: any
+	@Time complexity: O(1)
+	"""
+	def result(self, agg):
+		return agg if self.forward is None else agg[0]
+
+	"""returns the aggregate of n values whose aggregate is agg, by repeated squaring
+
+	@pre: n >= 1
+	@Time complexity: O(logn) combines
+	"""
+	def repeat(self, agg, n):
+		result = None
+		while n:
+			if n & 1:
+				result = agg if result is None else self.combine(result, agg)
+			n >>= 1
+			if n:
+				agg = self.combine(agg, agg)
+		return result
+
+	"""returns the aggregate of a single value
+
+	@type value: str
+	@Time complexity: O(1) (assuming lift is O(1))
+	"""
+	def liftValue(self, value):
+		return value if self.lift is None else self.lift(value)
+
+	"""recomputes the aggregate of a node inplace, from its value and the aggregates of its sons
+
+	@type node: AVLNode
+	@pre: node.isRealNode() == True and the aggregates of its sons are up to date
+	@Time complexity: O(1) (assuming combine and lift are O(1))
+	"""
+	def recompute(self, node):
+		agg = self.liftValue(node.value)
+		if node.left.isRealNode():
+			agg = self.combine(node.left.agg, agg)
+		if node.right.isRealNode():
+			agg = self.combine(agg, node.right.agg)
+		node.agg = agg
+
+	"""returns the sum aggregate
+
+	@rtype: AVLAggregate
+	"""
+	@staticmethod
+	def sum():
+		return AVLAggregate(lambda a, b: a + b, 0, repeat=lambda agg, n: agg * n,
+							addDelta=lambda agg, delta, n: agg + delta * n, commutative=True)
+
+	"""returns the minimum aggregate, float('inf') for an empty range
+
+	@rtype: AVLAggregate
+	"""
+	@staticmethod
+	def min():
+		return AVLAggregate(lambda a, b: a if a <= b else b, float('inf'), repeat=lambda agg, n: agg,
+							addDelta=lambda agg, delta, n: agg + delta, commutative=True)
+
+	"""returns the maximum aggregate, float('-inf') for an empty range
+
+	@rtype: AVLAggregate
+	"""
+	@staticmethod
+	def max():
+		return AVLAggregate(lambda a, b: a if a >= b else b, float('-inf'), repeat=lambda agg, n: agg,
+							addDelta=lambda agg, delta, n: agg + delta, commutative=True)
+
+	"""returns the aggregate that counts the values satisfying a predicate
+
+	@type predicate: function
+	@rtype: AVLAggregate
+	"""
+	@staticmethod
+	def count_if(predicate):
+		return AVLAggregate(lambda a, b: a + b, 0, lambda value: 1 if predicate(value) else 0,
+							repeat=lambda agg, n: agg * n, commutative=True)
+
+
+"""Counters of the work done by the operations of a list [see AVLTreeList.enable_stats]
+
+Every count is kept per operation, the outermost public method of the list that was running (such as insert,
+or insert_many for the splits and concats it does), None for work done outside of one, and per event:
+	calls - the calls of the operation
+	rightRotation, leftRotation, leftThenRightRotation, rightThenLeftRotation - the rotations by kind
+	(the single rotations of a double rotation are not counted on their own)
+	descentNodes - the nodes visited by retrieve/retrieveNode, from the root or from the finger, and by the
+	descents that copy a path of a forked list [see AVLTreeList.ownPath]
+	reBalance - the calls of reBalance
+	reBalanceNodes - the nodes whose height and balance factor reBalance checked (not counted for a deferred one)
+	sizeOnlyNodes - the nodes above them, which only got the change in size [see AVLTreeList.propagateSize]
+	swapNodes - the calls of swapNodes
+	successor, predecessor - their calls
+	successorSteps, predecessorSteps - the levels they walked (climbing or descending)
+	nodeAllocations - the AVLNodes allocated (inserts that did not recycle a node from the pool, and copies)
+"""
+
+
+class AVLStats(object):
+	"""Constructor"""
+	def __init__(self):
+		self.counters = {}
+		# the outermost operation that is running, None if there is none
+		self.operation = None
+
+	"""adds n to the count of an event of the running operation
+
+	@type event: str
+	@type n: int
+	@Time complexity: O(1)
+	"""
+	def count(self, event, n=1):
+		key = (self.operation, event)
+		self.counters[key] = self.counters.get(key, 0) + n
+
+	"""runs a public method of a list as the outermost operation, and counts its call
+	The method sees that an operation is running, so it does not call measure again.
+
+	@type name: str
+	@param name: the name of the operation
+	@type method: function
+	@param method: the bound method to run
+	@returns: the result of the method
+	"""
+	def measure(self, name, method, *args, **kwargs):
+		self.operation = name
+		try:
+			self.count('calls')
+			return method(*args, **kwargs)
+		finally:
+			self.operation = None
+
+	"""returns the count of an event of an operation
+
+	@type operation: str
+	@type event: str
+	@rtype: int
+	@Time complexity: O(1)
+	"""
+	def get(self, operation, event):
+		return self.counters.get((operation, event), 0)
+
+	"""returns the count of the double rotations of the running operation [see AVLTreeList.reBalance]
+
+	@rtype: int
+	@Time complexity: O(1)
+	"""
+	def doubleRotations(self):
+		return self.get(self.operation, 'leftThenRightRotation') + self.get(self.operation, 'rightThenLeftRotation')
+
+	"""returns the counts as a dictionary from operations to dictionaries from events to counts
+
+	@rtype: dict
+	"""
+	def report(self):
+		report = {}
+		for (operation, event), n in self.counters.items():
+			report.setdefault(operation, {})[event] = n
+		return report
+
+	"""sets all the counts to 0"""
+	def reset(self):
+		self.counters = {}
+
+
+"""The lists that may share nodes with each other [see AVLTreeList.fork]
+
+The lists are held weakly, so a list that is dropped leaves the group. Lists with the same owner token come from
+the same list by split, concat etc. and do not share nodes with each other, so once all the other lists of the
+group have the owner token of a list, it does not share nodes anymore [see AVLTreeList.sharesNodes].
+Concatenating 2 lists of the group with different owner tokens (such as a list and its fork) makes a tree that
+may hold the same node twice, so the lists of the group then stay shared for good.
+"""
+
+
+class AVLShareGroup(object):
+	"""Constructor, an empty group
+	"""
+	def __init__(self):
+		self.members = weakref.WeakSet()
+		# the number of lists added so far, with the number of members it tells whether the group has changed
+		self.adds = 0
+		# True once the lists of the group stay shared even when they are the only ones left
+		self.permanent = False
+
+	"""adds a list to the group
+
+	@type lst: AVLTreeList
+	@Time complexity: O(1) expected
+	"""
+	def add(self, lst):
+		self.members.add(lst)
+		self.adds += 1
+
+	"""returns a value that changes whenever a list leaves the group
+
+	@rtype: tuple
+	@Time complexity: O(1)
+	"""
+	def state(self):
+		return self.adds, len(self.members)
+
 
 """
 A class implementing the ADT list, using an AVL tree.
@@ -193,11 +1130,417 @@ class AVLTreeList(object):
 	"""
 	Constructor
 
+	@type nodePool: AVLNodePool
+	@param nodePool: an optional pool to recycle deleted nodes into later inserts, None to always allocate
+	@type useFinger: bool
+	@param useFinger: if True, the list keeps a finger on the last accessed node, and index access
+	starts from the finger instead of the root (see fingerRetrieveNode)
+	@type valueIndex: AVLValueIndex
+	@param valueIndex: an optional empty index from values to nodes, which makes search O(logn) expected.
+	It must not be used by another list
+	@type aggregator: AVLAggregate
+	@param aggregator: an optional aggregate maintained in the nodes, which makes aggregate(i, j) O(logn).
+	The list keeps aggregator.reversible() [see AVLAggregate.reversible]
+	"""
+	def __init__(self, nodePool=None, useFinger=False, valueIndex=None, aggregator=None):
+		self.root = None
+		self.first_node = None
+		self.last_node = None
+		self.nodePool = nodePool
+		self.useFinger = useFinger
+		self.valueIndex = valueIndex
+		self.aggregator = None if aggregator is None else aggregator.reversible()
+		self.finger = None
+		self.fingerIndex = 0
+		# incremented by every modification of the list, lets iterators detect concurrent modifications
+		self.modCount = 0
+		# the nodes whose owner is self.owner may be modified in place, the others may be shared [see fork]
+		self.owner = object()
+		# True once the tree may hold nodes that are shared with another list
+		self.shared = False
+		# the lists that may share nodes with self while it is shared, and its state when self last checked it
+		self.shareGroup = None
+		self.shareState = None
+		# False if the list is unshared only by updateSharing, for lists that are read concurrently [see sharesNodes]
+		self.autoUnshare = True
+		# True once the tree may hold pending reversals/range updates [see AVLNode.pushDown]
+		self.pendingTags = False
+		# the number of nodes copied by the list since it was created [see copyNode]
+		self.copiedNodes = 0
+		# the nodes whose rebalancing is deferred during apply_batch, None outside of a batch
+		self.dirtyNodes = None
+		# the statistics of the operations, None unless enable_stats was called [see AVLStats]
+		self.stats = None
+
+	"""returns a new empty list with the same configuration as self (such as its node pool)
+	The new list also takes the owner and the sharing state of self, since nodes move between the lists
+	derived from each other (by split, concat etc.), and gets an empty value index of its own if self has one
+
+	@rtype: AVLTreeList
+	@Time complexity: O(1)
+	"""
+	def createEmptyList(self):
+		lst = AVLTreeList(self.nodePool, self.useFinger, None if self.valueIndex is None else AVLValueIndex(),
+						  self.aggregator)
+		lst.owner = self.owner
+		lst.shared = self.shared
+		if self.shareGroup is not None:
+			lst.joinShareGroup(self.shareGroup)
+		lst.autoUnshare = self.autoUnshare
+		lst.pendingTags = self.pendingTags
+		lst.stats = self.stats
+		return lst
+
+	"""starts counting the work done by the operations of the list [see AVLStats]
+	The methods of the list count their work behind a check of self.stats, once per call: the counts that
+	depend on the length of a walk (such as descentNodes) are taken by walking the path again afterwards,
+	so the loops of a list without statistics are the same as without counting.
+	Lists derived from self (by split, fork etc.) count into the same AVLStats.
+
+	@type stats: AVLStats
+	@param stats: the counters to add to, None for new ones
+	@rtype: AVLStats
+	@returns: self.stats
+	"""
+	def enable_stats(self, stats=None):
+		self.stats = AVLStats() if stats is None else stats
+		return self.stats
+
+	"""stops counting the work done by the operations of the list, self.stats is None afterwards"""
+	def disable_stats(self):
+		self.stats = None
+
+	"""counts the nodes of the descent from the root to the i'th node in self.stats
+	It is called after the descent, whose nodes were pushed down, so it follows the same path without
+	modifying it, and the descent itself does not count per level.
+
+	@type i: int
+	@pre: 0 <= i < self.length() and self.stats is not None
+	@Time complexity: O(logn)
+	"""
+	def countDescent(self, i):
+		node = self.root
+		visited = 1
+		while i != node.left.size:
+			if i < node.left.size:
+				node = node.left
+			else:
+				i -= node.left.size + 1
+				node = node.right
+			visited += 1
+		self.stats.count('descentNodes', visited)
+
+	"""counts the nodes of a walk that was done from start to end in self.stats, by following the same pointers
+	again [see successor, predecessor]
+
+	@type event: str
+	@type start: AVLNode
+	@type end: AVLNode
+	@type attr: str
+	@param attr: the pointer the walk followed at every step, 'left', 'right' or 'parent'
+	@Time complexity: O(length of the walk)
+	"""
+	def countWalk(self, event, start, end, attr):
+		steps = 1
+		while start is not end:
+			start = getattr(start, attr)
+			steps += 1
+		self.stats.count(event, steps)
+
+	"""returns the nodes on the path from a node to the root, for the counts of self.stats [see AVLStats]
+
+	@type node: AVLNode
+	@param node: a node whose ancestors are owned by self, None for none
+	@rtype: set
+	@Time complexity: O(depth of node)
+	"""
+	def pathToRoot(self, node):
+		path = set()
+		while node is not None:
+			path.add(node)
+			node = node.parent
+		return path
+
+	"""returns a new leaf node holding val, from the node pool if there is one
+	The node is an AVLExtendedNode if the list has an aggregator or shares nodes with another list, a plain
+	AVLNode otherwise. It is owned by self only if self shares nodes [see fork].
+
+	@type val: str
+	@rtype: AVLNode
+	@Time complexity: O(1)
+	"""
+	def newNode(self, val):
+		shared = self.sharesNodes()
+		extended = self.aggregator is not None or shared
+		nodeClass = AVLExtendedNode if extended else AVLNode
+		if self.nodePool is not None:
+			misses = self.nodePool.misses
+			node = self.nodePool.acquire(val, nodeClass)
+			if self.stats is not None and self.nodePool.misses != misses:
+				self.stats.count('nodeAllocations')
+		else:
+			node = nodeClass(val)
+			node.setHeight(0)
+			node.setSize(1)
+			node.setLeft(VIRTUAL_NODE)
+			node.setRight(VIRTUAL_NODE)
+			if self.stats is not None:
+				self.stats.count('nodeAllocations')
+		if self.aggregator is not None:
+			node.agg = self.aggregator.liftValue(val)
+		if shared:
+			node.owner = self.owner
+		return node
+
+	"""recomputes the size of a node inplace, and its aggregate if the list has an aggregator
+
+	@type node: AVLNode
+	@pre: the sizes (and aggregates) of the sons of node are up to date
+	@Time complexity: O(1)
+	"""
+	def recomputeNode(self, node):
+		node.recomputeSize()
+		if self.aggregator is not None and node.isRealNode():
+			self.aggregator.recompute(node)
+
+	"""pushes down the pending reversals of the ancestors of a node and of the node itself [see AVLNode.pushDown]
+	For a node that is reached by a pointer (such as get_First()) rather than by a descent from the root
+
+	@type node: AVLNode
+	@param node: a real node of the list
+	@Time complexity: O(logn)
+	"""
+	def pushDownPath(self, node):
+		path = []
+		while node is not None:
+			path.append(node)
+			node = node.getParent()
+		for node in reversed(path):
+			if node.lazy is not None:
+				node.pushDown()
+
+	"""returns a logically independent copy of the list, in O(1)
+	The copy shares the tree of self, and both lists get new owner tokens, so no node of the tree is owned by
+	either of them anymore. A node that is not owned by a list is never modified by it: before a modification,
+	the nodes on the touched paths are copied [see ownPaths], and a copy is owned by the list that made it.
+	Pushing down a pending reversal/range update modifies the sons of a node, so in a list that has pending
+	ones, reads copy the paths they walk too. Every node is copied at most once by each list.
+	The parent pointers of the nodes that a list does not own may point into another list, so they are only
+	followed on owned nodes, and the finger is not used while the list is shared.
+	The lists stay shared as long as a list they may share nodes with is alive [see sharesNodes].
+
+	@rtype: AVLTreeList
+	@raises ValueError: if the list has a value index, which would have to be copied in O(n)
+	@Time complexity: O(1), then every modification copies O(logn) nodes at most
+	"""
+	def fork(self):
+		if self.stats is not None and self.stats.operation is None:
+			return self.stats.measure('fork', self.fork)
+		if self.valueIndex is not None:
+			raise ValueError("a list with a value index can not be forked")
+		shared = self.sharesNodes()
+		self.moveFinger(None, 0)
+		self.owner = object()
+		if not shared:
+			self.shared = True
+			self.joinShareGroup(AVLShareGroup())
+		lst = self.createEmptyList()
+		lst.adoptList(self)
+		lst.owner = object()
+		return lst
+
+	"""returns whether the tree of self may hold nodes that are shared with another list
+	A shared list stops being shared once every other list of its share group is dropped, or has the owner
+	token of self (such as the parts of a split of self) [see AVLShareGroup]. The nodes that self copied while it
+	was shared are then walked to fix the parent pointers of their sons [see unshare].
+	Operations call it before they check self.shared, so it does not change during an operation.
+	Unsharing modifies the list, so a list whose reads run concurrently sets autoUnshare to False, and calls
+	updateSharing itself when no other thread uses the list [see ConcurrentAVLTreeList].
+
+	@rtype: bool
+	@Time complexity: O(1) unless a list left the share group since the last call, O(size of the group) then
+	"""
+	def sharesNodes(self):
+		if self.shared and self.autoUnshare:
+			self.updateSharing()
+		return self.shared
+
+	"""unshares the list if it does not share nodes with another list anymore [see sharesNodes]
+
+	@Time complexity: O(1) unless a list left the share group since the last call, O(size of the group) then
+	"""
+	def updateSharing(self):
+		if self.shared:
+			group = self.shareGroup
+			state = group.state()
+			if state != self.shareState and not group.permanent:
+				self.shareState = state
+				for lst in group.members:
+					if lst.owner is not self.owner:
+						return
+				self.unshare()
+
+	"""makes a list that does not share nodes with another list anymore a plain list again
+	The parent pointers of the sons of the nodes that self copied (or took from other lists by concat) may point
+	to the nodes they were copied from, and are fixed. The other nodes were not modified since the list became
+	shared, so the parent pointers below them are valid. The owner tokens of the walked nodes are cleared.
+
+	@Time complexity: O(number of nodes copied while the list was shared)
+	"""
+	def unshare(self):
+		self.leaveShareGroup()
+		self.shared = False
+		self.moveFinger(None, 0)
+		if self.root is None or not self.root.isRealNode():
+			return
+		stack = [self.root]
+		while stack:
+			node = stack.pop()
+			if node.owner is not None:
+				node.owner = None
+			for son in (node.left, node.right):
+				if son.height != -1:
+					son.parent = node
+					if son.owner is not None:
+						stack.append(son)
+
+	"""adds self to a share group, merging it with the group of self if self is in another one
+
+	@type group: AVLShareGroup
+	@Time complexity: O(size of the smaller group)
+	"""
+	def joinShareGroup(self, group):
+		mine = self.shareGroup
+		if mine is group:
+			return
+		self.shareState = None
+		if mine is None:
+			self.shareGroup = group
+			group.add(self)
+			return
+		small, large = (mine, group) if len(mine.members) <= len(group.members) else (group, mine)
+		for lst in list(small.members):
+			lst.shareGroup = large
+			large.add(lst)
+		large.permanent = large.permanent or small.permanent
+
+	"""removes self from its share group, if it is in one
+
+	@Time complexity: O(1) expected
+	"""
+	def leaveShareGroup(self):
+		if self.shareGroup is not None:
+			self.shareGroup.members.discard(self)
+			self.shareGroup = None
+			self.shareState = None
+
+	"""returns a copy of a node that is owned by self, with the same sons and no parent
+	The sons keep their parent pointer to node, which is not followed since they are not owned [see fork]
+
+	@type node: AVLNode
+	@rtype: AVLNode
+	@Time complexity: O(1)
+	"""
+	def copyNode(self, node):
+		copy = AVLExtendedNode(node.value)
+		copy.left = node.left
+		copy.right = node.right
+		copy.size = node.size
+		copy.height = node.height
+		copy.lazy = node.lazy
+		copy.agg = node.agg
+		copy.owner = self.owner
+		self.copiedNodes += 1
+		if self.stats is not None:
+			self.stats.count('nodeAllocations')
+		return copy
+
+	"""returns a subtree root that self may modify, the root itself if self owns it, otherwise a copy of it
+
+	@type root: AVLNode
+	@param root: the root of a subtree, with no parent (may be the virtual node)
+	@rtype: AVLNode
+	@Time complexity: O(1)
+	"""
+	def ownRoot(self, root):
+		if root.height == -1 or root.owner is self.owner:
+			return root
+		return self.copyNode(root)
+
+	"""replaces the sons of a node that self does not own by copies, so they can be modified (or pushed down to)
+
+	@type node: AVLNode
+	@pre: node is owned by self
+	@Time complexity: O(1)
+	"""
+	def ownSons(self, node):
+		left = node.left
+		if left.height != -1 and left.owner is not self.owner:
+			left = node.left = self.copyNode(left)
+			left.parent = node
+		right = node.right
+		if right.height != -1 and right.owner is not self.owner:
+			right = node.right = self.copyNode(right)
+			right.parent = node
+
+	"""makes the path from the root to the i'th node owned by self, with the sons of the nodes on it,
+	and pushes it down
+
+	@type i: int
+	@pre: 0 <= i < self.length()
+	@rtype: AVLNode
+	@returns: the i'th node
+	@Time complexity: O(logn)
+	"""
+	def ownPath(self, i):
+		node = self.root = self.ownRoot(self.root)
+		index = i
+		while True:
+			self.ownSons(node)
+			if node.lazy is not None:
+				node.pushDown()
+			loc = node.left.size
+			if i == loc:
+				break
+			elif i < loc:
+				node = node.left
+			else:
+				i -= loc + 1
+				node = node.right
+		if self.stats is not None:
+			self.countDescent(index)
+		return node
+
+	"""prepares a list that may share nodes with another list [see fork] for an operation: makes the paths to the
+	first and last nodes owned by self (and re-resolves the pointers to them, which may point to nodes that were
+	replaced by copies), and then the paths to the given indices.
+	Once the first/last nodes are owned they are never copied again, and since the owned nodes of a list form a
+	subtree that contains its root, the parents of an owned node are owned too.
+
+	@param indices: indices of nodes the operation reaches, the ones out of the range of the list are ignored
+	@Time complexity: O(logn) per index
+	"""
+	def ownPaths(self, *indices):
+		if self.root is None:
+			return
+		length = self.root.size
+		if self.first_node.owner is not self.owner:
+			self.first_node = self.ownPath(0)
+		if self.last_node.owner is not self.owner:
+			self.last_node = self.ownPath(length - 1)
+		for i in indices:
+			if 0 <= i < length:
+				self.ownPath(i)
+
+	"""releases a node that was removed from the list to the node pool, if there is one
+
+	@type node: AVLNode
+	@pre: node is not linked to the tree anymore
+	@Time complexity: O(1)
 	"""
-	def __init__(self):
-		self.root = None
-		self.first_node = None
-		self.last_node = None
+	def releaseNode(self, node):
+		if self.nodePool is not None:
+			self.nodePool.release(node)
 
 
 	"""returns whether the list is empty
@@ -218,28 +1561,40 @@ class AVLTreeList(object):
 	@returns: the the value of the i'th item in the list
 	
 	Time Complexity:
-	Recursion that in worst case goes every call goes one son left / one son right until the deepest leaf
-	Meaning that the maximum calls is the height of tree
-	In every recursion call there is O(1) work, and the height of the tree is O(logn)
+	A loop that in every iteration goes one son left / one son right until the i'th node is found
+	Meaning that the maximum number of iterations is the height of tree
+	In every iteration there is O(1) work, and the height of the tree is O(logn)
 	That is why, in total, as we saw in the lecture, the time complexity is O(logn) in the worst case
 	"""
 	def retrieve(self, i):
-
-		root = self.getRoot()
-
-		def retrieveRec(node, j):
-			loc = node.left.size + 1
-
-			if loc == j:
-				return node.getValue()
-			elif j < loc:
-				return retrieveRec(node.left, j)
+		if self.stats is not None and self.stats.operation is None:
+			return self.stats.measure('retrieve', self.retrieve, i)
+		if self.sharesNodes():
+			# without pending tags the descent modifies nothing, so the shared nodes are read as they are
+			if self.pendingTags:
+				return self.retrieveNode(i).getValue()
+		elif self.useFinger:
+			return self.fingerRetrieveNode(i).getValue()
+		# same descent as retrieveNode, inlined since random reads are the hot path
+		node = self.root
+		index = i
+		while True:
+			if node.lazy is not None:
+				node.pushDown()
+			loc = node.left.size
+			if i == loc:
+				break
+			elif i < loc:
+				node = node.left
 			else:
-				return retrieveRec(node.right, j - loc)
-
-		return retrieveRec(root, i + 1)
+				i -= loc + 1
+				node = node.right
+		if self.stats is not None:
+			self.countDescent(index)
+		return node.getValue()
 
 	"""retrieves the AVLNode that is the i'th item in the list
+	The descent is iterative, so no function call is made per level of the tree
 
 	@type i: int
 	@pre: 0 <= i < self.length()
@@ -248,27 +1603,105 @@ class AVLTreeList(object):
 	@returns: the AVLNode that is the i'th item in the list
 
 	Time Complexity:
-	Recursion that in worst case goes every call goes one son left / one son right until the deepest leaf
-	Meaning that the maximum calls is the height of tree
-	In every recursion call there is O(1) work, and the height of the tree is O(logn)
+	A loop that in every iteration goes one son left / one son right until the i'th node is found
+	Meaning that the maximum number of iterations is the height of tree
+	In every iteration there is O(1) work, and the height of the tree is O(logn)
 	That is why, in total, as we saw in the lecture, the time complexity is O(logn) in the worst case
 	"""
 
 	def retrieveNode(self, i):
+		if self.sharesNodes():
+			# the node is returned to be modified
+			self.ownPaths()
+			return self.ownPath(i)
+		if self.useFinger:
+			return self.fingerRetrieveNode(i)
+		node = self.root
+		index = i
+		while True:
+			if node.lazy is not None:
+				node.pushDown()
+			loc = node.left.size
+			if i == loc:
+				break
+			elif i < loc:
+				node = node.left
+			else:
+				i -= loc + 1
+				node = node.right
+		if self.stats is not None:
+			self.countDescent(index)
+		return node
+
+	"""retrieves the AVLNode that is the i'th item in the list, starting from the finger
+	The finger is the last accessed node, and its index is self.fingerIndex.
+	We climb from the finger until reaching the lowest ancestor whose subtree contains index i
+	(the lowest common ancestor of the finger and the i'th node), and descend from it to the i'th node.
+	The i'th node becomes the new finger.
+	The finger stays correct through rotations, since a rotation changes neither the index of a node
+	nor the consistency of the parent pointers. insert and delete move it to a node whose index they know,
+	and split/concat drop it. The finger and its ancestors were pushed down [see AVLNode.pushDown] when it was
+	reached, and pending reversals are only created by reverse, which drops it, so climbing reads no stale sons.
 
-		root = self.getRoot()
-
-		def retrieveRec(node, j):
-			loc = node.left.size + 1
+	@type i: int
+	@pre: 0 <= i < self.length()
+	@param i: index in the list
+	@rtype: AVLNode
+	@returns: the AVLNode that is the i'th item in the list
 
-			if loc == j:
-				return node
-			elif j < loc:
-				return retrieveRec(node.left, j)
+	Time Complexity:
+	For distance d = abs(i - self.fingerIndex), the lowest common ancestor is O(logd) levels above the
+	finger in a balanced tree, so climbing up and descending back are O(logd) each, O(logn) in the worst case
+	"""
+	def fingerRetrieveNode(self, i):
+		target = i
+		node = self.finger
+		if node is None:
+			node = self.root
+			index = node.left.size
+		else:
+			index = self.fingerIndex
+			while node.parent is not None and not (index - node.left.size <= i <= index + node.right.size):
+				if node.parent.left is node:
+					index += node.right.size + 1
+				else:
+					index -= node.left.size + 1
+				node = node.parent
+
+		# descend, i is relative to the subtree of node from here
+		i -= index - node.left.size
+		while True:
+			if node.lazy is not None:
+				node.pushDown()
+			loc = node.left.size
+			if i == loc:
+				break
+			elif i < loc:
+				node = node.left
 			else:
-				return retrieveRec(node.right, j - loc)
+				i -= loc + 1
+				node = node.right
+		if self.stats is not None:
+			# the lowest common ancestor, and the nodes below it on both sides
+			path = self.pathToRoot(node)
+			self.stats.count('descentNodes', len(path) if self.finger is None else
+							 len(path ^ self.pathToRoot(self.finger)) + 1)
+		self.finger = node
+		self.fingerIndex = target
+		return node
+
+	"""moves the finger to a given node, if the list uses a finger
 
-		return retrieveRec(root, i + 1)
+	@type node: AVLNode
+	@param node: a node of the list, None to drop the finger
+	@type index: int
+	@param index: the index of node in the list
+	@Time complexity: O(1)
+	"""
+	def moveFinger(self, node, index):
+		if self.useFinger:
+			self.finger = node
+			self.fingerIndex = index
 
 	"""inserts val at position i in the list
 
@@ -279,18 +1712,35 @@ class AVLTreeList(object):
 	@param val: the value we insert
 	@rtype: list
 	@returns: the number of rebalancing operation due to AVL rebalancing
+	@Time complexity: O(logn) [see insertNode], O(log(k)*logn) expected with a value index [see AVLValueIndex]
 	"""
 
 	def insert(self, i, val):
-		inserted = AVLNode(val)
-		inserted.setHeight(0)
-		inserted.setSize(1)
-		virtualL = AVLNode("")
-		virtualR = AVLNode("")
-		inserted.setLeft(virtualL)
-		inserted.setRight(virtualR)
-		virtualL.setParent(inserted)
-		virtualR.setParent(inserted)
+		if self.stats is not None and self.stats.operation is None:
+			return self.stats.measure('insert', self.insert, i, val)
+		inserted = self.newNode(val)
+		balanceOps = self.insertNode(i, inserted)
+		if self.valueIndex is not None:
+			self.valueIndex.insert(inserted, i, self.nodeIndex)
+		return balanceOps
+
+	"""inserts a given leaf node at position i in the list
+
+	@type i: int
+	@pre: 0 <= i <= self.length()
+	@param i: The intended index in the list of the node
+	@type inserted: AVLNode
+	@pre: inserted is a real leaf (size 1, height 0, virtual sons) that is not linked to any tree
+	@param inserted: the node we insert
+	@rtype: int
+	@returns: the number of rebalancing operation due to AVL rebalancing
+	@Time complexity: retrieveNode, predecessor and reBalance - O(logn) each, O(logn) in total
+	"""
+	def insertNode(self, i, inserted):
+		self.modCount += 1
+		if self.sharesNodes():
+			# the predecessor of the i'th node, the path to the i'th node is owned by retrieveNode
+			self.ownPaths(i - 1)
 
 		#insterted node will be root
 		if(self.empty()):
@@ -298,41 +1748,47 @@ class AVLTreeList(object):
 			self.set_First(inserted)
 			self.set_Last(inserted)
 			inserted.recomputeHeight()
-			inserted.recomputeSize()
-			return 0
+			self.recomputeNode(inserted)
+			balanceOps = 0
 
 		#insert at the begin of list
-		if i == 0:
+		elif i == 0:
 			node = self.get_First()
+			self.pushDownPath(node)
 			node.setLeft(inserted)
 			inserted.setParent(node)
 			self.set_First(inserted)
-			return self.reBalance(node)
+			balanceOps = self.reBalance(node)
 
 
 		#insert at end of list
 		elif i == self.length():
 			node = self.get_Last()
+			self.pushDownPath(node)
 			node.setRight(inserted)
 			inserted.setParent(node)
 			self.set_Last(inserted)
-			return self.reBalance(node)
+			balanceOps = self.reBalance(node)
 
-		#get current i'th node
-		node = self.retrieveNode(i)
+		else:
+			#get current i'th node
+			node = self.retrieveNode(i)
 
-		#has left son, need to insert right of the predecessor, has no right son
-		if node.getLeft().isRealNode():
-			node = self.predecessor(node)
-			node.setRight(inserted)
-			inserted.setParent(node)
-			return self.reBalance(node)
+			#has left son, need to insert right of the predecessor, has no right son
+			if node.getLeft().isRealNode():
+				node = self.predecessor(node)
+				node.setRight(inserted)
+				inserted.setParent(node)
+				balanceOps = self.reBalance(node)
 
-		#insert as left son of i'th node
-		else:
-			node.setLeft(inserted)
-			inserted.setParent(node)
-			return self.reBalance(node)
+			#insert as left son of i'th node
+			else:
+				node.setLeft(inserted)
+				inserted.setParent(node)
+				balanceOps = self.reBalance(node)
+
+		self.moveFinger(inserted, i)
+		return balanceOps
 
 	"""deletes the i'th item in the list
 
@@ -348,10 +1804,39 @@ class AVLTreeList(object):
 	deleteLeaf - called once - O(logn) [see deleteLeaf]
 	deleteOneChildedNode - called once - O(logn [see deleteOneChildedNode]
 	Others - O(1)
-	Total: O(logn)
+	Total: O(logn), O(log(k)*logn) expected with a value index [see AVLValueIndex]
 	"""
 	def delete(self, i):
+		if self.stats is not None and self.stats.operation is None:
+			return self.stats.measure('delete', self.delete, i)
+		self.modCount += 1
+		if self.sharesNodes():
+			# the path to the i'th node is owned by retrieveNode
+			self.ownPaths(i - 1, i + 1)
 		nodeToDelete = self.retrieveNode(i)
+		if self.valueIndex is not None:
+			self.valueIndex.remove(nodeToDelete, i, self.nodeIndex)
+		if self.useFinger:
+			# the finger moves to the predecessor, whose index after the delete is i-1
+			nodeToDeletePredecessor = self.predecessor(nodeToDelete)
+			balanceOps = self.deleteNode(nodeToDelete)
+			self.moveFinger(nodeToDeletePredecessor, i - 1)
+		else:
+			balanceOps = self.deleteNode(nodeToDelete)
+		self.releaseNode(nodeToDelete)
+		return balanceOps
+
+	"""deletes a given node of the list
+	The node is detached from the tree but is not released to the node pool, so it can be reused (see concat)
+
+	@type nodeToDelete: AVLNode
+	@pre: nodeToDelete is a real node in the tree
+	@param nodeToDelete: the node to be deleted
+	@rtype: int
+	@returns: the number of rebalancing operation due to AVL rebalancing
+	@Time Complexity: O(logn) [see delete]
+	"""
+	def deleteNode(self, nodeToDelete):
 		if nodeToDelete.isLeaf(): # case 1 - lecture 2 slide 51
 			return self.deleteLeaf(nodeToDelete, '1')
 		elif nodeToDelete.getLeft().isRealNode() and not nodeToDelete.getRight().isRealNode(): # case 2.1 - lecture 2 slide 51
@@ -391,8 +1876,7 @@ class AVLTreeList(object):
 			if nodeToDelete is self.get_Last():
 				self.set_Last(self.predecessor(nodeToDelete))
 			nodeToDeleteLeftSon.setParent(nodeToDeleteParent)
-			nodeToDelete.setLeft(AVLNode(None))
-			nodeToDelete.getLeft().setParent(nodeToDeleteLeftSon)
+			nodeToDelete.setLeft(VIRTUAL_NODE)
 			nodeToDelete.setParent(None)
 			if self.getRoot() is nodeToDelete:  # i.e. nodeToDeleteParent is None
 				self.root = nodeToDeleteLeftSon
@@ -409,8 +1893,7 @@ class AVLTreeList(object):
 			if nodeToDelete is self.get_First(): # irrelevant in case 3
 				self.set_First(self.successor(nodeToDelete))
 			nodeToDeleteRightSon.setParent(nodeToDeleteParent)
-			nodeToDelete.setRight(AVLNode(None))
-			nodeToDelete.getRight().setParent(nodeToDeleteRightSon)
+			nodeToDelete.setRight(VIRTUAL_NODE)
 			nodeToDelete.setParent(None)
 			if self.getRoot() is nodeToDelete:  # i.e. nodeToDeleteParent is None
 				self.root = nodeToDeleteRightSon
@@ -458,11 +1941,9 @@ class AVLTreeList(object):
 
 		nodeToDelete.setParent(None)
 		if nodeToDeleteParent.getLeft() is nodeToDelete:
-			nodeToDeleteParent.setLeft(AVLNode(None))
-			nodeToDeleteParent.getLeft().setParent(nodeToDeleteParent)
+			nodeToDeleteParent.setLeft(VIRTUAL_NODE)
 		elif nodeToDeleteParent.getRight() is nodeToDelete:
-			nodeToDeleteParent.setRight(AVLNode(None))
-			nodeToDeleteParent.getRight().setParent(nodeToDeleteParent)
+			nodeToDeleteParent.setRight(VIRTUAL_NODE)
 		balanceOps = self.reBalance(nodeToDeleteParent)
 		return balanceOps
 
@@ -481,6 +1962,8 @@ class AVLTreeList(object):
 	"""
 
 	def swapNodes(self, node1, node2):
+		if self.stats is not None:
+			self.stats.count('swapNodes')
 		node1Parent = node1.getParent()
 		node1Left = node1.getLeft()
 		node1Right = node1.getRight()
@@ -631,9 +2114,9 @@ class AVLTreeList(object):
 		elif self.get_Last() is node2:
 			self.set_Last(node1)
 
-		node1.recomputeSize()
+		self.recomputeNode(node1)
 		node1.recomputeHeight()
-		node2.recomputeSize()
+		self.recomputeNode(node2)
 		node2.recomputeHeight()
 
 	"""Re balancing the Tree inplace
@@ -643,13 +2126,22 @@ class AVLTreeList(object):
 	
 	@rtype: int
 	@return: number of balancing operations that have been made in order to reBalance the tree
-	
+
+	Once a node keeps its height without a rotation, the heights and balance factors of its ancestors do not
+	change either, so the rest of the route only gets the change in size [see propagateSize].
+
 	@Time complexity:
 	Worst case - maximum route from a node to root is O(h) = O(logn)
 	In every node in that route, O(1) work is executed in the worst case (rotation + arithmetic operation)
 	Total: O(logn) * O(1) = O(logn) work
 	"""
 	def reBalance(self, nodeToCheckBF):
+		if self.stats is not None:
+			self.stats.count('reBalance')
+		if self.dirtyNodes is not None:
+			return self.deferReBalance(nodeToCheckBF)
+		if self.stats is not None:
+			doubleRotations = self.stats.doubleRotations()
 		balanceOps = 0
 		while nodeToCheckBF is not None:
 			balanceFactor = nodeToCheckBF.getBalanceFactor()
@@ -658,15 +2150,180 @@ class AVLTreeList(object):
 				balanceOps += self.rotate(nodeToCheckBF, balanceFactor)
 				nodeToCheckBF = nodeToCheckBF.getParent()
 			elif abs(balanceFactor) < 2:
+				size = nodeToCheckBF.size
 				nodeToCheckBF.recomputeHeight()
-				nodeToCheckBF.recomputeSize()
+				self.recomputeNode(nodeToCheckBF)
 				if nodeToCheckBF.getHeight() != height:
 					balanceOps += 1
+				else:
+					self.propagateSize(nodeToCheckBF.getParent(), nodeToCheckBF.size - size)
+					break
 			nodeToCheckBF = nodeToCheckBF.getParent()
 
+		if self.stats is not None:
+			# every checked node added 1 to balanceOps (2 for a double rotation), except the one that kept its height
+			checked = balanceOps - (self.stats.doubleRotations() - doubleRotations)
+			self.stats.count('reBalanceNodes', checked if nodeToCheckBF is None else checked + 1)
+		return balanceOps
+
+	"""adds a change in size to a node and its ancestors, whose heights did not change [see reBalance]
+	The aggregates are recomputed on the way, if the list has an aggregator.
+
+	@type node: AVLNode
+	@param node: the lowest node to update, None for none
+	@type delta: int
+	@param delta: the change in the size of the subtree of each node
+	@Time complexity: O(depth of node), with O(1) work per level
+	"""
+	def propagateSize(self, node, delta):
+		aggregator = self.aggregator
+		if aggregator is None and delta == 0:
+			return
+		if self.stats is not None:
+			self.stats.count('sizeOnlyNodes', len(self.pathToRoot(node)))
+		if aggregator is None:
+			while node is not None:
+				node.size += delta
+				node = node.parent
+		else:
+			while node is not None:
+				node.size += delta
+				aggregator.recompute(node)
+				node = node.parent
+
+	"""records a node whose rebalancing is deferred to the end of the batch [see apply_batch], and fixes only the
+	sizes and heights of its ancestors: the next operations of the batch find their indices by the sizes, and
+	delete tells leaves by their height. This still walks to the root on every operation, only the rotations
+	and the aggregates are left to the end of the batch.
+	If the path is already much longer than in an AVL tree, the deferred rebalancing is done now, so a batch
+	that keeps hitting the same area does not make the following descents linear.
+
+	@type node: AVLNode
+	@param node: the lowest node whose subtree changed, None if there is none
+	@rtype: int
+	@returns: the number of rebalancing operations, 0 unless the deferred ones were done now
+	@Time complexity: O(depth of node)
+	"""
+	def deferReBalance(self, node):
+		if node is None:
+			return 0
+		self.dirtyNodes.append(node)
+		depth = 0
+		while node is not None:
+			left, right = node.left, node.right
+			node.size = left.size + 1 + right.size
+			node.height = (left.height if left.height > right.height else right.height) + 1
+			node = node.parent
+			depth += 1
+		if depth > 2 * self.root.size.bit_length() + 2:
+			dirtyNodes, self.dirtyNodes = self.dirtyNodes, []
+			return self.fixDirtyNodes(dirtyNodes)
+		return 0
+
+	"""rebalances the tree after deferred changes [see apply_batch]
+	The dirty nodes and their ancestors are fixed in increasing order of height, so every node is fixed once,
+	after all of its dirty descendants (the heights are exact during a batch [see deferReBalance], and the
+	fixes below a node never make its subtree higher): its height and aggregate are recomputed, and a balance
+	factor of 2 is fixed by a rotation as in reBalance. A larger balance factor can not be fixed by rotations,
+	so the subtree is rebuilt as a balanced tree [see rebuildSubtree].
+
+	@type dirtyNodes: list
+	@param dirtyNodes: the nodes that were given to reBalance, some may have been deleted since
+	@rtype: int
+	@returns: the number of rebalancing operations, as reBalance counts them, a rebuild counts as one
+	@Time complexity: O(m*log(m)) for the m nodes of the union of the paths from the dirty nodes to the root,
+	plus the sizes of the rebuilt subtrees
+	"""
+	def fixDirtyNodes(self, dirtyNodes):
+		heap = []
+		for node in dirtyNodes:
+			# a deleted node is detached, with no parent
+			if node.parent is not None or node is self.root:
+				heap.append((node.height, id(node), node))
+		heapq.heapify(heap)
 
+		balanceOps = 0
+		fixed = set()
+		while heap:
+			node = heapq.heappop(heap)[2]
+			if node in fixed:
+				continue
+			fixed.add(node)
+			height = node.height
+			node.recomputeHeight()
+			balanceFactor = node.getBalanceFactor()
+			if abs(balanceFactor) > 2:
+				node = self.rebuildSubtree(node)
+				balanceOps += 1
+			elif abs(balanceFactor) == 2:
+				balanceOps += self.rotate(node, balanceFactor)
+				# the son that took the place of node
+				node = node.getParent()
+			else:
+				self.recomputeNode(node)
+				if node.height != height:
+					balanceOps += 1
+			parent = node.getParent()
+			if parent is not None and parent not in fixed:
+				heapq.heappush(heap, (parent.height, id(parent), parent))
 		return balanceOps
 
+	"""rebuilds the subtree of a node as a balanced tree of the same nodes, in place
+
+	@type node: AVLNode
+	@pre: node is owned by self [see fork]
+	@rtype: AVLNode
+	@returns: the root of the rebuilt subtree, which takes the place of node
+	@Time complexity: O(size of the subtree)
+	"""
+	def rebuildSubtree(self, node):
+		parent = node.getParent()
+		nodes = []
+		stack = []
+		current = node
+		while stack or current.isRealNode():
+			if current.isRealNode():
+				if self.shared:
+					self.ownSons(current)
+				current.pushDown()
+				stack.append(current)
+				current = current.left
+			else:
+				current = stack.pop()
+				nodes.append(current)
+				current = current.right
+
+		root = self.linkBalanced(nodes, 0, len(nodes))
+		root.setParent(parent)
+		if parent is None:
+			self.root = root
+		elif parent.getLeft() is node:
+			parent.setLeft(root)
+		else:
+			parent.setRight(root)
+		return root
+
+	"""links nodes[lo:hi] as a balanced subtree, in order
+
+	@type nodes: list
+	@param nodes: real nodes whose pending flips/tags were pushed down, their links are overwritten
+	@rtype: AVLNode
+	@returns: the root of the subtree, the virtual node if lo == hi
+	@Time complexity: O(hi - lo)
+	"""
+	def linkBalanced(self, nodes, lo, hi):
+		if lo == hi:
+			return VIRTUAL_NODE
+		mid = (lo + hi) // 2
+		root = nodes[mid]
+		root.setLeft(self.linkBalanced(nodes, lo, mid))
+		root.setRight(self.linkBalanced(nodes, mid + 1, hi))
+		root.getLeft().setParent(root)
+		root.getRight().setParent(root)
+		root.recomputeHeight()
+		self.recomputeNode(root)
+		return root
+
 	""" Applies the correct rotation to the tree, during rebalance process
 	  
 	@type BFcriminal: AVLNode
@@ -682,21 +2339,28 @@ class AVLTreeList(object):
 
 	def rotate(self, BFcriminal, balanceFactor):
 		balanceOps = 0
+		kind = None
 		if balanceFactor == 2:
 			if BFcriminal.getLeft().getBalanceFactor() in [0, 1]:
 				self.rightRotation(BFcriminal)
 				balanceOps += 1
+				kind = 'rightRotation'
 			elif BFcriminal.getLeft().getBalanceFactor() == -1:
 				self.leftThenRightRotation(BFcriminal)
 				balanceOps += 2
+				kind = 'leftThenRightRotation'
 
 		elif balanceFactor == -2:
 			if BFcriminal.getRight().getBalanceFactor() in [-1, 0]:
 				self.leftRotation(BFcriminal)
 				balanceOps += 1
+				kind = 'leftRotation'
 			elif BFcriminal.getRight().getBalanceFactor() == 1:
 				self.rightThenLeftRotation(BFcriminal)
 				balanceOps += 2
+				kind = 'rightThenLeftRotation'
+		if self.stats is not None and kind is not None:
+			self.stats.count(kind)
 		return balanceOps
 
 
@@ -759,25 +2423,165 @@ class AVLTreeList(object):
 	@returns: a list of strings representing the data structure
 	
 	Time Complexity:
-	Initiliazing an empty list - O(1)
-	get_First() - returns an attribute of self, without any calculations - O(1)
-	
-	Conclusion from recitation 3 ex 3 - starting at the minimal element of a tree and calling 
-	n-1 times to successor
-	is O(n) work since we go through every edge (there are n-1 edges) at most 2 times.
-	Plus,
-		node is not None - O(1), n times -> O(n)
-		lst.append(node.getValue()) - O(1), n times -> O(n)
-		
-	Therefore, the entire while loop takes O(n) time in the worst case.
+	An in-order walk with an explicit stack [see iterNodes] - O(n)
+	lst.append(node.getValue()) - O(1), n times -> O(n)
+	Therefore, listToArray takes O(n) time in the worst case.
 	"""
 	def listToArray(self):
-		lst = []
-		node = self.get_First()
-		while node is not None:
-			lst.append(node.getValue())
-			node = self.successor(node)
-		return lst
+		if self.stats is not None and self.stats.operation is None:
+			return self.stats.measure('listToArray', self.listToArray)
+		return [node.value for node in self.iterNodes()]
+
+	"""yields the nodes of the list in order, starting from the i'th node
+
+	The walk keeps an explicit stack of the nodes that are still to be yielded along the current path,
+	so a step never climbs through the parents and never compares against get_Last().
+	If the list is modified (see modCount) while the generator is suspended, the next step raises a RuntimeError.
+	A walk over the whole list pushes down every node, so once it is done the list has no pending tags.
+
+	@type i: int
+	@pre: 0 <= i <= self.length(), or None
+	@param i: the index of the first node to yield, None to start from the first (or last if reverse) node
+	@type reverse: bool
+	@param reverse: if True, yields the i'th node, then the (i-1)'th node and so on down to the first node
+	@rtype: generator
+	@Time complexity:
+	Reaching the i'th node - O(logn)
+	Every node is pushed to and popped from the stack at most once, so a step is O(1) amortized,
+	and walking k nodes is O(k + logn)
+	"""
+	def iterNodes(self, i=None, reverse=False):
+		modCount = self.modCount
+		stack = []
+		# pushing down modifies the sons, so in a list that shares nodes they are copied on the way [see fork]
+		owning = self.sharesNodes() and self.pendingTags
+		if owning:
+			self.ownPaths()
+		node = self.root
+		if node is None:
+			return
+		if i is None:
+			# the first/last node, without relying on the sizes
+			while node.isRealNode():
+				if owning:
+					self.ownSons(node)
+				if node.lazy is not None:
+					node.pushDown()
+				stack.append(node)
+				node = node.right if reverse else node.left
+		else:
+			# the nodes pushed are exactly the ancestors that come after (before if reverse) the i'th node
+			while node.isRealNode():
+				if owning:
+					self.ownSons(node)
+				if node.lazy is not None:
+					node.pushDown()
+				loc = node.left.size
+				if i == loc:
+					stack.append(node)
+					break
+				elif i < loc:
+					if not reverse:
+						stack.append(node)
+					node = node.left
+				else:
+					if reverse:
+						stack.append(node)
+					i -= loc + 1
+					node = node.right
+
+		while stack:
+			node = stack.pop()
+			yield node
+			if modCount != self.modCount:
+				raise RuntimeError("AVLTreeList was modified during iteration")
+			node = node.left if reverse else node.right
+			while node.isRealNode():
+				if owning:
+					self.ownSons(node)
+				if node.lazy is not None:
+					node.pushDown()
+				stack.append(node)
+				node = node.right if reverse else node.left
+		if i is None:
+			self.pendingTags = False
+
+	"""pushes down all the pending reversals/range updates of the list [see AVLNode.pushDown]
+	Reads of the list do not modify it afterwards, until the next reverse/range update.
+
+	@Time complexity: O(n)
+	"""
+	def pushDownAll(self):
+		if self.pendingTags:
+			for node in self.iterNodes():
+				pass
+
+	"""iterates over the values of the list in order
+
+	@rtype: iterator
+	@Time complexity: O(1) amortized per step [see iterNodes]
+	"""
+	def __iter__(self):
+		return map(attrgetter('value'), self.iterNodes())
+
+	"""iterates over the values of the list in reverse order
+
+	@rtype: iterator
+	@Time complexity: O(1) amortized per step [see iterNodes]
+	"""
+	def __reversed__(self):
+		return map(attrgetter('value'), self.iterNodes(reverse=True))
+
+	"""iterates over the values of the list in order, starting from the i'th item
+
+	@type i: int
+	@pre: 0 <= i <= self.length()
+	@param i: the index of the first item
+	@rtype: iterator
+	@Time complexity: O(logn) to reach the i'th item, then O(1) amortized per step [see iterNodes]
+	"""
+	def iter_from(self, i):
+		return map(attrgetter('value'), self.iterNodes(i))
+
+	"""iterates over the values of the items i, i+1, ..., j-1 of the list
+	The i'th node is located once using the subtree sizes, and the rest are walked in order
+
+	@type i: int
+	@type j: int
+	@pre: 0 <= i <= j <= self.length()
+	@rtype: iterator
+	@Time complexity: O(logn + k) for k = j - i [see iterNodes]
+	"""
+	def range(self, i, j):
+		if i >= j:
+			return iter(())
+		return map(attrgetter('value'), islice(self.iterNodes(i), j - i))
+
+	"""returns the value of the i'th item, or a python list of the values of a slice of the list
+	Negative indices and slices follow the semantics of python lists
+
+	@type key: int or slice
+	@rtype: str or list
+	@raises IndexError: if key is an int out of the range of the list
+	@Time complexity: O(logn) for an int, O(logn + k) for a slice of k items (any step)
+	"""
+	def __getitem__(self, key):
+		length = self.length()
+		if isinstance(key, slice):
+			start, stop, step = key.indices(length)
+			if step > 0:
+				if start >= stop:
+					return []
+				return list(islice(self.range(start, stop), 0, None, step))
+			if start <= stop:
+				return []
+			values = map(attrgetter('value'), self.iterNodes(start, reverse=True))
+			return list(islice(values, 0, start - stop, -step))
+		if key < 0:
+			key += length
+		if not 0 <= key < length:
+			raise IndexError("AVLTreeList index out of range")
+		return self.retrieve(key)
 
 	"""returns the size of the list 
 
@@ -803,16 +2607,29 @@ class AVLTreeList(object):
 	In case that node == self.get_Last() then O(1)
 	"""
 	def successor(self, node):
+		if self.stats is not None:
+			self.stats.count('successor')
 		if node == self.get_Last():
 			return None
 
 		x = node
 		if x.getRight().isRealNode():
-			return self.minimum(x.getRight())
-		y = x.getParent()
-		while y is not None and x == y.right:
-			x = y
-			y = x.parent
+			# the minimum of the right subtree [see minimum]
+			y = x.getRight()
+			y.pushDown()
+			while y.getLeft().isRealNode():
+				y = y.getLeft()
+				y.pushDown()
+		else:
+			y = x.getParent()
+			while y is not None and x == y.right:
+				x = y
+				y = x.parent
+		if self.stats is not None:
+			if node.right.isRealNode():
+				self.countWalk('successorSteps', node.right, y, 'left')
+			else:
+				self.countWalk('successorSteps', node.parent, y, 'parent')
 		return y
 
 	"""returns the minimum of a given sub tree that node is its root
@@ -832,8 +2649,10 @@ class AVLTreeList(object):
 	"""
 	def minimum(self, node):
 		minNode = node
+		minNode.pushDown()
 		while minNode.getLeft().isRealNode():
 			minNode = minNode.getLeft()
+			minNode.pushDown()
 		return minNode
 
 	"""returns the maximum of a given sub tree that node is its root
@@ -853,47 +2672,566 @@ class AVLTreeList(object):
 	"""
 	def maximum(self, node):
 		maxNode = node
+		maxNode.pushDown()
 		while maxNode.getRight().isRealNode():
 			maxNode = maxNode.getRight()
+			maxNode.pushDown()
 		return maxNode
 
 	"""
 	find left subtree with height h
 	help function for join
-	@pre - h>=0
-	@rtype: AVLNode
+	@pre - h>=-1 and h<self.getRoot().getHeight()
+	@rtype: tuple
+	@returns: (node, parent) where node is the subtree on the left spine and parent is its parent.
+	The parent is returned explicitly since node may be the shared virtual node, which has no parent
 	Time complexity: O(self.getRoot().getHeight()-h)
 	"""
 	def find_left_subtree_heightH(self, h):
-		if self.getRoot().getHeight() == h:
-			return self.getRoot()
-		node = self.getRoot()
-		help = node
+		parent = None
+		help = self.getRoot()
 		while h<help.getHeight():
-			if help.getLeft().isRealNode():
-				help = help.getLeft()
-			else:
-				return help.getLeft()
-		return help
+			help.pushDown()
+			parent = help
+			help = help.getLeft()
+		return help, parent
 
 	"""
 	find right subtree with height h
 	help function for join
-	@pre - h>=0
-	@rtype: AVLNode
+	@pre - h>=-1 and h<self.getRoot().getHeight()
+	@rtype: tuple
+	@returns: (node, parent) where node is the subtree on the right spine and parent is its parent.
+	The parent is returned explicitly since node may be the shared virtual node, which has no parent
 	Time complexity: O(self.getRoot().getHeight()-h)
 	"""
 	def find_right_subtree_heightH(self, h):
-		if self.getRoot().getHeight() == h:
-			return self
-		node = self.getRoot()
-		help = node
+		parent = None
+		help = self.getRoot()
 		while h<help.getHeight():
-			if help.getRight().isRealNode():
-				help = help.getRight()
+			help.pushDown()
+			parent = help
+			help = help.getRight()
+		return help, parent
+
+	"""
+	Join the subtrees of 2 root nodes with a connector node x, on the nodes only (no AVLTreeList is created)
+	help function for from_iterable, concat and split
+	As in join, x is the root only if the heights are equal, otherwise it is attached on the spine of the higher
+	subtree (if one of the subtrees is empty, as the last/first node of the other one, as insert does)
+	@pre: all the nodes of leftRoot < x < all the nodes of rightRoot
+	@pre: leftRoot and rightRoot have no parent, each of them may be the virtual node (empty subtree)
+	@pre: x.isRealNode() == True, its pending flip/tag were pushed down and its links may be overwritten
+	@returns: the root of the joined subtree
+	Time complexity: O(abs(height(leftRoot)-height(rightRoot))+1) for attaching x, rebalancing
+	and climbing from x to the new root
+	"""
+	def joinRoots(self, leftRoot, x, rightRoot):
+		leftHeight = leftRoot.getHeight()
+		rightHeight = rightRoot.getHeight()
+		attachTo = None
+		if leftHeight > rightHeight:
+			# x replaces the first subtree of height <= rightHeight on the right spine of leftRoot
+			if self.shared:
+				leftRoot = self.ownRoot(leftRoot)
+			node = leftRoot
+			while node.getHeight() > rightHeight:
+				if self.shared:
+					self.ownSons(node)
+				node.pushDown()
+				attachTo = node
+				node = node.getRight()
+			attachTo.setRight(x)
+			leftRoot = node
+		elif rightHeight > leftHeight:
+			# x replaces the first subtree of height <= leftHeight on the left spine of rightRoot
+			if self.shared:
+				rightRoot = self.ownRoot(rightRoot)
+			node = rightRoot
+			while node.getHeight() > leftHeight:
+				if self.shared:
+					self.ownSons(node)
+				node.pushDown()
+				attachTo = node
+				node = node.getLeft()
+			attachTo.setLeft(x)
+			rightRoot = node
+		x.setLeft(leftRoot)
+		x.setRight(rightRoot)
+		leftRoot.setParent(x)
+		rightRoot.setParent(x)
+		x.setParent(attachTo)
+		x.recomputeHeight()
+		self.recomputeNode(x)
+		if attachTo is None:
+			return x
+
+		# rotations at the top of the subtree would set self.root, which is not the root of this subtree
+		savedRoot = self.root
+		self.reBalance(attachTo)
+		self.root = savedRoot
+		root = attachTo
+		while root.getParent() is not None:
+			root = root.getParent()
+		return root
+
+	"""builds a list from the values of an iterable, in order
+	The values are consumed one by one (the iterable may be a generator), and perfect subtrees are built bottom-up
+	like the carries of a binary counter: the stack holds perfect subtrees of strictly decreasing heights, each
+	(but maybe the top one) with the node that follows it. A new node completes a subtree of the same height as
+	the top one, or starts a new one. At the end the subtrees of the stack are joined from the top down.
+	The height of the result is floor(log2(n)), the minimal height of a tree with n nodes.
+
+	@type values: iterable
+	@param values: the values of the list
+	@param options: keyword arguments for the constructor of the list (nodePool, useFinger, valueIndex, aggregator)
+	@rtype: AVLTreeList
+	@Time complexity:
+	Every node is linked once as a connector of 2 perfect subtrees of the same height - O(1) per node
+	Joining the O(logn) subtrees of the stack at the end - O(logn) each, O(log^2(n)) in total
+	Total: O(n)
+	"""
+	@staticmethod
+	def from_iterable(values, **options):
+		tree = AVLTreeList(**options)
+		tree.fillFromIterable(values)
+		return tree
+
+	"""builds the tree of an empty list from the values of an iterable, in order [see from_iterable]
+
+	@pre: self.empty() == True
+	@type values: iterable
+	@param values: the values of the list
+	@Time complexity: O(n) [see from_iterable]
+	"""
+	def fillFromIterable(self, values):
+		stack = []
+		# the nodes are added to the value index at the end, so the treap of every value is built at once
+		indexed = [] if self.valueIndex is not None else None
+		for val in values:
+			node = self.newNode(val)
+			if indexed is not None:
+				indexed.append(node)
+			if self.first_node is None:
+				self.set_First(node)
+			self.set_Last(node)
+			if stack and stack[-1][1] is None:
+				stack[-1][1] = node
+				continue
+			# every entry of the stack but the top one has a connector
+			while stack and stack[-1][0].getHeight() == node.getHeight():
+				left, connector = stack.pop()
+				connector.setLeft(left)
+				connector.setRight(node)
+				left.setParent(connector)
+				node.setParent(connector)
+				connector.recomputeHeight()
+				self.recomputeNode(connector)
+				node = connector
+			stack.append([node, None])
+
+		root = VIRTUAL_NODE
+		while stack:
+			left, connector = stack.pop()
+			if connector is None:
+				root = left
 			else:
-				return help.getRight()
-		return help
+				root = self.joinRoots(left, connector, root)
+		if root.isRealNode():
+			self.root = root
+		if indexed is not None:
+			self.valueIndex.extend(indexed)
+		self.modCount += 1
+
+	"""inserts the values of an iterable at position i in the list, in order
+	The values are built into a balanced tree [see from_iterable], which is spliced in with split and concat
+
+	@type i: int
+	@pre: 0 <= i <= self.length()
+	@param i: The intended index in the list of the first inserted value
+	@type values: iterable
+	@param values: the values to insert
+	@rtype: int
+	@returns: the number of values inserted
+	@Time complexity:
+	Building the batch of k values - O(k)
+	split - O(logn), insert to the right part - O(logn), 2 concats - O(log(n+k)) each
+	Total: O(k + log(n+k))
+	with a value index: the index costs of the split and the concats [see delete_range]
+	"""
+	def insert_many(self, i, values):
+		if self.stats is not None and self.stats.operation is None:
+			return self.stats.measure('insert_many', self.insert_many, i, values)
+		batch = self.createEmptyList()
+		batch.fillFromIterable(values)
+		k = batch.length()
+		if k == 0:
+			return 0
+		self.modCount += 1
+		if i == self.length():
+			self.concat(batch)
+		elif i == 0:
+			batch.concat(self)
+			self.adoptList(batch)
+		else:
+			left, val, right = self.split(i)
+			right.insert(0, val)
+			left.concat(batch)
+			left.concat(right)
+			self.adoptList(left)
+		# the indices from i on have changed
+		self.moveFinger(None, 0)
+		return k
+
+	"""deletes the items i, i+1, ..., j-1 of the list
+	The range is detached with 2 splits and the rest is joined back with concat, so the cost does not depend
+	on the size of the range. The detached nodes are not released to the node pool, since they may be returned.
+	With a value index, the deleted nodes are not removed from it one by one: the splits and the concat move the
+	entries of the smaller parts between the indices of the parts [see split, concat], and the index of the deleted
+	part is dropped with it. The entries of a value move by a split or a join of its treap [see AVLValueIndex].
+
+	@type i: int
+	@type j: int
+	@pre: 0 <= i <= j <= self.length()
+	@type returnRange: bool
+	@param returnRange: if True, the deleted items are returned as an AVLTreeList
+	@rtype: int or AVLTreeList
+	@returns: the number of deleted items, or the list of the deleted items if returnRange is True
+	@Time complexity: 2 splits, 2 inserts and a concat - O(logn) each, O(logn) in total
+	with a value index: the index costs of the splits and the concat [see splitValueIndex, mergeValueIndex],
+	which are O(logn) expected for a list of few distinct values, and O(min(i, n-i) + min(j-i, n-j)) at most
+	"""
+	def delete_range(self, i, j, returnRange=False):
+		if self.stats is not None and self.stats.operation is None:
+			return self.stats.measure('delete_range', self.delete_range, i, j, returnRange)
+		if i >= j:
+			return self.createEmptyList() if returnRange else 0
+		self.modCount += 1
+		length = self.length()
+		left, firstVal, rest = self.split(i)
+		if j < length:
+			deleted, nextVal, right = rest.split(j - i - 1)
+			right.insert(0, nextVal)
+			left.concat(right)
+		else:
+			deleted = rest
+		self.adoptList(left)
+		if not returnRange:
+			return j - i
+		deleted.insert(0, firstVal)
+		return deleted
+
+	"""applies a batch of index operations, in order, with a single rebalancing pass at the end
+	Every operation sees the list as the previous ones left it, as if they were applied one by one.
+	The operations still walk to the root to fix the sizes and heights on their paths [see deferReBalance],
+	only the rotations and the aggregates are deferred: the nodes whose rebalancing they defer are fixed
+	together afterwards [see fixDirtyNodes], so the ancestors that several operations share (such as the
+	ones near the root) are rotated and get their aggregate recomputed once per batch instead of once per
+	operation.
+
+	@type ops: list
+	@param ops: tuples ("insert", i, val), ("delete", i) or ("set", i, val)
+	@rtype: int
+	@returns: the number of rebalancing operations [see fixDirtyNodes]
+	@raises ValueError: if an operation is unknown, before any operation is applied
+	@raises IndexError: if the index of an operation is out of the range of the list as the previous operations
+	left it, before any operation is applied
+	@Time complexity: O(logn) per operation, the batch may make the tree up to O(log(n)) levels deeper
+	until the final pass [see deferReBalance]
+	"""
+	def apply_batch(self, ops):
+		if self.stats is not None and self.stats.operation is None:
+			return self.stats.measure('apply_batch', self.apply_batch, ops)
+		length = self.length()
+		for op in ops:
+			if op[0] not in ("insert", "delete", "set"):
+				raise ValueError("unknown batch operation %r" % (op[0],))
+			if not 0 <= op[1] <= length or (op[1] == length and op[0] != "insert"):
+				raise IndexError("AVLTreeList index out of range")
+			if op[0] == "insert":
+				length += 1
+			elif op[0] == "delete":
+				length -= 1
+		self.dirtyNodes = []
+		balanceOps = 0
+		try:
+			for op in ops:
+				if op[0] == "insert":
+					balanceOps += self.insert(op[1], op[2])
+				elif op[0] == "delete":
+					balanceOps += self.delete(op[1])
+				else:
+					self.setValue(op[1], op[2])
+		finally:
+			dirtyNodes, self.dirtyNodes = self.dirtyNodes, None
+			balanceOps += self.fixDirtyNodes(dirtyNodes)
+		return balanceOps
+
+	"""assigns val to the items i, i+1, ..., j-1 of the list
+	The update is applied lazily to O(logn) subtrees [see AVLNode.applyTag]
+
+	@type i: int
+	@type j: int
+	@pre: 0 <= i <= j <= self.length()
+	@type val: str
+	@param val: the new value of the items
+	@Time complexity: O(logn) [see updateRange]
+	"""
+	def assign_range(self, i, j, val):
+		if self.stats is not None and self.stats.operation is None:
+			return self.stats.measure('assign_range', self.assign_range, i, j, val)
+		self.updateRange(i, j, val, 0)
+
+	"""adds delta to the items i, i+1, ..., j-1 of the list, which must be numbers
+	The update is applied lazily to O(logn) subtrees [see AVLNode.applyTag]
+
+	@type i: int
+	@type j: int
+	@pre: 0 <= i <= j <= self.length()
+	@type delta: int
+	@param delta: the number added to every item of the range
+	@Time complexity: O(logn) [see updateRange]
+	"""
+	def add_range(self, i, j, delta):
+		if self.stats is not None and self.stats.operation is None:
+			return self.stats.measure('add_range', self.add_range, i, j, delta)
+		if self.aggregator is not None and self.aggregator.addDelta is None:
+			raise ValueError("the aggregator of the list does not support add_range")
+		self.updateRange(i, j, NO_ASSIGN, delta)
+
+	"""applies a range update (an assignment and/or an addition) to the items i, i+1, ..., j-1 of the list
+	Afterwards the paths to the first and last nodes are pushed down, so first() and last() stay O(1),
+	and the finger is dropped since its ancestors may hold pending updates.
+	A value index can not follow a lazy update, so the index keys of the range are updated eagerly.
+
+	@type i: int
+	@type j: int
+	@pre: 0 <= i <= j <= self.length()
+	@param assign: the value assigned to the items, NO_ASSIGN for none
+	@param delta: the number added to the items (after the assignment), 0 for none
+	@Time complexity: O(logn) [see updateSubtree], O(j-i+d*log(k)*logn) expected with a value index [see AVLValueIndex.removeRange]
+	"""
+	def updateRange(self, i, j, assign, delta):
+		if i >= j:
+			return
+		if self.valueIndex is not None:
+			self.valueIndex.removeRange(list(islice(self.iterNodes(i), j - i)), i, self.nodeIndex)
+		self.modCount += 1
+		if self.sharesNodes():
+			# the subtrees that are tagged are sons of the nodes on the paths to the ends of the range
+			self.ownPaths(i, j - 1)
+		self.pendingTags = True
+		self.updateSubtree(self.root, i, j, assign, delta)
+		self.moveFinger(None, 0)
+		self.pushDownPath(self.get_First())
+		self.pushDownPath(self.get_Last())
+		if self.valueIndex is not None:
+			self.valueIndex.insertRange(list(islice(self.iterNodes(i), j - i)), i, self.nodeIndex)
+
+	"""applies a range update to the items i, i+1, ..., j-1 of the subtree of node
+	Whole subtrees are tagged, and the nodes on the 2 paths to the ends of the range are updated and recomputed
+
+	@type node: AVLNode
+	@pre: 0 <= i < j <= node.getSize()
+	@Time complexity: O(height(node)), as aggregateSubtree
+	"""
+	def updateSubtree(self, node, i, j, assign, delta):
+		if i == 0 and j == node.size:
+			node.applyTag(assign, delta, self.aggregator)
+			return
+		node.pushDown()
+		loc = node.left.size
+		if i < loc:
+			self.updateSubtree(node.left, i, min(j, loc), assign, delta)
+		if i <= loc < j:
+			if assign is not NO_ASSIGN:
+				node.value = assign
+			if delta:
+				node.value = node.value + delta
+		if j > loc + 1:
+			self.updateSubtree(node.right, max(i - loc - 1, 0), j - loc - 1, assign, delta)
+		self.recomputeNode(node)
+
+	"""reverses the order of the items i, i+1, ..., j-1 of the list
+	The range is detached with 2 splits as in delete_range, its tree is reversed lazily [see AVLNode.pushDown]
+	and the parts are joined back with concat. The aggregates of the reversed subtrees are not recomputed:
+	a commutative aggregate is unchanged, and the aggregate of a non commutative aggregator is kept in both orders
+	and swapped [see AVLAggregate.reversible].
+
+	@type i: int
+	@type j: int
+	@pre: 0 <= i <= j <= self.length()
+	@Time complexity: 2 splits, 2 inserts and 2 concats - O(logn) each, O(logn) in total
+	with a value index: the index costs of the splits and concats [see delete_range], and O(d) to reverse the
+	treaps of the d distinct values of the range [see reverseList]
+	"""
+	def reverse(self, i, j):
+		if self.stats is not None and self.stats.operation is None:
+			return self.stats.measure('reverse', self.reverse, i, j)
+		if j - i < 2:
+			return
+		self.modCount += 1
+		length = self.length()
+		left, firstVal, middle = self.split(i)
+		if j < length:
+			middle, nextVal, right = middle.split(j - i - 1)
+			right.insert(0, nextVal)
+		else:
+			right = None
+		middle.reverseList()
+		middle.insert(middle.length(), firstVal)
+		left.concat(middle)
+		if right is not None:
+			left.concat(right)
+		self.adoptList(left)
+
+	"""reverses the whole list lazily, only the root is flipped (with its aggregate) [see AVLNode.flipSubtree]
+
+	@Time complexity: O(1), O(d) with a value index of d distinct values, whose treaps are reversed lazily
+	"""
+	def reverseList(self):
+		if self.empty():
+			return
+		self.modCount += 1
+		if self.sharesNodes():
+			self.ownPaths()
+		self.pendingTags = True
+		self.root.flipSubtree(self.aggregator)
+		if self.valueIndex is not None:
+			self.valueIndex.reverse()
+		first = self.get_First()
+		self.set_First(self.get_Last())
+		self.set_Last(first)
+		self.moveFinger(None, 0)
+
+	"""takes the tree of another list as the tree of self, with the owner of its nodes and its share group [see fork],
+	and its value index
+
+	@type lst: AVLTreeList
+	@param lst: a list whose nodes are not used by any other list from now on
+	@Time complexity: O(1)
+	"""
+	def adoptList(self, lst):
+		self.root = lst.getRoot()
+		self.set_First(lst.get_First())
+		self.set_Last(lst.get_Last())
+		self.valueIndex = lst.valueIndex
+		self.owner = lst.owner
+		self.shared = lst.shared
+		if lst.shareGroup is not None:
+			self.joinShareGroup(lst.shareGroup)
+		else:
+			self.leaveShareGroup()
+		self.pendingTags = lst.pendingTags
+
+	"""returns the value index of the concatenation of self and lst, from their indices
+	The smaller index is merged into the larger one. If self has no index, the index of lst is dropped,
+	and if only self has one, the nodes of lst are added to it.
+
+	@type lst: AVLTreeList
+	@param lst: a list that comes after self, whose index is not used afterwards
+	@rtype: AVLValueIndex
+	@returns: the index of the concatenation, None if self has no index
+	@Time complexity: O(d*log(k)) expected, where d <= min(n, len(lst)) is the number of distinct values of the
+	smaller index [see AVLValueIndex.merge], O(len(lst)) if only self has an index
+	"""
+	def mergeValueIndex(self, lst):
+		if self.valueIndex is None:
+			return None
+		if lst.valueIndex is None:
+			self.valueIndex.extend(lst.iterNodes())
+			return self.valueIndex
+		if lst.length() <= self.length():
+			self.valueIndex.merge(lst.valueIndex)
+			return self.valueIndex
+		lst.valueIndex.merge(self.valueIndex, before=True)
+		return lst.valueIndex
+
+	"""moves the value index entries of the smaller part of a split to an index of its own [see split]
+	Before the call both parts use the index of the split list, afterwards the larger part keeps it.
+	The number of nodes of every value in the smaller part is counted by walking it, or, if the index has few
+	distinct values (such as a list of many duplicates), by splitting the treap of every value at the first
+	node that is not in the left part [see AVLValueIndex.countBefore], which takes O(log(k)*logn) per value.
+
+	@type left: AVLTreeList
+	@type right: AVLTreeList
+	@param left, right: the parts of a split of a list with a value index
+	@Time complexity: O(min(m, d*log(k)*logn) + d'*log(k)) expected, where m = min(len(left), len(right)),
+	d is the number of distinct values of the index and d' <= m the number of distinct values of the smaller part
+	"""
+	@staticmethod
+	def splitValueIndex(left, right):
+		prefix = left.length() <= right.length()
+		smaller = left if prefix else right
+		index = smaller.valueIndex
+		length = left.length() + right.length()
+		counts = {}
+		if len(index.roots) * length.bit_length() ** 2 < smaller.length():
+			leftRoot = left.getRoot()
+
+			def inLeft(node):
+				while node.parent is not None:
+					node = node.parent
+				return node is leftRoot
+
+			for value, root in index.roots.items():
+				count = index.countBefore(root, inLeft)
+				if not prefix:
+					count = root.size - count
+				if count:
+					counts[value] = count
+		else:
+			for node in smaller.iterNodes():
+				counts[node.value] = counts.get(node.value, 0) + 1
+		smaller.valueIndex = index.detach(counts, prefix)
+
+	"""replaces the aggregator of the list, and recomputes the aggregates of all the nodes
+	A list without an aggregator may hold plain AVLNodes, which have no aggregate [see AVLExtendedNode], so when
+	an aggregator is set on it, its tree is rebuilt from its values with new nodes (and so is its value index).
+	The nodes that the caller holds are then not in the list anymore, the old nodes are released to the node
+	pool, and the iterators over the list are invalidated [see modCount].
+
+	@type aggregator: AVLAggregate
+	@param aggregator: the new aggregator, None to stop maintaining aggregates
+	@Time complexity: O(n)
+	"""
+	def setAggregator(self, aggregator):
+		if aggregator is not None:
+			aggregator = aggregator.reversible()
+		if self.aggregator is None and aggregator is not None and not self.empty():
+			self.modCount += 1
+			nodes = list(self.iterNodes())
+			self.root = self.first_node = self.last_node = None
+			self.moveFinger(None, 0)
+			if self.valueIndex is not None:
+				self.valueIndex = AVLValueIndex()
+			self.aggregator = aggregator
+			self.fillFromIterable([node.value for node in nodes])
+			# the nodes of a list that shares nodes with a fork may still be used by the fork
+			if not self.shared:
+				for node in nodes:
+					self.releaseNode(node)
+			return
+		self.aggregator = aggregator
+		if self.sharesNodes():
+			self.ownPaths()
+		nodes = []
+		if self.root is not None and self.root.isRealNode():
+			nodes.append(self.root)
+		# nodes is in BFS order, so every node comes after its parent, and is pushed down before its sons are read
+		for node in nodes:
+			if self.shared:
+				self.ownSons(node)
+			node.pushDown()
+			if aggregator is None:
+				node.agg = None
+			if node.left.isRealNode():
+				nodes.append(node.left)
+			if node.right.isRealNode():
+				nodes.append(node.right)
+		if aggregator is not None:
+			for node in reversed(nodes):
+				aggregator.recompute(node)
 
 	"""
 	Join 2 trees T1,T2 with a connector node x
@@ -904,28 +3242,38 @@ class AVLTreeList(object):
 	"""
 	@staticmethod
 	def join(T1, x, T2):
-		new_tree = AVLTreeList()
+		valueIndex = None
+		if T1.valueIndex is not None:
+			T1.valueIndex.append(x)
+			valueIndex = T1.mergeValueIndex(T2)
+		tree, balances = AVLTreeList.joinTrees(T1, x, T2)
+		tree.valueIndex = valueIndex
+		return tree, balances
+
+	"""joins 2 trees with a connector node, without their value indices [see join]
+	"""
+	@staticmethod
+	def joinTrees(T1, x, T2):
+		T1.modCount += 1
+		T2.modCount += 1
+		new_tree = T1.createEmptyList()
 		x.setParent(None)
-		vlNode = AVLNode("")
-		vlNode.setParent(x)
-		vrNode = AVLNode("")
-		vrNode.setParent(x)
-		x.setRight(vrNode)
-		x.setLeft(vlNode)
+		x.setRight(VIRTUAL_NODE)
+		x.setLeft(VIRTUAL_NODE)
 		new_tree.root = x
 		new_tree.set_First(x)
 		new_tree.set_Last(x)
 		x.recomputeHeight()
-		x.recomputeSize()
+		new_tree.recomputeNode(x)
 		#if one of the trees is an empty tree
 		if T1.empty() and T2.empty():
 			return new_tree, 0
 		elif T1.empty() or T2.empty():
 			if T1.empty():
-				balances = T2.insert(0, x.getValue())
+				balances = T2.insertNode(0, x)
 				return T2, balances
 			else:
-				balances = T1.insert(T1.length(), x.getValue())
+				balances = T1.insertNode(T1.length(), x)
 				return T1, balances
 		t1h = T1.getRoot().getHeight()
 		t2h = T2.getRoot().getHeight()
@@ -937,23 +3285,22 @@ class AVLTreeList(object):
 			T1.getRoot().setParent(x)
 			T2.getRoot().setParent(x)
 			x.recomputeHeight()
-			x.recomputeSize()
+			new_tree.recomputeNode(x)
 			new_tree.set_First(T1.get_First())
 			new_tree.set_Last(T2.get_Last())
 			return new_tree, 1
 
 		#t1 height < t2 height
 		elif t1h<t2h:
-			node = T2.find_left_subtree_heightH(t1h)
+			node, help = T2.find_left_subtree_heightH(t1h)
 			x.setLeft(T1.getRoot())
 			x.setRight(node)
-			help = node.getParent()
 			T1.getRoot().setParent(x)
 			node.setParent(x)
 			x.setParent(help)
 			help.setLeft(x)
 			x.recomputeHeight()
-			x.recomputeSize()
+			new_tree.recomputeNode(x)
 			new_tree.set_First(T1.get_First())
 			new_tree.set_Last(T2.get_Last())
 			new_tree.root = T2.getRoot()
@@ -962,16 +3309,15 @@ class AVLTreeList(object):
 
 		#t2 height < t1 height
 		else:
-			node = T1.find_right_subtree_heightH(t2h)
+			node, help = T1.find_right_subtree_heightH(t2h)
 			x.setLeft(node)
 			x.setRight(T2.getRoot())
-			help = node.getParent()
 			T2.getRoot().setParent(x)
 			node.setParent(x)
 			x.setParent(help)
 			help.setRight(x)
 			x.recomputeHeight()
-			x.recomputeSize()
+			new_tree.recomputeNode(x)
 			new_tree.set_First(T1.get_First())
 			new_tree.set_Last(T2.get_Last())
 			new_tree.root = T1.getRoot()
@@ -979,74 +3325,120 @@ class AVLTreeList(object):
 			return new_tree, rebalances
 
 	"""splits the list at the i'th index
+	The split works on raw subtree roots: climbing from the i'th node, every ancestor is joined with its other
+	subtree to the left or the right part [see joinRoots], and the 2 result lists are created only at the end.
+	The first/last nodes of the parts are carried along: the ends of self, and the predecessor/successor of
+	the i'th node, which is either in its subtree or the first ancestor joined to that part.
 
 	@type i: int
 	@pre: 0 <= i < self.length()
 	@param i: The intended index in the list according to whom we split
+	@type costReport: bool
+	@param costReport: True to return a report of the cost of the joins as well
 	@rtype: list
 	@returns: a list [left, val, right], where left is an AVLTreeList representing the list until index i-1,
 	right is an AVLTreeList representing the list from index i+1, and val is the value at the i'th index.
-	Time comlexity: O(logn) with efficient joins as in L03S107
+	If costReport is True, a list [left, val, right, report] where report is a dictionary with:
+		joins - the number of joins
+		heightDiffs - the height difference of every join, in the order of the joins (bottom-up)
+		totalCost, maxCost, averageCost - of the joins, a join costs its height difference + 1
+		allocatedLists - the lists created (the 2 results)
+		allocatedNodes - the nodes copied, since self shares nodes with a fork [see fork]
+	Time comlexity: O(logn) with efficient joins as in L03S107, the joins at the ancestors cost
+	O(height difference + 1) each, which sums up to O(logn). Only the 2 result lists are allocated.
+	With a value index, O(min(m, d*log(k)*logn) + d'*log(k)) expected more to move the entries of the smaller part,
+	where m = min(i, n-i) [see splitValueIndex]
 	"""
-	def split(self, i):
-		balances = 0
+	def split(self, i, costReport=False):
+		if self.stats is not None and self.stats.operation is None:
+			return self.stats.measure('split', self.split, i, costReport)
+		copiedNodes = self.copiedNodes
+		heightDiffs = [] if costReport else None
+		self.modCount += 1
+		if self.sharesNodes():
+			# the predecessor/successor of the i'th node, which become the last/first nodes of the parts,
+			# the path to the i'th node is owned by retrieveNode
+			self.ownPaths(i - 1, i + 1)
 		node = self.retrieveNode(i)
+		self.moveFinger(None, 0)
 		val = node.getValue()
-		L = AVLTreeList()
-		L.root =node.getLeft()
-
-		R = AVLTreeList()
-		R.root = node.getRight()
+		# node leaves the list, it is in none of the results
+		if self.valueIndex is not None:
+			self.valueIndex.remove(node, i, self.nodeIndex)
+
+		leftRoot, rightRoot = node.getLeft(), node.getRight()
+		leftFirst = self.get_First() if i > 0 else None
+		rightLast = self.get_Last() if i < self.length() - 1 else None
+		leftLast = self.maximum(leftRoot) if leftRoot.isRealNode() else None
+		rightFirst = self.minimum(rightRoot) if rightRoot.isRealNode() else None
+		leftRoot.setParent(None)
+		rightRoot.setParent(None)
 
 		help = node.getParent()
+		child = node
+		node.setLeft(VIRTUAL_NODE)
+		node.setRight(VIRTUAL_NODE)
+		node.setParent(None)
 		while help is not None:
-			if help.getLeft() == node:
-				lSon, rSon = True, False
-			else:
-				lSon, rSon = False, True
 			save = help.getParent()
-			if rSon:
-				L, tmp = AVLTreeList.join(self.create_tree_from_node(help.getLeft()), help, L)
+			if help.getRight() is child:
+				subtree = help.getLeft()
+				subtree.setParent(None)
+				if leftLast is None:
+					leftLast = help
+				if costReport:
+					heightDiffs.append(abs(subtree.getHeight() - leftRoot.getHeight()))
+				leftRoot = self.joinRoots(subtree, help, leftRoot)
 			else:
-				R, tmp = AVLTreeList.join(R, help, self.create_tree_from_node(help.getRight()))
-			node = help
+				subtree = help.getRight()
+				subtree.setParent(None)
+				if rightFirst is None:
+					rightFirst = help
+				if costReport:
+					heightDiffs.append(abs(subtree.getHeight() - rightRoot.getHeight()))
+				rightRoot = self.joinRoots(rightRoot, help, subtree)
+			child = help
 			help = save
-			balances +=tmp
 
-		if L.getRoot() is not None and L.getRoot().isRealNode():
-			L.getRoot().setParent(None)
-			if L.getRoot().getLeft() is not None and L.getRoot().getLeft().isRealNode():
-				L.set_First(L.minimum(L.getRoot()))
-			else:
-				L.set_First(L.getRoot())
-				L.getRoot().setLeft(AVLNode(None))
-				L.getRoot().getLeft().setParent(L.getRoot())
-			if L.getRoot().getRight() is not None and L.getRoot().getRight().isRealNode():
-				L.set_Last(L.maximum(L.getRoot()))
-			else:
-				L.set_Last(L.getRoot())
-				L.getRoot().setRight(AVLNode(None))
-				L.getRoot().getRight().setParent(L.getRoot())
-		else:
-			L = AVLTreeList()
-		if R.getRoot() is not None and R.getRoot().isRealNode():
-			R.getRoot().setParent(None)
-			if R.getRoot().getLeft() is not None and R.getRoot().getLeft().isRealNode():
-				R.set_First(R.minimum(R.getRoot()))
-			else:
-				R.set_First(R.getRoot())
-				R.getRoot().setLeft(AVLNode(None))
-				R.getRoot().getLeft().setParent(R.getRoot())
-			if R.getRoot().getRight() is not None and R.getRoot().getRight().isRealNode():
-				R.set_Last(R.maximum(R.getRoot()))
-			else:
-				R.set_Last(R.getRoot())
-				R.getRoot().setRight(AVLNode(None))
-				R.getRoot().getRight().setParent(R.getRoot())
-		else:
-			R = AVLTreeList()
+		L = self.createEmptyList()
+		if leftRoot.isRealNode():
+			L.root = leftRoot
+			L.set_First(leftFirst)
+			L.set_Last(leftLast)
+		R = self.createEmptyList()
+		if rightRoot.isRealNode():
+			R.root = rightRoot
+			R.set_First(rightFirst)
+			R.set_Last(rightLast)
+		if self.valueIndex is not None:
+			L.valueIndex = R.valueIndex = self.valueIndex
+			self.splitValueIndex(L, R)
+		if costReport:
+			return [L, val, R, self.splitCostReport(heightDiffs, self.copiedNodes - copiedNodes)]
 		return [L, val, R]
 
+	"""returns the cost report of a split [see split]
+
+	@type heightDiffs: list
+	@param heightDiffs: the height differences of the joins of the split
+	@type copiedNodes: int
+	@param copiedNodes: the number of nodes copied by the split
+	@rtype: dict
+	@Time complexity: O(len(heightDiffs)) = O(logn)
+	"""
+	@staticmethod
+	def splitCostReport(heightDiffs, copiedNodes):
+		costs = [diff + 1 for diff in heightDiffs]
+		return {
+			'joins': len(costs),
+			'heightDiffs': heightDiffs,
+			'totalCost': sum(costs),
+			'maxCost': max(costs) if costs else 0,
+			'averageCost': sum(costs) / len(costs) if costs else 0,
+			'allocatedLists': 2,
+			'allocatedNodes': copiedNodes,
+		}
+
 
 	"""
 	Create a tree that his root is a given node
@@ -1059,11 +3451,14 @@ class AVLTreeList(object):
 
 	def create_tree_from_node(self, node):
 		node.setParent(None)
-		t = AVLTreeList()
+		t = self.createEmptyList()
 		t.root = node
 		return t
 
 	"""concatenates lst to self
+	The connector of the join is the last node of self or the first node of lst, whichever is in the lower tree,
+	so detaching it costs O(height of the lower tree). Both the detach and the join work on the nodes in place
+	[see detachEnd, joinRoots], no list or node is allocated. lst must not be used afterwards.
 
 	@type lst: AVLTreeList
 	@param lst: a list to be concatenated after self
@@ -1072,57 +3467,261 @@ class AVLTreeList(object):
 	
 	@Time complexity:
 	Worst case:
-	delete - called once - O(logn)
-	insert - called once - O(logn)
-	join - called once - O(logn)
+	detachEnd - called once - O(logn)
+	joinRoots - called once - O(logn)
 	Total: O(logn)
+	With a value index: O(d*log(k)) expected more to merge the indices, where d <= min(n, len(lst)) is the number of
+	distinct values of the smaller one [see mergeValueIndex]
 	"""
 	def concat(self, lst):
+		if self.stats is not None and self.stats.operation is None:
+			return self.stats.measure('concat', self.concat, lst)
+		selfShared = self.sharesNodes()
+		lstShared = lst.sharesNodes()
+		if (selfShared or lstShared) and (self.valueIndex is not None or lst.valueIndex is not None):
+			raise ValueError("a forked list can not be used with a value index")
+		self.modCount += 1
+		lst.modCount += 1
 		selfHeight = -1 if self.getRoot() is None else self.getRoot().getHeight()
 		lstHeight = -1 if lst.getRoot() is None else lst.getRoot().getHeight()
 		absHeightDiff = abs(lstHeight - selfHeight)
 
+		if lst.empty():
+			return absHeightDiff
+
+		if lst.aggregator is not self.aggregator:
+			lst.setAggregator(self.aggregator)
+		self.valueIndex = self.mergeValueIndex(lst)
+		if lst.shared and lst.owner is not self.owner:
+			# lst may share nodes that are owned by self.owner (from before it was forked), so self takes a new owner
+			self.owner = object()
+			if self.shareGroup is lst.shareGroup:
+				# lst may share nodes with self
+				self.shareGroup.permanent = True
+		self.shared = self.shared or lst.shared
+		if lst.shareGroup is not None:
+			# lst is consumed, self takes its nodes
+			self.joinShareGroup(lst.shareGroup)
+			lst.leaveShareGroup()
+		self.pendingTags = self.pendingTags or lst.pendingTags
+
 		if self.empty():
 			self.root = lst.getRoot()
 			self.set_First(lst.get_First())
 			self.set_Last(lst.get_Last())
 			return absHeightDiff
 
-		if lst.empty():
-			return absHeightDiff
+		if self.shared:
+			self.ownPaths()
+			lst.ownPaths()
+
+		last = lst.get_Last()
+		# the indices of self's nodes do not change so only lst's finger is dropped
+		lst.moveFinger(None, 0)
+		if selfHeight < lstHeight:
+			x = self.detachEnd(False)
+		else:
+			x = lst.detachEnd(True)
+			if self.shared:
+				# lst owned x, and it becomes the parent of nodes that self owns
+				x.owner = self.owner
+		leftRoot = VIRTUAL_NODE if self.root is None else self.root
+		rightRoot = VIRTUAL_NODE if lst.root is None else lst.root
+		self.root = self.joinRoots(leftRoot, x, rightRoot)
+		# if x was the only node of self it is still self.get_First()
+		self.set_Last(last)
+		if self.shared:
+			# the nodes of lst are not owned by self, the last one may have been replaced by a copy in joinRoots
+			self.ownPaths()
+		return absHeightDiff
 
-		x = self.get_Last()
+	"""detaches the first or the last node of the list, and rebalances the rest of the tree
+	Unlike deleteNode, the first/last pointers are not updated (the node is about to become a connector,
+	see concat), and the node is not released to the node pool.
 
-		self.delete(self.getRoot().getSize() - 1)
-		joinedTree = AVLTreeList.join(self, x, lst)[0]
+	@type first: bool
+	@param first: True to detach the first node, False to detach the last one
+	@rtype: AVLNode
+	@returns: the detached node, with virtual sons and no parent
+	@Time complexity: O(height of the tree) - the end node has at most one son, and reBalance climbs to the root
+	"""
+	def detachEnd(self, first):
+		node = self.get_First() if first else self.get_Last()
+		self.pushDownPath(node)
+		son = node.getRight() if first else node.getLeft()
+		parent = node.getParent()
+		son.setParent(parent)
+		if parent is None:
+			self.root = son if son.isRealNode() else None
+		elif first:
+			parent.setLeft(son)
+		else:
+			parent.setRight(son)
+		node.setLeft(VIRTUAL_NODE)
+		node.setRight(VIRTUAL_NODE)
+		node.setParent(None)
+		if parent is not None:
+			self.reBalance(parent)
+		return node
 
-		self.root = joinedTree.getRoot()
-		self.set_First(joinedTree.get_First())
-		self.set_Last(joinedTree.get_Last())
+	"""sets the value of the i'th item in the list
 
-		return absHeightDiff
+	@type i: int
+	@pre: 0 <= i < self.length()
+	@type val: str
+	@param val: the new value of the item
+	@Time complexity: O(logn), O(log(k)*logn) expected with a value index [see AVLValueIndex]
+	"""
+	def setValue(self, i, val):
+		if self.stats is not None and self.stats.operation is None:
+			return self.stats.measure('setValue', self.setValue, i, val)
+		node = self.retrieveNode(i)
+		if self.valueIndex is not None:
+			self.valueIndex.remove(node, i, self.nodeIndex)
+			node.setValue(val)
+			self.valueIndex.insert(node, i, self.nodeIndex)
+		else:
+			node.setValue(val)
+		if self.aggregator is not None:
+			if self.dirtyNodes is not None:
+				self.dirtyNodes.append(node)
+				return
+			while node is not None:
+				self.aggregator.recompute(node)
+				node = node.getParent()
+
+	"""returns the index of a node in the list
+
+	@type node: AVLNode
+	@rtype: int
+	@returns: the index of node, -1 if node is not in the list
+	@Time complexity: O(logn)
+	"""
+	def nodeIndex(self, node):
+		self.pushDownPath(node)
+		index = node.getLeft().getSize()
+		while node.getParent() is not None:
+			parent = node.getParent()
+			if parent.getRight() is node:
+				index += parent.getLeft().getSize() + 1
+			node = parent
+		if node is not self.root:
+			return -1
+		return index
+
+	"""returns the aggregate of the items i, i+1, ..., j-1 of the list
+
+	@type i: int
+	@type j: int
+	@pre: 0 <= i <= j <= self.length() and self.aggregator is not None
+	@returns: combine of the lifted values of the range, in order, aggregator.identity if the range is empty
+	@Time complexity: O(logn), at most 2 root to leaf paths are walked and O(logn) subtree aggregates are combined
+	"""
+	def aggregate(self, i, j):
+		if self.stats is not None and self.stats.operation is None:
+			return self.stats.measure('aggregate', self.aggregate, i, j)
+		if self.aggregator is None:
+			raise ValueError("the list has no aggregator")
+		if i >= j:
+			return self.aggregator.result(self.aggregator.identity)
+		if self.sharesNodes() and self.pendingTags:
+			# aggregateSubtree pushes down the paths to the ends of the range
+			self.ownPaths(i, j - 1)
+		return self.aggregator.result(self.aggregateSubtree(self.root, i, j))
+
+	"""returns the aggregate of the items i, i+1, ..., j-1 of the subtree of node
+
+	@type node: AVLNode
+	@pre: 0 <= i < j <= node.getSize()
+	@Time complexity: O(height(node)) [see aggregate]
+	"""
+	def aggregateSubtree(self, node, i, j):
+		if i == 0 and j == node.size:
+			return node.agg
+		node.pushDown()
+		aggregator = self.aggregator
+		loc = node.left.size
+		if j <= loc:
+			return self.aggregateSubtree(node.left, i, j)
+		if i > loc:
+			return self.aggregateSubtree(node.right, i - loc - 1, j - loc - 1)
+		# the range contains node, the left part is a suffix of the left subtree and the right part a prefix of the right one
+		agg = aggregator.liftValue(node.value)
+		if i < loc:
+			agg = aggregator.combine(self.aggregateSubtree(node.left, i, loc), agg)
+		if j > loc + 1:
+			agg = aggregator.combine(agg, self.aggregateSubtree(node.right, 0, j - loc - 1))
+		return agg
 
 	"""searches for a *value* in the list
+	With a value index, the first node holding val is found in the treap of val [see AVLValueIndex.end], and its
+	index by climbing from it to the root.
+	Otherwise the nodes are walked in order and the walk stops at the first match.
 
 	@type val: str
 	@param val: a value to be searched
 	@rtype: int
 	@returns: the first index that contains val, -1 if not found.
-	@Time complexity: O(n) worst case (list to array(O(n), iterate through the array: O(n)) 
+	@Time complexity: O(i+logn) worst case, where i is the returned index (O(n) if val is not found)
+	with a value index: O(logn) expected
 	"""
 	def search(self, val):
-		if self.empty():
-			return -1
-		if self.first() == val:
-			return 0
-		lst = self.listToArray() #O(n), see listToArray time complexity
+		if self.stats is not None and self.stats.operation is None:
+			return self.stats.measure('search', self.search, val)
+		if self.valueIndex is not None:
+			node = self.valueIndex.end(val)
+			return -1 if node is None else self.nodeIndex(node)
 		i = 0
-		for x in lst:
-			if x == val:
+		for value in self:
+			if value == val:
 				return i
 			i += 1
 		return -1
 
+	"""searches for the last occurrence of a *value* in the list, walking the nodes from the end
+
+	@type val: str
+	@param val: a value to be searched
+	@rtype: int
+	@returns: the last index that contains val, -1 if not found.
+	@Time complexity: O(n-i+logn) worst case, where i is the returned index
+	with a value index: O(logn) expected
+	"""
+	def rfind(self, val):
+		if self.stats is not None and self.stats.operation is None:
+			return self.stats.measure('rfind', self.rfind, val)
+		if self.valueIndex is not None:
+			node = self.valueIndex.end(val, False)
+			return -1 if node is None else self.nodeIndex(node)
+		i = self.length() - 1
+		for value in reversed(self):
+			if value == val:
+				return i
+			i -= 1
+		return -1
+
+	"""iterates over all the indices that contain a *value*, in increasing order
+
+	@type val: str
+	@param val: a value to be searched
+	@rtype: iterator
+	@Time complexity: O(n) for the whole iteration, O(1) amortized per node walked
+	with a value index: O(logn) expected per index, the nodes holding val are taken from the index in order
+	"""
+	def search_all(self, val):
+		if self.valueIndex is not None:
+			modCount = self.modCount
+			for node in self.valueIndex.find(val):
+				if modCount != self.modCount:
+					raise RuntimeError("AVLTreeList was modified during iteration")
+				yield self.nodeIndex(node)
+			return
+		i = 0
+		for value in self:
+			if value == val:
+				yield i
+			i += 1
+
 	"""performs a right rotation inplace
 	
 	@pre: called from reBalance function (due to a tree operation)
@@ -1135,7 +3734,13 @@ class AVLTreeList(object):
 	@rtype: None
 	"""
 	def rightRotation(self, BFcriminal):
+		# the sons of both nodes change, so pending reversals are pushed below them first
+		if self.shared:
+			self.ownSons(BFcriminal)
+			self.ownSons(BFcriminal.getLeft())
+		BFcriminal.pushDown()
 		BFcriminalLeftSon = BFcriminal.getLeft()
+		BFcriminalLeftSon.pushDown()
 
 		# B.left <- A.right
 		BFcriminal.setLeft(BFcriminalLeftSon.getRight())
@@ -1163,9 +3768,9 @@ class AVLTreeList(object):
 		BFcriminal.setParent(BFcriminalLeftSon)
 
 		# Recomputes size & height
-		BFcriminal.recomputeSize()
+		self.recomputeNode(BFcriminal)
 		BFcriminal.recomputeHeight()
-		BFcriminalLeftSon.recomputeSize() # A.size <- B.size
+		self.recomputeNode(BFcriminalLeftSon) # A.size <- B.size
 		BFcriminalLeftSon.recomputeHeight()
 
 	"""performs a left rotation inplace
@@ -1180,7 +3785,13 @@ class AVLTreeList(object):
 	@rtype: None
 	"""
 	def leftRotation(self, BFcriminal):
+		# the sons of both nodes change, so pending reversals are pushed below them first
+		if self.shared:
+			self.ownSons(BFcriminal)
+			self.ownSons(BFcriminal.getRight())
+		BFcriminal.pushDown()
 		BFcriminalRightSon = BFcriminal.getRight()
+		BFcriminalRightSon.pushDown()
 
 		#B.right <- A.left
 		BFcriminal.setRight(BFcriminalRightSon.getLeft())
@@ -1208,9 +3819,9 @@ class AVLTreeList(object):
 		BFcriminal.setParent(BFcriminalRightSon)
 
 		#Recomputes size & height
-		BFcriminal.recomputeSize()
+		self.recomputeNode(BFcriminal)
 		BFcriminal.recomputeHeight()
-		BFcriminalRightSon.recomputeSize() #A.size <- B.size
+		self.recomputeNode(BFcriminalRightSon) #A.size <- B.size
 		BFcriminalRightSon.recomputeHeight()
 
 
@@ -1269,18 +3880,25 @@ class AVLTreeList(object):
 	def predecessor(self, node):
 		if not node.isRealNode():
 			return None
+		if self.stats is not None:
+			self.stats.count('predecessor')
 		if self.get_First() == node:
 			return None
+		start = node
 		if node.getLeft() is not None and node.getLeft().isRealNode():
 			help = node.getLeft()
+			help.pushDown()
 			while help.getRight() is not None and help.getRight().isRealNode():
 				help = help.getRight()
-			return help
-
-		help = node.getParent()
-		while help is not None and help.isRealNode():
-			if help.getRight() == node:
-				return help
-			node = help
-			help = help.getParent()
-		return None
\ No newline at end of file
+				help.pushDown()
+		else:
+			help = node.getParent()
+			while help is not None and help.isRealNode() and help.getRight() != node:
+				node = help
+				help = help.getParent()
+		if self.stats is not None:
+			if start.left.isRealNode():
+				self.countWalk('predecessorSteps', start.left, help, 'right')
+			else:
+				self.countWalk('predecessorSteps', start.parent, help, 'parent')
+		return help
\ No newline at end of file
@@ -0,0 +1,664 @@
+#username - eviatars
+#id1      - 322623182
+#name1    - Eviatar Shemesh
+#id2      - 208392290
+#name2    - Yoav Malichi
+
+from array import array
+
+
+"""A class storing the nodes of array backed AVL trees as parallel columns
+
+A node is an integer slot. Its fields are kept in parallel arrays indexed by the slot (struct of arrays)
+instead of in a Python object per node, and its value is kept in a parallel list (so the value index
+of a node is its slot).
+Slot 0 is the virtual node: size 0, height -1. Its fields are never changed, and 0 is used as "no node"
+for the left, right and parent columns.
+Freed slots are kept in a free list and are reused by the next allocations.
+Several lists can share the same store (the results of split share the store of the split list).
+"""
+
+
+class ArrayNodeStore(object):
+	"""Constructor, creates a store with the virtual node only
+
+	@Time complexity: O(1)
+	"""
+	def __init__(self):
+		self.left = array('i', [0])
+		self.right = array('i', [0])
+		self.parent = array('i', [0])
+		self.size = array('i', [0])
+		self.height = array('b', [-1])
+		self.values = [None]
+		self.freeSlots = array('i')
+
+	"""allocates a slot for a new leaf
+
+	@type value: str
+	@param value: the value of the new node
+	@rtype: int
+	@returns: the slot of the new node, a free slot is reused if there is one
+	@Time complexity: O(1) amortized
+	"""
+	def allocate(self, value):
+		if self.freeSlots:
+			slot = self.freeSlots.pop()
+			self.left[slot] = 0
+			self.right[slot] = 0
+			self.parent[slot] = 0
+			self.size[slot] = 1
+			self.height[slot] = 0
+			self.values[slot] = value
+			return slot
+		self.left.append(0)
+		self.right.append(0)
+		self.parent.append(0)
+		self.size.append(1)
+		self.height.append(0)
+		self.values.append(value)
+		return len(self.values) - 1
+
+	"""returns a slot to the free list
+
+	@type slot: int
+	@pre: slot is not 0 and is not linked to any tree
+	@Time complexity: O(1)
+	"""
+	def free(self, slot):
+		self.values[slot] = None
+		self.freeSlots.append(slot)
+
+	"""recomputes the size and the height of a slot inplace
+
+	@type slot: int
+	@pre: slot is not 0
+	@Time complexity: O(1)
+	"""
+	def recompute(self, slot):
+		left = self.left[slot]
+		right = self.right[slot]
+		self.size[slot] = self.size[left] + 1 + self.size[right]
+		leftHeight = self.height[left]
+		rightHeight = self.height[right]
+		self.height[slot] = (leftHeight if leftHeight > rightHeight else rightHeight) + 1
+
+	"""returns the number of slots in use
+
+	@rtype: int
+	@Time complexity: O(1)
+	"""
+	def usedSlots(self):
+		return len(self.values) - 1 - len(self.freeSlots)
+
+
+"""
+A class implementing the ADT list, using an AVL tree whose nodes live in an ArrayNodeStore.
+It has the same API as AVLTreeList, nodes are slots (ints) instead of AVLNode objects.
+Unlike AVLTreeList, split and concat consume their input: split empties self, and concat empties lst
+(whose slots are released to its store if it does not share self's store).
+"""
+
+
+class ArrayAVLTreeList(object):
+
+	"""
+	Constructor
+
+	@type store: ArrayNodeStore
+	@param store: the store to allocate the nodes from, a new store if None
+	"""
+	def __init__(self, store=None):
+		self.store = ArrayNodeStore() if store is None else store
+		self.root = 0
+		self.first_node = 0
+		self.last_node = 0
+
+	"""returns whether the list is empty
+
+	@rtype: bool
+	@returns: True if the list is empty, False otherwise
+	@Time complexity: O(1)
+	"""
+	def empty(self):
+		return self.root == 0
+
+	"""returns the size of the list
+
+	@rtype: int
+	@returns: the size of the list
+	@Time complexity: O(1)
+	"""
+	def length(self):
+		return self.store.size[self.root]
+
+	"""returns the root slot of the tree representing the list
+
+	@rtype: int
+	@returns: the root, 0 if the list is empty
+	@Time complexity: O(1)
+	"""
+	def getRoot(self):
+		return self.root
+
+	"""retrieves the slot of the i'th item in the list
+
+	@type i: int
+	@pre: 0 <= i < self.length()
+	@rtype: int
+	@Time complexity: O(logn) - one iteration per level of the tree
+	"""
+	def retrieveSlot(self, i):
+		left = self.store.left
+		right = self.store.right
+		size = self.store.size
+		node = self.root
+		while True:
+			loc = size[left[node]]
+			if i == loc:
+				return node
+			if i < loc:
+				node = left[node]
+			else:
+				i -= loc + 1
+				node = right[node]
+
+	"""retrieves the value of the i'th item in the list
+
+	@type i: int
+	@pre: 0 <= i < self.length()
+	@rtype: str
+	@Time complexity: O(logn) [see retrieveSlot]
+	"""
+	def retrieve(self, i):
+		return self.store.values[self.retrieveSlot(i)]
+
+	"""returns the value of the first item in the list
+
+	@rtype: str
+	@returns: the value of the first item, None if the list is empty
+	@Time complexity: O(1)
+	"""
+	def first(self):
+		return self.store.values[self.first_node]
+
+	"""returns the value of the last item in the list
+
+	@rtype: str
+	@returns: the value of the last item, None if the list is empty
+	@Time complexity: O(1)
+	"""
+	def last(self):
+		return self.store.values[self.last_node]
+
+	"""returns the slot of the minimum of the subtree of a given slot
+
+	@pre: slot is not 0
+	@Time complexity: O(logn)
+	"""
+	def minimum(self, slot):
+		left = self.store.left
+		while left[slot]:
+			slot = left[slot]
+		return slot
+
+	"""returns the slot of the maximum of the subtree of a given slot
+
+	@pre: slot is not 0
+	@Time complexity: O(logn)
+	"""
+	def maximum(self, slot):
+		right = self.store.right
+		while right[slot]:
+			slot = right[slot]
+		return slot
+
+	"""returns the slot of the successor of a given slot, 0 if it is the last
+
+	@Time complexity: O(logn)
+	"""
+	def successor(self, slot):
+		store = self.store
+		if store.right[slot]:
+			return self.minimum(store.right[slot])
+		parent = store.parent[slot]
+		while parent and store.right[parent] == slot:
+			slot = parent
+			parent = store.parent[slot]
+		return parent
+
+	"""returns the slot of the predecessor of a given slot, 0 if it is the first
+
+	@Time complexity: O(logn)
+	"""
+	def predecessor(self, slot):
+		store = self.store
+		if store.left[slot]:
+			return self.maximum(store.left[slot])
+		parent = store.parent[slot]
+		while parent and store.left[parent] == slot:
+			slot = parent
+			parent = store.parent[slot]
+		return parent
+
+	"""inserts val at position i in the list
+
+	@type i: int
+	@pre: 0 <= i <= self.length()
+	@param i: The intended index in the list to which we insert val
+	@type val: str
+	@param val: the value we insert
+	@rtype: int
+	@returns: the number of rebalancing operation due to AVL rebalancing
+	@Time complexity: O(logn) - retrieveSlot, maximum and reBalance are O(logn) each
+	"""
+	def insert(self, i, val):
+		store = self.store
+		inserted = store.allocate(val)
+		if self.root == 0:
+			self.root = self.first_node = self.last_node = inserted
+			return 0
+
+		if i == 0:
+			node = self.first_node
+			store.left[node] = inserted
+			self.first_node = inserted
+		elif i == self.length():
+			node = self.last_node
+			store.right[node] = inserted
+			self.last_node = inserted
+		else:
+			node = self.retrieveSlot(i)
+			if store.left[node]:
+				node = self.maximum(store.left[node])
+				store.right[node] = inserted
+			else:
+				store.left[node] = inserted
+		store.parent[inserted] = node
+		balanceOps, self.root = self.reBalance(node)
+		return balanceOps
+
+	"""deletes the i'th item in the list
+
+	A node with 2 sons swaps values with its successor (which has at most one son),
+	and the successor's slot is the one that is removed.
+
+	@type i: int
+	@pre: 0 <= i < self.length()
+	@param i: The intended index in the list to be deleted
+	@rtype: int
+	@returns: the number of rebalancing operation due to AVL rebalancing
+	@Time complexity: O(logn) - retrieveSlot, minimum and removeSlot are O(logn) each
+	"""
+	def delete(self, i):
+		store = self.store
+		node = self.retrieveSlot(i)
+		if store.left[node] and store.right[node]:
+			successor = self.minimum(store.right[node])
+			values = store.values
+			values[node], values[successor] = values[successor], values[node]
+			node = successor
+		balanceOps = self.removeSlot(node)
+		store.free(node)
+		return balanceOps
+
+	"""unlinks a slot that has at most one son from the tree, without freeing it
+
+	@type node: int
+	@pre: node is in the tree and has at most one real son
+	@rtype: int
+	@returns: the number of rebalancing operation due to AVL rebalancing
+	@Time complexity: O(logn) - minimum/maximum and reBalance are O(logn) each
+	"""
+	def removeSlot(self, node):
+		store = self.store
+		child = store.left[node] or store.right[node]
+		parent = store.parent[node]
+		if child:
+			store.parent[child] = parent
+		if parent == 0:
+			balanceOps = 0
+			self.root = child
+		else:
+			if store.left[parent] == node:
+				store.left[parent] = child
+			else:
+				store.right[parent] = child
+			balanceOps, self.root = self.reBalance(parent)
+		if node == self.first_node:
+			self.first_node = self.minimum(child) if child else parent
+		if node == self.last_node:
+			self.last_node = self.maximum(child) if child else parent
+		store.left[node] = store.right[node] = store.parent[node] = 0
+		return balanceOps
+
+	"""Re balancing the tree inplace, from a given slot up to the root
+
+	@type node: int
+	@param node: the slot in which we'll start to rebalance the tree up to the root
+	@rtype: tuple
+	@returns: (number of balancing operations, the root of the tree after rebalancing)
+	@Time complexity: O(logn) - O(1) work per ancestor
+	"""
+	def reBalance(self, node):
+		store = self.store
+		left, right, parent, height = store.left, store.right, store.parent, store.height
+		balanceOps = 0
+		while True:
+			balanceFactor = height[left[node]] - height[right[node]]
+			if balanceFactor == 2 or balanceFactor == -2:
+				balanceOps += self.rotate(node, balanceFactor)
+				node = parent[node]
+			else:
+				oldHeight = height[node]
+				store.recompute(node)
+				if height[node] != oldHeight:
+					balanceOps += 1
+			if parent[node] == 0:
+				return balanceOps, node
+			node = parent[node]
+
+	"""Applies the correct rotation on a slot whose balance factor is +2/-2
+
+	@rtype: int
+	@returns: number of balancing operations that took place
+	@Time complexity: O(1)
+	"""
+	def rotate(self, node, balanceFactor):
+		store = self.store
+		height = store.height
+		if balanceFactor == 2:
+			son = store.left[node]
+			if height[store.left[son]] - height[store.right[son]] >= 0:
+				self.rightRotation(node)
+				return 1
+			self.leftRotation(son)
+			self.rightRotation(node)
+			return 2
+		son = store.right[node]
+		if height[store.left[son]] - height[store.right[son]] <= 0:
+			self.leftRotation(node)
+			return 1
+		self.rightRotation(son)
+		self.leftRotation(node)
+		return 2
+
+	"""performs a right rotation inplace on the subtree of a given slot
+
+	@pre: the slot has a real left son
+	@Time complexity: O(1)
+	"""
+	def rightRotation(self, node):
+		store = self.store
+		left, right, parent = store.left, store.right, store.parent
+		son = left[node]
+		grandson = right[son]
+		left[node] = grandson
+		if grandson:
+			parent[grandson] = node
+		right[son] = node
+		nodeParent = parent[node]
+		parent[son] = nodeParent
+		if nodeParent:
+			if left[nodeParent] == node:
+				left[nodeParent] = son
+			else:
+				right[nodeParent] = son
+		parent[node] = son
+		store.recompute(node)
+		store.recompute(son)
+
+	"""performs a left rotation inplace on the subtree of a given slot
+
+	@pre: the slot has a real right son
+	@Time complexity: O(1)
+	"""
+	def leftRotation(self, node):
+		store = self.store
+		left, right, parent = store.left, store.right, store.parent
+		son = right[node]
+		grandson = left[son]
+		right[node] = grandson
+		if grandson:
+			parent[grandson] = node
+		left[son] = node
+		nodeParent = parent[node]
+		parent[son] = nodeParent
+		if nodeParent:
+			if left[nodeParent] == node:
+				left[nodeParent] = son
+			else:
+				right[nodeParent] = son
+		parent[node] = son
+		store.recompute(node)
+		store.recompute(son)
+
+	"""Joins the trees of 2 root slots with a connector slot
+
+	@pre: all the items of leftRoot < x < all the items of rightRoot
+	@pre: leftRoot and rightRoot are roots (their parent is 0), each of them may be 0 (empty tree)
+	@rtype: int
+	@returns: the root slot of the joined tree
+	@Time complexity: O(abs(height(leftRoot) - height(rightRoot)) + 1)
+	"""
+	def joinSlots(self, leftRoot, x, rightRoot):
+		store = self.store
+		left, right, parent, height = store.left, store.right, store.parent, store.height
+		leftHeight = height[leftRoot]
+		rightHeight = height[rightRoot]
+		attachTo = 0
+		if leftHeight > rightHeight + 1:
+			# descend on the right spine of the left tree
+			node = leftRoot
+			while height[node] > rightHeight:
+				attachTo = node
+				node = right[node]
+			right[attachTo] = x
+			leftRoot = node
+		elif rightHeight > leftHeight + 1:
+			# descend on the left spine of the right tree
+			node = rightRoot
+			while height[node] > leftHeight:
+				attachTo = node
+				node = left[node]
+			left[attachTo] = x
+			rightRoot = node
+		left[x] = leftRoot
+		right[x] = rightRoot
+		if leftRoot:
+			parent[leftRoot] = x
+		if rightRoot:
+			parent[rightRoot] = x
+		parent[x] = attachTo
+		store.recompute(x)
+		if attachTo == 0:
+			return x
+		return self.reBalance(attachTo)[1]
+
+	"""splits the list at the i'th index
+
+	@type i: int
+	@pre: 0 <= i < self.length()
+	@param i: The intended index in the list according to whom we split
+	@rtype: list
+	@returns: a list [left, val, right], where left is an ArrayAVLTreeList representing the list until index i-1,
+	right is an ArrayAVLTreeList representing the list from index i+1, and val is the value at the i'th index.
+	Both lists share the store of self, and self is consumed (it is empty after the call).
+	@Time complexity: O(logn) with efficient joins as in L03S107
+	"""
+	def split(self, i):
+		store = self.store
+		left, right, parent = store.left, store.right, store.parent
+		node = self.retrieveSlot(i)
+		val = store.values[node]
+		leftList = ArrayAVLTreeList(store)
+		rightList = ArrayAVLTreeList(store)
+		if node != self.first_node:
+			leftList.first_node = self.first_node
+			leftList.last_node = self.predecessor(node)
+		if node != self.last_node:
+			rightList.first_node = self.successor(node)
+			rightList.last_node = self.last_node
+
+		leftRoot = left[node]
+		rightRoot = right[node]
+		parent[leftRoot] = parent[rightRoot] = 0
+		child = node
+		ancestor = parent[node]
+		while ancestor:
+			nextAncestor = parent[ancestor]
+			parent[ancestor] = 0
+			if right[ancestor] == child:
+				subtree = left[ancestor]
+				parent[subtree] = 0
+				leftRoot = self.joinSlots(subtree, ancestor, leftRoot)
+			else:
+				subtree = right[ancestor]
+				parent[subtree] = 0
+				rightRoot = self.joinSlots(rightRoot, ancestor, subtree)
+			child = ancestor
+			ancestor = nextAncestor
+		# the virtual slot may have been written as a parent above, restore it
+		parent[0] = 0
+
+		leftList.root = leftRoot
+		rightList.root = rightRoot
+		left[node] = right[node] = parent[node] = 0
+		store.free(node)
+		self.root = self.first_node = self.last_node = 0
+		return [leftList, val, rightList]
+
+	"""concatenates lst to self
+	lst is consumed: it is empty after the call. If the lists do not share a store, lst's values are copied
+	into self's store and lst's slots are released to the free list of its own store (O(len(lst))).
+
+	@type lst: ArrayAVLTreeList
+	@param lst: a list to be concatenated after self
+	@rtype: int
+	@returns: the absolute value of the difference between the height of the AVL trees joined
+	@Time complexity: O(logn) if the lists share a store
+	"""
+	def concat(self, lst):
+		store = self.store
+		absHeightDiff = abs(store.height[self.root] - lst.store.height[lst.root])
+		if lst.store is not store:
+			values = lst.listToArray()
+			lst.releaseSlots()
+			lst = ArrayAVLTreeList.fromList(values, store)
+		if lst.empty():
+			return absHeightDiff
+		root, firstNode, lastNode = lst.root, lst.first_node, lst.last_node
+		lst.root = lst.first_node = lst.last_node = 0
+		if self.empty():
+			self.root = root
+			self.first_node = firstNode
+			self.last_node = lastNode
+			return absHeightDiff
+
+		x = self.last_node
+		self.removeSlot(x)
+		self.root = self.joinSlots(self.root, x, root)
+		if self.first_node == 0:
+			self.first_node = x
+		self.last_node = lastNode
+		return absHeightDiff
+
+	"""empties the list, and returns all of its slots to the free list of its store
+
+	@Time complexity: O(n) - every slot is visited once
+	"""
+	def releaseSlots(self):
+		store = self.store
+		left, right = store.left, store.right
+		stack = [self.root] if self.root else []
+		while stack:
+			node = stack.pop()
+			if left[node]:
+				stack.append(left[node])
+			if right[node]:
+				stack.append(right[node])
+			left[node] = right[node] = store.parent[node] = 0
+			store.free(node)
+		self.root = self.first_node = self.last_node = 0
+
+	"""builds a balanced list from a python list of values
+
+	@type values: list
+	@type store: ArrayNodeStore
+	@param store: the store to allocate the nodes from, a new store if None
+	@rtype: ArrayAVLTreeList
+	@Time complexity: O(n) - every value is allocated and linked once
+	"""
+	@staticmethod
+	def fromList(values, store=None):
+		lst = ArrayAVLTreeList(store)
+		store = lst.store
+
+		def buildRec(low, high):
+			if low >= high:
+				return 0
+			middle = (low + high) // 2
+			leftRoot = buildRec(low, middle)
+			node = store.allocate(values[middle])
+			rightRoot = buildRec(middle + 1, high)
+			store.left[node] = leftRoot
+			store.right[node] = rightRoot
+			if leftRoot:
+				store.parent[leftRoot] = node
+			if rightRoot:
+				store.parent[rightRoot] = node
+			store.recompute(node)
+			return node
+
+		lst.root = buildRec(0, len(values))
+		if lst.root:
+			lst.first_node = lst.minimum(lst.root)
+			lst.last_node = lst.maximum(lst.root)
+		return lst
+
+	"""returns an array representing list
+
+	@rtype: list
+	@returns: a list of strings representing the data structure
+	@Time complexity: O(n) - in-order walk with an explicit stack, every slot is pushed and popped once
+	"""
+	def listToArray(self):
+		store = self.store
+		left, right, values = store.left, store.right, store.values
+		lst = []
+		stack = []
+		node = self.root
+		while stack or node:
+			while node:
+				stack.append(node)
+				node = left[node]
+			node = stack.pop()
+			lst.append(values[node])
+			node = right[node]
+		return lst
+
+	"""searches for a *value* in the list
+
+	@type val: str
+	@param val: a value to be searched
+	@rtype: int
+	@returns: the first index that contains val, -1 if not found.
+	@Time complexity: O(n) worst case - in-order walk as in listToArray, which stops at the first match
+	and does not copy the list
+	"""
+	def search(self, val):
+		store = self.store
+		left, right, values = store.left, store.right, store.values
+		stack = []
+		node = self.root
+		i = 0
+		while stack or node:
+			while node:
+				stack.append(node)
+				node = left[node]
+			node = stack.pop()
+			if values[node] == val:
+				return i
+			i += 1
+			node = right[node]
+		return -1
@@ -0,0 +1,276 @@
+#username - eviatars
+#id1      - 322623182
+#name1    - Eviatar Shemesh
+#id2      - 208392290
+#name2    - Yoav Malichi
+
+
+import threading
+
+from AVLTreeList import AVLTreeList
+
+
+"""A reader-writer lock: any number of readers, or a single writer
+
+Writers are preferred: once a writer waits, new readers wait until it is done, so a steady stream of
+readers can not starve the writers. The lock is not reentrant.
+"""
+
+
+class ReadWriteLock(object):
+	"""Constructor"""
+	def __init__(self):
+		self.condition = threading.Condition(threading.Lock())
+		self.readers = 0
+		self.writer = False
+		self.waitingWriters = 0
+
+	"""acquires the lock for reading, waits while a writer holds it or waits for it"""
+	def acquireRead(self):
+		with self.condition:
+			while self.writer or self.waitingWriters:
+				self.condition.wait()
+			self.readers += 1
+
+	"""releases the lock that was acquired for reading"""
+	def releaseRead(self):
+		with self.condition:
+			self.readers -= 1
+			if self.readers == 0:
+				self.condition.notify_all()
+
+	"""acquires the lock for writing, waits until no reader or writer holds it"""
+	def acquireWrite(self):
+		with self.condition:
+			self.waitingWriters += 1
+			while self.writer or self.readers:
+				self.condition.wait()
+			self.waitingWriters -= 1
+			self.writer = True
+
+	"""releases the lock that was acquired for writing"""
+	def releaseWrite(self):
+		with self.condition:
+			self.writer = False
+			self.condition.notify_all()
+
+
+"""
+A thread-safe facade over AVLTreeList
+
+Reads run concurrently under the read lock and writes are serialized under the write lock [see ReadWriteLock].
+A read of an AVLTreeList is not always free of writes: pushing down pending reversals/range updates
+[see AVLNode.pushDown] modifies the nodes, and the finger moves on every access. Reads of a list that may do
+so are serialized like writes [see readsModify]. The first such read pushes down all the pending tags, so the
+reads that follow run concurrently again. The reads of a list with stats [see AVLTreeList.enable_stats] are
+serialized too, since the counters are not thread-safe. A forked list is unshared [see AVLTreeList.sharesNodes] only under
+the write lock.
+
+Iteration is done over a copy of the values, so the lock is not held between the steps of an iterator,
+and the iterator never sees a concurrent write.
+"""
+
+
+class ConcurrentAVLTreeList(object):
+
+	"""
+	Constructor
+
+	@type lst: AVLTreeList
+	@param lst: the list to wrap, which must not be used directly afterwards, None for a new empty list
+	"""
+	def __init__(self, lst=None):
+		self.lst = AVLTreeList() if lst is None else lst
+		self.lst.autoUnshare = False
+		self.lock = ReadWriteLock()
+
+	"""returns whether a read of the wrapped list may modify it (see the class documentation)
+
+	@pre: the lock is held
+	@rtype: bool
+	@Time complexity: O(1)
+	"""
+	def readsModify(self):
+		lst = self.lst
+		return lst.pendingTags or (lst.useFinger and not lst.shared) or lst.stats is not None
+
+	"""calls a method of the wrapped list under the read lock, or under the write lock if reads modify it
+
+	@type name: str
+	@param name: the name of an AVLTreeList method
+	@returns: the result of the method
+	"""
+	def read(self, name, *args):
+		lock = self.lock
+		lock.acquireRead()
+		try:
+			if not self.readsModify():
+				return getattr(self.lst, name)(*args)
+		finally:
+			lock.releaseRead()
+		lock.acquireWrite()
+		try:
+			self.lst.pushDownAll()
+			return getattr(self.lst, name)(*args)
+		finally:
+			lock.releaseWrite()
+
+	"""calls a method of the wrapped list under the write lock
+
+	@type name: str
+	@param name: the name of an AVLTreeList method
+	@returns: the result of the method
+	"""
+	def write(self, name, *args):
+		lock = self.lock
+		lock.acquireWrite()
+		try:
+			self.lst.updateSharing()
+			return getattr(self.lst, name)(*args)
+		finally:
+			lock.releaseWrite()
+
+	"""returns whether the list is empty
+
+	@rtype: bool
+	"""
+	def empty(self):
+		return self.read('empty')
+
+	"""returns the size of the list
+
+	@rtype: int
+	"""
+	def length(self):
+		return self.read('length')
+
+	"""retrieves the value of the i'th item in the list [see AVLTreeList.retrieve]
+
+	@type i: int
+	@pre: 0 <= i < self.length()
+	@rtype: str
+	"""
+	def retrieve(self, i):
+		return self.read('retrieve', i)
+
+	"""returns the value of the first item in the list, None if the list is empty
+
+	@rtype: str
+	"""
+	def first(self):
+		return self.read('first')
+
+	"""returns the value of the last item in the list, None if the list is empty
+
+	@rtype: str
+	"""
+	def last(self):
+		return self.read('last')
+
+	"""searches for a *value* in the list [see AVLTreeList.search]
+
+	@type val: str
+	@rtype: int
+	@returns: the first index that contains val, -1 if not found.
+	"""
+	def search(self, val):
+		return self.read('search', val)
+
+	"""returns an array representing the list
+
+	@rtype: list
+	"""
+	def listToArray(self):
+		return self.read('listToArray')
+
+	"""returns a snapshot of the list, an AVLTreeList that is not affected by later writes [see AVLTreeList.fork]
+	The snapshot is owned by the caller and is not thread-safe itself. The writes that follow a snapshot
+	copy the nodes they modify, and never modify the nodes the snapshot reads (only the parent pointers of
+	shared nodes, which a forked list does not follow). Unlike the wrapped list, the snapshot unshares itself
+	[see AVLTreeList.autoUnshare] once the other lists of its share group are garbage collected.
+
+	@rtype: AVLTreeList
+	@raises ValueError: if the list has a value index, which can not be forked
+	@Time complexity: O(1)
+	"""
+	def snapshot(self):
+		snapshot = self.write('fork')
+		snapshot.autoUnshare = True
+		return snapshot
+
+	"""iterates over the values of the list, as they were when the iteration started
+	The values are copied under the lock, rather than read from a snapshot, since a fork would make the writes
+	that follow copy the nodes they modify.
+
+	@rtype: iterator
+	@Time complexity: O(n)
+	"""
+	def __iter__(self):
+		return iter(self.listToArray())
+
+	"""inserts val at position i in the list [see AVLTreeList.insert]
+
+	@type i: int
+	@pre: 0 <= i <= self.length()
+	@rtype: int
+	@returns: the number of rebalancing operation due to AVL rebalancing
+	"""
+	def insert(self, i, val):
+		return self.write('insert', i, val)
+
+	"""deletes the i'th item in the list [see AVLTreeList.delete]
+
+	@type i: int
+	@pre: 0 <= i < self.length()
+	@rtype: int
+	@returns: the number of rebalancing operation due to AVL rebalancing
+	"""
+	def delete(self, i):
+		return self.write('delete', i)
+
+	"""sets the value of the i'th item in the list [see AVLTreeList.setValue]
+
+	@type i: int
+	@pre: 0 <= i < self.length()
+	"""
+	def setValue(self, i, val):
+		return self.write('setValue', i, val)
+
+	"""splits the list at the i'th index [see AVLTreeList.split]
+	The nodes move to the results, so self is left empty (rather than unusable, since other threads may read it)
+
+	@type i: int
+	@pre: 0 <= i < self.length()
+	@rtype: list
+	@returns: a list [left, val, right] where left and right are ConcurrentAVLTreeLists
+	"""
+	def split(self, i):
+		self.lock.acquireWrite()
+		try:
+			left, val, right = self.lst.split(i)
+			self.lst = self.lst.createEmptyList()
+		finally:
+			self.lock.releaseWrite()
+		return [ConcurrentAVLTreeList(left), val, ConcurrentAVLTreeList(right)]
+
+	"""concatenates lst to self [see AVLTreeList.concat]
+	Both lists are locked for writing, in a fixed order so concurrent concats do not deadlock, and lst is left empty
+
+	@type lst: ConcurrentAVLTreeList
+	@param lst: a list to be concatenated after self
+	@rtype: int
+	@returns: the absolute value of the difference between the height of the AVL trees joined
+	"""
+	def concat(self, lst):
+		if lst is self:
+			raise ValueError("a list can not be concatenated to itself")
+		locks = sorted([self.lock, lst.lock], key=id)
+		for lock in locks:
+			lock.acquireWrite()
+		try:
+			absHeightDiff = self.lst.concat(lst.lst)
+			lst.lst = lst.lst.createEmptyList()
+		finally:
+			for lock in reversed(locks):
+				lock.releaseWrite()
+		return absHeightDiff
@@ -0,0 +1,418 @@
+#username - eviatars
+#id1      - 322623182
+#name1    - Eviatar Shemesh
+#id2      - 208392290
+#name2    - Yoav Malichi
+
+
+"""A class representing an immutable node of a persistent AVL tree
+
+A node is never changed after it is created, so a subtree can be shared by any number of versions of a list.
+There are no parent pointers (a shared subtree has many parents), the size and the height are computed
+from the sons when the node is created.
+"""
+
+
+class PersistentAVLNode(object):
+	__slots__ = ('value', 'left', 'right', 'size', 'height')
+
+	"""Constructor
+
+	@type value: str
+	@param value: data of the node
+	@type left: PersistentAVLNode
+	@param left: the left son, EMPTY_NODE for none
+	@type right: PersistentAVLNode
+	@param right: the right son, EMPTY_NODE for none
+	@Time complexity: O(1)
+	"""
+	def __init__(self, value, left, right):
+		self.value = value
+		self.left = left
+		self.right = right
+		if left is None:
+			# the empty node
+			self.size = 0
+			self.height = -1
+		else:
+			self.size = left.size + 1 + right.size
+			self.height = max(left.height, right.height) + 1
+
+	"""returns whether self is a real node (not the empty node)
+
+	@rtype: bool
+	@Time complexity: O(1)
+	"""
+	def isRealNode(self):
+		return self.height != -1
+
+
+"""The shared empty subtree, the son of every node that has no real son"""
+EMPTY_NODE = PersistentAVLNode(None, None, None)
+
+
+"""
+A class implementing the ADT list, using a persistent AVL tree.
+A list is never changed: insert, delete, split and concat return new lists, which share with self all the
+subtrees that the operation does not touch (path copying). An update creates O(logn) new nodes, and every
+older version stays valid, so a snapshot of a list is the list itself.
+"""
+
+
+class PersistentAVLTreeList(object):
+
+	"""
+	Constructor
+
+	@type root: PersistentAVLNode
+	@param root: the root of the tree of the list, EMPTY_NODE for an empty list
+	"""
+	def __init__(self, root=EMPTY_NODE):
+		self.root = root
+
+	"""returns whether the list is empty
+
+	@rtype: bool
+	@returns: True if the list is empty, False otherwise
+	@Time complexity: O(1)
+	"""
+	def empty(self):
+		return not self.root.isRealNode()
+
+	"""returns the size of the list
+
+	@rtype: int
+	@returns: the size of the list
+	@Time complexity: O(1)
+	"""
+	def length(self):
+		return self.root.size
+
+	"""returns the root of the tree representing the list
+
+	@rtype: PersistentAVLNode
+	@returns: the root, None if the list is empty
+	@Time complexity: O(1)
+	"""
+	def getRoot(self):
+		return self.root if self.root.isRealNode() else None
+
+	"""returns a snapshot of the list, a version that no later update can change
+
+	@rtype: PersistentAVLTreeList
+	@returns: self, since a persistent list is never changed
+	@Time complexity: O(1)
+	"""
+	def snapshot(self):
+		return self
+
+	"""retrieves the value of the i'th item in the list
+
+	@type i: int
+	@pre: 0 <= i < self.length()
+	@rtype: str
+	@Time complexity: O(logn) - one iteration per level of the tree
+	"""
+	def retrieve(self, i):
+		node = self.root
+		while True:
+			loc = node.left.size
+			if i == loc:
+				return node.value
+			if i < loc:
+				node = node.left
+			else:
+				i -= loc + 1
+				node = node.right
+
+	"""returns the value of the first item in the list
+
+	@rtype: str
+	@returns: the value of the first item, None if the list is empty
+	@Time complexity: O(logn) - there is no first pointer, it would have to be copied by every version
+	"""
+	def first(self):
+		if self.empty():
+			return None
+		return PersistentAVLTreeList.minimum(self.root).value
+
+	"""returns the value of the last item in the list
+
+	@rtype: str
+	@returns: the value of the last item, None if the list is empty
+	@Time complexity: O(logn) [see first]
+	"""
+	def last(self):
+		if self.empty():
+			return None
+		return PersistentAVLTreeList.maximum(self.root).value
+
+	"""returns a new list with val inserted at position i
+
+	@type i: int
+	@pre: 0 <= i <= self.length()
+	@type val: str
+	@rtype: PersistentAVLTreeList
+	@Time complexity: O(logn), O(logn) new nodes [see insertNode]
+	"""
+	def insert(self, i, val):
+		return PersistentAVLTreeList(PersistentAVLTreeList.insertNode(self.root, i, val))
+
+	"""returns a new list without the i'th item
+
+	@type i: int
+	@pre: 0 <= i < self.length()
+	@rtype: PersistentAVLTreeList
+	@Time complexity: O(logn), O(logn) new nodes [see deleteNode]
+	"""
+	def delete(self, i):
+		return PersistentAVLTreeList(PersistentAVLTreeList.deleteNode(self.root, i))
+
+	"""splits the list at the i'th index
+
+	@type i: int
+	@pre: 0 <= i < self.length()
+	@rtype: list
+	@returns: a list [left, val, right], where left is a PersistentAVLTreeList of the items before index i,
+	right is a PersistentAVLTreeList of the items after index i, and val is the value at the i'th index.
+	self is not changed.
+	@Time complexity: O(logn) [see splitNode]
+	"""
+	def split(self, i):
+		leftRoot, val, rightRoot = PersistentAVLTreeList.splitNode(self.root, i)
+		return [PersistentAVLTreeList(leftRoot), val, PersistentAVLTreeList(rightRoot)]
+
+	"""returns the concatenation of self and lst, neither of them is changed
+
+	@type lst: PersistentAVLTreeList
+	@rtype: PersistentAVLTreeList
+	@Time complexity: removing the last node of self and joinNodes - O(logn) each, O(logn) in total
+	"""
+	def concat(self, lst):
+		if self.empty():
+			return lst
+		if lst.empty():
+			return self
+		val, leftRoot = PersistentAVLTreeList.removeMaximum(self.root)
+		return PersistentAVLTreeList(PersistentAVLTreeList.joinNodes(leftRoot, val, lst.root))
+
+	"""iterates over the values of the list in order
+
+	@rtype: iterator
+	@Time complexity: O(n) for the whole iteration - in-order walk with an explicit stack
+	"""
+	def __iter__(self):
+		stack = []
+		node = self.root
+		while stack or node.isRealNode():
+			while node.isRealNode():
+				stack.append(node)
+				node = node.left
+			node = stack.pop()
+			yield node.value
+			node = node.right
+
+	"""returns an array representing list
+
+	@rtype: list
+	@returns: a list of strings representing the data structure
+	@Time complexity: O(n) [see __iter__]
+	"""
+	def listToArray(self):
+		return list(self)
+
+	"""searches for a *value* in the list
+
+	@type val: str
+	@param val: a value to be searched
+	@rtype: int
+	@returns: the first index that contains val, -1 if not found.
+	@Time complexity: O(n) worst case, the walk stops at the first match
+	"""
+	def search(self, val):
+		for i, value in enumerate(self):
+			if value == val:
+				return i
+		return -1
+
+	"""builds a balanced list from a python list of values
+
+	@type values: list
+	@rtype: PersistentAVLTreeList
+	@Time complexity: O(n) - every node is created once
+	"""
+	@staticmethod
+	def fromList(values):
+		def buildRec(low, high):
+			if low >= high:
+				return EMPTY_NODE
+			middle = (low + high) // 2
+			return PersistentAVLNode(values[middle], buildRec(low, middle), buildRec(middle + 1, high))
+
+		return PersistentAVLTreeList(buildRec(0, len(values)))
+
+	"""returns the leftmost node of a subtree
+
+	@type node: PersistentAVLNode
+	@pre: node.isRealNode() == True
+	@Time complexity: O(logn)
+	"""
+	@staticmethod
+	def minimum(node):
+		while node.left.isRealNode():
+			node = node.left
+		return node
+
+	"""returns the rightmost node of a subtree
+
+	@type node: PersistentAVLNode
+	@pre: node.isRealNode() == True
+	@Time complexity: O(logn)
+	"""
+	@staticmethod
+	def maximum(node):
+		while node.right.isRealNode():
+			node = node.right
+		return node
+
+	"""creates a node from a value and 2 subtrees whose heights differ by at most 2, rotating if needed
+	The rotations create new nodes instead of changing the sons, so the given subtrees are not changed.
+
+	@type left: PersistentAVLNode
+	@type right: PersistentAVLNode
+	@pre: abs(left.height - right.height) <= 2, and both are AVL trees
+	@rtype: PersistentAVLNode
+	@returns: the root of an AVL tree of the items of left, then value, then the items of right
+	@Time complexity: O(1), at most 3 new nodes
+	"""
+	@staticmethod
+	def balancedNode(value, left, right):
+		balanceFactor = left.height - right.height
+		if balanceFactor > 1:
+			if left.left.height >= left.right.height:
+				# right rotation
+				return PersistentAVLNode(left.value, left.left, PersistentAVLNode(value, left.right, right))
+			# left then right rotation
+			grandson = left.right
+			return PersistentAVLNode(grandson.value, PersistentAVLNode(left.value, left.left, grandson.left),
+									 PersistentAVLNode(value, grandson.right, right))
+		if balanceFactor < -1:
+			if right.right.height >= right.left.height:
+				# left rotation
+				return PersistentAVLNode(right.value, PersistentAVLNode(value, left, right.left), right.right)
+			# right then left rotation
+			grandson = right.left
+			return PersistentAVLNode(grandson.value, PersistentAVLNode(value, left, grandson.left),
+									 PersistentAVLNode(right.value, grandson.right, right.right))
+		return PersistentAVLNode(value, left, right)
+
+	"""returns the root of a copy of a subtree with val inserted at position i, sharing the untouched subtrees
+
+	@type node: PersistentAVLNode
+	@pre: 0 <= i <= node.size
+	@Time complexity: O(logn) - a new node (and maybe a rotation) per level of the path to position i
+	"""
+	@staticmethod
+	def insertNode(node, i, val):
+		if not node.isRealNode():
+			return PersistentAVLNode(val, EMPTY_NODE, EMPTY_NODE)
+		loc = node.left.size
+		if i <= loc:
+			return PersistentAVLTreeList.balancedNode(node.value, PersistentAVLTreeList.insertNode(node.left, i, val),
+													  node.right)
+		return PersistentAVLTreeList.balancedNode(node.value, node.left,
+												  PersistentAVLTreeList.insertNode(node.right, i - loc - 1, val))
+
+	"""returns the root of a copy of a subtree without its i'th item, sharing the untouched subtrees
+
+	@type node: PersistentAVLNode
+	@pre: 0 <= i < node.size
+	@Time complexity: O(logn) - a new node (and maybe a rotation) per level of the path to the i'th node
+	and to its successor
+	"""
+	@staticmethod
+	def deleteNode(node, i):
+		loc = node.left.size
+		if i < loc:
+			return PersistentAVLTreeList.balancedNode(node.value, PersistentAVLTreeList.deleteNode(node.left, i),
+													  node.right)
+		if i > loc:
+			return PersistentAVLTreeList.balancedNode(node.value, node.left,
+													  PersistentAVLTreeList.deleteNode(node.right, i - loc - 1))
+		if not node.left.isRealNode():
+			return node.right
+		if not node.right.isRealNode():
+			return node.left
+		# the successor takes the place of the node
+		val, rightRoot = PersistentAVLTreeList.removeMinimum(node.right)
+		return PersistentAVLTreeList.balancedNode(val, node.left, rightRoot)
+
+	"""removes the leftmost node of a subtree
+
+	@type node: PersistentAVLNode
+	@pre: node.isRealNode() == True
+	@rtype: tuple
+	@returns: (value, root), the value of the removed node and the root of the rest of the subtree
+	@Time complexity: O(logn)
+	"""
+	@staticmethod
+	def removeMinimum(node):
+		if not node.left.isRealNode():
+			return node.value, node.right
+		val, leftRoot = PersistentAVLTreeList.removeMinimum(node.left)
+		return val, PersistentAVLTreeList.balancedNode(node.value, leftRoot, node.right)
+
+	"""removes the rightmost node of a subtree
+
+	@type node: PersistentAVLNode
+	@pre: node.isRealNode() == True
+	@rtype: tuple
+	@returns: (value, root), the value of the removed node and the root of the rest of the subtree
+	@Time complexity: O(logn)
+	"""
+	@staticmethod
+	def removeMaximum(node):
+		if not node.right.isRealNode():
+			return node.value, node.left
+		val, rightRoot = PersistentAVLTreeList.removeMaximum(node.right)
+		return val, PersistentAVLTreeList.balancedNode(node.value, node.left, rightRoot)
+
+	"""joins 2 subtrees with a connector value, as AVLTreeList.join but on new nodes only
+
+	@type left: PersistentAVLNode
+	@type right: PersistentAVLNode
+	@pre: all the items of left come before val, and all the items of right after it
+	@rtype: PersistentAVLNode
+	@returns: the root of an AVL tree of the items of left, then val, then the items of right
+	@Time complexity: O(abs(left.height - right.height) + 1) - the spine of the higher subtree is copied
+	down to the first subtree whose height is close to the lower one
+	"""
+	@staticmethod
+	def joinNodes(left, val, right):
+		if left.height > right.height + 1:
+			return PersistentAVLTreeList.balancedNode(left.value, left.left,
+													  PersistentAVLTreeList.joinNodes(left.right, val, right))
+		if right.height > left.height + 1:
+			return PersistentAVLTreeList.balancedNode(right.value,
+													  PersistentAVLTreeList.joinNodes(left, val, right.left), right.right)
+		return PersistentAVLNode(val, left, right)
+
+	"""splits a subtree at its i'th item
+
+	@type node: PersistentAVLNode
+	@pre: 0 <= i < node.size
+	@rtype: tuple
+	@returns: (leftRoot, val, rightRoot), the roots of the items before and after the i'th item and its value
+	@Time complexity: O(logn) - the joins on the way back up cost O(height difference + 1) each, which sums
+	up to O(logn) as in AVLTreeList.split
+	"""
+	@staticmethod
+	def splitNode(node, i):
+		loc = node.left.size
+		if i < loc:
+			leftRoot, val, rightRoot = PersistentAVLTreeList.splitNode(node.left, i)
+			return leftRoot, val, PersistentAVLTreeList.joinNodes(rightRoot, node.value, node.right)
+		if i > loc:
+			leftRoot, val, rightRoot = PersistentAVLTreeList.splitNode(node.right, i - loc - 1)
+			return PersistentAVLTreeList.joinNodes(node.left, node.value, leftRoot), val, rightRoot
+		return node.left, node.value, node.right
@@ -1,8 +1,10 @@
 import sys
+import gc
+import weakref
 import unittest
 from AVLTreeList import AVLNode
-from AVLTreeList import AVLTreeList
-from utils.tester_utils import createTreeFromList, treesEqual, nodesEqual, setFields, createTreeFromListInsert
+from AVLTreeList import AVLTreeList, AVLExtendedNode, AVLNodePool, AVLValueIndex, AVLAggregate, VIRTUAL_NODE
+from utils.tester_utils import createTreeFromList, treesEqual, nodesEqual, setFields, createTreeFromListInsert, isValidAVLTreeList
 from utils.print_tree import printTreeString
 import logging
 import random
@@ -2259,5 +2261,1092 @@ class Test_AVL_Tree_list(unittest.TestCase):
             logger.debug("\n" + printTreeString(t))
         logger.debug(printTreeString(t))
 
+    def test_virtualNodeIsShared(self):
+        random.seed(1)
+        tree = AVLTreeList()
+        values = []
+        for i in range(300):
+            index = random.randint(0, len(values))
+            tree.insert(index, str(i))
+            values.insert(index, str(i))
+        for i in range(100):
+            index = random.randint(0, len(values) - 1)
+            tree.delete(index)
+            values.pop(index)
+        self.assertTrue(isValidAVLTreeList(tree))
+        self.assertEqual(values, tree.listToArray())
+
+        # every virtual son in the tree is the single shared virtual node
+        stack = [tree.getRoot()]
+        while stack:
+            node = stack.pop()
+            for son in (node.getLeft(), node.getRight()):
+                if son.isRealNode():
+                    stack.append(son)
+                else:
+                    self.assertIs(VIRTUAL_NODE, son)
+
+        left, val, right = tree.split(57)
+        self.assertTrue(isValidAVLTreeList(left))
+        self.assertTrue(isValidAVLTreeList(right))
+        self.assertEqual(values[:57], left.listToArray())
+        self.assertEqual(values[57], val)
+        self.assertEqual(values[58:], right.listToArray())
+        left.concat(right)
+        self.assertTrue(isValidAVLTreeList(left))
+        self.assertEqual(values[:57] + values[58:], left.listToArray())
+
+    def test_nodePool(self):
+        pool = AVLNodePool(maxSize=3)
+        tree = AVLTreeList(pool)
+        for i in range(10):
+            tree.insert(i, str(i))
+        self.assertEqual(0, pool.hits)
+        self.assertEqual(10, pool.misses)
+
+        deleted = [tree.retrieveNode(0), tree.retrieveNode(1)]
+        tree.delete(0)
+        tree.delete(0)
+        self.assertEqual(2, pool.size())
+        for node in deleted:
+            self.assertIn(node, pool.nodes[AVLNode])
+            self.assertEqual(None, node.value)
+
+        # the pool keeps at most maxSize nodes
+        for i in range(5):
+            tree.delete(tree.length() // 2)
+        self.assertEqual(3, pool.size())
+        self.assertTrue(isValidAVLTreeList(tree))
+
+        tree.insert(0, "a")
+        tree.insert(2, "b")
+        self.assertEqual(2, pool.hits)
+        self.assertEqual(10, pool.misses)
+        self.assertEqual(1, pool.size())
+        self.assertTrue(isValidAVLTreeList(tree))
+        self.assertEqual(["a", "2", "b", "3", "9"], tree.listToArray())
+
+        # a split result keeps using the pool
+        left, val, right = tree.split(3)
+        self.assertIs(pool, left.nodePool)
+        self.assertIs(pool, right.nodePool)
+
+    def test_nodePoolChurn(self):
+        random.seed(4)
+        pool = AVLNodePool()
+        tree = AVLTreeList(pool)
+        values = []
+        for i in range(200):
+            tree.insert(i, i)
+            values.append(i)
+        for i in range(1000):
+            index = random.randint(0, len(values))
+            tree.insert(index, i)
+            values.insert(index, i)
+            index = random.randint(0, len(values) - 1)
+            tree.delete(index)
+            values.pop(index)
+        self.assertTrue(isValidAVLTreeList(tree))
+        self.assertEqual(values, tree.listToArray())
+        self.assertEqual(1200, pool.hits + pool.misses)
+        self.assertEqual(999, pool.hits)
+
+    def test_retrieveNode(self):
+        random.seed(5)
+        tree = AVLTreeList()
+        values = []
+        for i in range(1000):
+            index = random.randint(0, len(values))
+            tree.insert(index, str(i))
+            values.insert(index, str(i))
+        for i in range(len(values)):
+            node = tree.retrieveNode(i)
+            self.assertEqual(values[i], node.getValue())
+            self.assertEqual(values[i], tree.retrieve(i))
+        self.assertIs(tree.get_First(), tree.retrieveNode(0))
+        self.assertIs(tree.get_Last(), tree.retrieveNode(len(values) - 1))
+
+    def test_finger(self):
+        random.seed(6)
+        tree = AVLTreeList(useFinger=True)
+        values = []
+        for i in range(300):
+            index = random.randint(0, len(values))
+            tree.insert(index, str(i))
+            values.insert(index, str(i))
+            self.assertIs(tree.finger, tree.retrieveNode(index))
+        # scan with edits near a moving position
+        position = 0
+        for i in range(2000):
+            position = min(max(0, position + random.randint(-3, 5)), len(values) - 1)
+            operation = random.random()
+            if operation < 0.6:
+                self.assertEqual(values[position], tree.retrieve(position))
+                self.assertEqual(position, tree.fingerIndex)
+            elif operation < 0.8:
+                tree.insert(position, "i" + str(i))
+                values.insert(position, "i" + str(i))
+            elif len(values) > 1:
+                tree.delete(position)
+                values.pop(position)
+                position = min(position, len(values) - 1)
+            if tree.finger is not None:
+                self.assertIs(tree.finger, self.rootDescent(tree, tree.fingerIndex))
+        self.assertTrue(isValidAVLTreeList(tree))
+        self.assertEqual(values, [tree.retrieve(i) for i in range(len(values))])
+
+        # concat keeps the finger of self and drops the finger of lst
+        other = AVLTreeList(useFinger=True)
+        for i in range(50):
+            other.insert(i, str(i))
+        other.retrieve(10)
+        tree.retrieve(5)
+        tree.concat(other)
+        self.assertIsNone(other.finger)
+        self.assertIs(tree.finger, self.rootDescent(tree, 5))
+        self.assertEqual(values + [str(i) for i in range(50)], tree.listToArray())
+
+        left, val, right = tree.split(len(values))
+        self.assertIsNone(tree.finger)
+        self.assertTrue(left.useFinger)
+        self.assertEqual(values, [left.retrieve(i) for i in range(len(values))])
+
+    @staticmethod
+    def rootDescent(tree, i):
+        node = tree.getRoot()
+        while i != node.getLeft().getSize():
+            if i < node.getLeft().getSize():
+                node = node.getLeft()
+            else:
+                i -= node.getLeft().getSize() + 1
+                node = node.getRight()
+        return node
+
+    def test_concatDoesNotReleaseConnector(self):
+        pool = AVLNodePool()
+        tree1 = AVLTreeList(pool)
+        tree2 = AVLTreeList(pool)
+        for i in range(10):
+            tree1.insert(i, i)
+            tree2.insert(i, 10 + i)
+        tree1.concat(tree2)
+        self.assertEqual(0, pool.size())
+        self.assertEqual(list(range(20)), tree1.listToArray())
+        self.assertTrue(isValidAVLTreeList(tree1))
+
+    def test_iterators(self):
+        tree = AVLTreeList()
+        self.assertEqual([], list(tree))
+        self.assertEqual([], list(reversed(tree)))
+        self.assertEqual([], list(tree.iter_from(0)))
+
+        random.seed(7)
+        values = []
+        for i in range(200):
+            index = random.randint(0, len(values))
+            tree.insert(index, str(i))
+            values.insert(index, str(i))
+        self.assertEqual(values, list(tree))
+        self.assertEqual(values[::-1], list(reversed(tree)))
+        for i in [0, 1, 57, 199, 200]:
+            self.assertEqual(values[i:], list(tree.iter_from(i)))
+        self.assertEqual(values[57::-1], [node.getValue() for node in tree.iterNodes(57, reverse=True)])
+
+    def test_iteratorFailFast(self):
+        tree = createTreeFromListInsert(["a", "b", "c", "d"])
+        iterator = iter(tree)
+        self.assertEqual("a", next(iterator))
+        tree.insert(0, "z")
+        with self.assertRaises(RuntimeError):
+            next(iterator)
+
+        iterator = tree.iter_from(2)
+        self.assertEqual("b", next(iterator))
+        tree.delete(0)
+        with self.assertRaises(RuntimeError):
+            list(iterator)
+
+        # reading the list during the iteration is allowed
+        for value in tree:
+            tree.retrieve(0)
+            tree.listToArray()
+
+    def test_range_getitem(self):
+        tree = AVLTreeList()
+        self.assertEqual([], list(tree.range(0, 0)))
+        self.assertEqual([], tree[:])
+        with self.assertRaises(IndexError):
+            tree[0]
+
+        values = [str(i) for i in range(100)]
+        for i in range(100):
+            tree.insert(i, values[i])
+        for i, j in [(0, 0), (0, 100), (10, 11), (37, 80), (99, 100), (100, 100)]:
+            self.assertEqual(values[i:j], list(tree.range(i, j)))
+        for key in [slice(None), slice(5, 17), slice(-10, None), slice(None, None, 3), slice(90, 10, -7),
+                    slice(None, None, -1), slice(50, 50), slice(60, 50), slice(50, 60, -1), slice(-200, 200, 2)]:
+            self.assertEqual(values[key], tree[key])
+        self.assertEqual("0", tree[0])
+        self.assertEqual("99", tree[-1])
+        self.assertEqual("42", tree[42])
+        with self.assertRaises(IndexError):
+            tree[100]
+        with self.assertRaises(IndexError):
+            tree[-101]
+
+    def test_from_iterable(self):
+        for n in list(range(40)) + [127, 128, 1000, 1025]:
+            values = [str(i) for i in range(n)]
+            tree = AVLTreeList.from_iterable(iter(values))
+            self.assertTrue(isValidAVLTreeList(tree))
+            self.assertEqual(values, tree.listToArray())
+            self.assertEqual(n, tree.length())
+            if n > 0:
+                # minimal height
+                self.assertEqual(n.bit_length() - 1, tree.getRoot().getHeight())
+            else:
+                self.assertTrue(tree.empty())
+
+        # a generator and constructor options
+        pool = AVLNodePool()
+        tree = AVLTreeList.from_iterable((i * i for i in range(100)), nodePool=pool, useFinger=True)
+        self.assertIs(pool, tree.nodePool)
+        self.assertEqual(100, pool.misses)
+        self.assertEqual(81, tree.retrieve(9))
+        self.assertIs(tree.finger, tree.retrieveNode(9))
+        tree.insert(50, "x")
+        tree.delete(0)
+        self.assertTrue(isValidAVLTreeList(tree))
+
+    def test_insert_many(self):
+        random.seed(8)
+        tree = AVLTreeList()
+        values = []
+        self.assertEqual(0, tree.insert_many(0, []))
+        self.assertTrue(tree.empty())
+        self.assertEqual(3, tree.insert_many(0, iter(["a", "b", "c"])))
+        values[0:0] = ["a", "b", "c"]
+        for step in range(60):
+            i = random.randint(0, len(values))
+            batch = [str(step) + "." + str(j) for j in range(random.choice([0, 1, 2, 7, 50, 300]))]
+            self.assertEqual(len(batch), tree.insert_many(i, (value for value in batch)))
+            values[i:i] = batch
+            self.assertTrue(isValidAVLTreeList(tree))
+            self.assertEqual(values, tree.listToArray())
+
+        pool = AVLNodePool()
+        tree = AVLTreeList(pool, useFinger=True)
+        tree.insert_many(0, range(10))
+        tree.retrieve(5)
+        tree.insert_many(3, range(100, 105))
+        self.assertEqual(7, tree.retrieve(12))
+        self.assertEqual([0, 1, 2, 100, 101, 102, 103, 104, 3, 4], tree[:10])
+
+    def test_delete_range(self):
+        random.seed(9)
+        values = [str(i) for i in range(500)]
+        tree = AVLTreeList.from_iterable(values)
+        self.assertEqual(0, tree.delete_range(3, 3))
+        self.assertTrue(tree.delete_range(7, 7, returnRange=True).empty())
+        while values:
+            i = random.randint(0, len(values) - 1)
+            j = random.randint(i, min(len(values), i + random.choice([1, 5, 40, 200])))
+            if random.random() < 0.5:
+                self.assertEqual(j - i, tree.delete_range(i, j))
+            else:
+                deleted = tree.delete_range(i, j, returnRange=True)
+                self.assertTrue(isValidAVLTreeList(deleted))
+                self.assertEqual(values[i:j], deleted.listToArray())
+            del values[i:j]
+            self.assertTrue(isValidAVLTreeList(tree))
+            self.assertEqual(values, tree.listToArray())
+
+        tree = AVLTreeList.from_iterable(range(10))
+        deleted = tree.delete_range(0, 10, returnRange=True)
+        self.assertTrue(tree.empty())
+        self.assertEqual(list(range(10)), deleted.listToArray())
+        tree.insert(0, "a")
+        self.assertEqual(["a"], tree.listToArray())
+
+        # with a value index, the list and the returned range only keep the entries of their own nodes
+        values = [str(i % 7) for i in range(300)]
+        tree = AVLTreeList.from_iterable(values, valueIndex=AVLValueIndex())
+        for i, j in [(10, 20), (0, 150), (5, 100), (21, 30)]:
+            deleted = tree.delete_range(i, j, returnRange=i % 2 == 1)
+            if i % 2 == 1:
+                self.assertEqual(values[i:j], deleted.listToArray())
+                self.assertEqual(j - i, deleted.valueIndex.size())
+                self.assertEqual(values.index("3", i, j) - i, deleted.search("3"))
+            del values[i:j]
+            self.assertEqual(len(values), tree.valueIndex.size())
+            self.assertEqual(values.index("3"), tree.search("3"))
+
+    def test_valueIndex(self):
+        random.seed(11)
+        index = AVLValueIndex()
+        tree = AVLTreeList(nodePool=AVLNodePool(), valueIndex=index)
+        values = []
+        alphabet = [str(i) for i in range(12)]
+        for step in range(1500):
+            op = random.random()
+            if op < 0.4 or not values:
+                i = random.randint(0, len(values))
+                val = random.choice(alphabet)
+                tree.insert(i, val)
+                values.insert(i, val)
+            elif op < 0.6:
+                i = random.randint(0, len(values) - 1)
+                tree.delete(i)
+                del values[i]
+            elif op < 0.75:
+                i = random.randint(0, len(values) - 1)
+                val = random.choice(alphabet)
+                tree.setValue(i, val)
+                values[i] = val
+            elif op < 0.85:
+                i = random.randint(0, len(values))
+                batch = [random.choice(alphabet) for _ in range(random.randint(0, 8))]
+                tree.insert_many(i, batch)
+                values[i:i] = batch
+            elif op < 0.95:
+                i = random.randint(0, len(values) - 1)
+                j = random.randint(i, min(len(values), i + 6))
+                tree.delete_range(i, j)
+                del values[i:j]
+            else:
+                i = random.randint(0, len(values) - 1)
+                left, val, right = tree.split(i)
+                right.insert(0, val)
+                left.concat(right)
+                tree = left
+            for val in alphabet:
+                expected = values.index(val) if val in values else -1
+                self.assertEqual(expected, tree.search(val))
+        # the index of the list only holds its nodes, in order
+        self.assertEqual(len(values), tree.valueIndex.size())
+        for val in alphabet:
+            self.assertEqual([i for i, x in enumerate(values) if x == val], list(tree.search_all(val)))
+            self.assertEqual(max([i for i, x in enumerate(values) if x == val], default=-1), tree.rfind(val))
+
+        # the parts of a split have indices of their own, the larger part keeps the index of the list
+        index = tree.valueIndex
+        left, val, right = tree.split(len(values) // 3)
+        self.assertIs(index, right.valueIndex)
+        self.assertEqual(left.length(), left.valueIndex.size())
+        self.assertEqual(right.length(), right.valueIndex.size())
+        left.insert(left.length(), val)
+        left.concat(right)
+        tree = left
+
+        # concatenating a list with another index merges the indices
+        other = AVLTreeList(valueIndex=AVLValueIndex())
+        other.insert(0, "x")
+        other.insert(1, "0")
+        tree.concat(other)
+        values += ["x", "0"]
+        self.assertEqual(len(values) - 2, tree.search("x"))
+        self.assertEqual(values.index("0"), tree.search("0"))
+        self.assertEqual(len(values) - 1, tree.rfind("0"))
+        self.assertEqual(len(values), tree.valueIndex.size())
+
+    def test_valueIndexDuplicates(self):
+        # a few values with many nodes each, whose treaps are split and joined by the list operations
+        random.seed(111)
+        values = [random.choice("aab") for _ in range(3000)]
+        tree = AVLTreeList.from_iterable(values, valueIndex=AVLValueIndex())
+        for step in range(200):
+            op = random.randrange(5)
+            i = random.randint(0, len(values) - 1)
+            j = random.randint(i, len(values))
+            if op == 0:
+                left, val, right = tree.split(i)
+                right.insert(0, val)
+                left.concat(right)
+                tree = left
+            elif op == 1:
+                tree.reverse(i, j)
+                values[i:j] = values[i:j][::-1]
+            elif op == 2 and len(values) > 1000:
+                tree.delete_range(i, j)
+                del values[i:j]
+            elif op == 3:
+                batch = [random.choice("abc") for _ in range(random.randint(0, 50))]
+                tree.insert_many(i, batch)
+                values[i:i] = batch
+            else:
+                tree.insert(i, "c")
+                values.insert(i, "c")
+                if j < len(values):
+                    tree.setValue(j, "a")
+                    values[j] = "a"
+            for val in "abc":
+                occurrences = [k for k, x in enumerate(values) if x == val]
+                self.assertEqual(occurrences[0] if occurrences else -1, tree.search(val))
+                self.assertEqual(occurrences[-1] if occurrences else -1, tree.rfind(val))
+            self.assertEqual(len(values), tree.valueIndex.size())
+        for val in "abc":
+            self.assertEqual([k for k, x in enumerate(values) if x == val], list(tree.search_all(val)))
+
+    def test_streamingSearch(self):
+        random.seed(12)
+        empty = AVLTreeList()
+        self.assertEqual(-1, empty.search("a"))
+        self.assertEqual(-1, empty.rfind("a"))
+        self.assertEqual([], list(empty.search_all("a")))
+        for useIndex in [False, True]:
+            values = [str(random.randrange(20)) for _ in range(300)]
+            tree = AVLTreeList(valueIndex=AVLValueIndex() if useIndex else None)
+            tree.fillFromIterable(values)
+            for val in [str(i) for i in range(22)]:
+                expected = [i for i, x in enumerate(values) if x == val]
+                self.assertEqual(expected[0] if expected else -1, tree.search(val))
+                self.assertEqual(expected[-1] if expected else -1, tree.rfind(val))
+                self.assertEqual(expected, list(tree.search_all(val)))
+
+        # search_all is a lazy generator, it fails fast if the list is modified
+        tree = AVLTreeList.from_iterable(["a", "b", "a", "a"])
+        matches = tree.search_all("a")
+        self.assertEqual(0, next(matches))
+        tree.insert(0, "a")
+        with self.assertRaises(RuntimeError):
+            next(matches)
+
+    def test_nodeLayout(self):
+        # a list without an aggregator or a fork only holds plain nodes, even after lazy operations
+        tree = AVLTreeList.from_iterable(range(20), nodePool=AVLNodePool())
+        tree.reverse(2, 12)
+        tree.assign_range(0, 5, 7)
+        tree.delete(3)
+        tree.insert(3, 50)
+        self.assertTrue(all(type(node) is AVLNode for node in tree.iterNodes()))
+
+        # setting an aggregator rebuilds the tree with extended nodes, and releases the old ones to the pool
+        values = tree.listToArray()
+        pool = tree.nodePool
+        released = pool.size()
+        iterator = iter(tree)
+        next(iterator)
+        tree.setAggregator(AVLAggregate.sum())
+        with self.assertRaises(RuntimeError):
+            next(iterator)
+        self.assertEqual(released + len(values), pool.size())
+        self.assertTrue(isValidAVLTreeList(tree))
+        self.assertEqual(values, tree.listToArray())
+        self.assertEqual(sum(values), tree.aggregate(0, len(values)))
+        tree.insert(3, 100)
+        self.assertTrue(isValidAVLTreeList(tree))
+        self.assertEqual(sum(values) + 100, tree.aggregate(0, len(values) + 1))
+
+        # concatenating a plain list to a list with an aggregator
+        tree.concat(AVLTreeList.from_iterable([1, 2, 3]))
+        self.assertTrue(isValidAVLTreeList(tree))
+        self.assertEqual(sum(values) + 106, tree.aggregate(0, tree.length()))
+
+        # the copies made by a forked list are extended nodes, they hold its owner token
+        tree = AVLTreeList.from_iterable(range(20))
+        fork = tree.fork()
+        tree.insert(5, "a")
+        self.assertIsInstance(tree.getRoot(), AVLExtendedNode)
+        self.assertTrue(isValidAVLTreeList(tree))
+        self.assertEqual(list(range(20)), fork.listToArray())
+
+    def test_nodePoolClasses(self):
+        # a pool shared by a plain list and a list with an aggregator recycles the nodes of both classes
+        pool = AVLNodePool()
+        plain = AVLTreeList.from_iterable(range(10), nodePool=pool)
+        extended = AVLTreeList.from_iterable(range(10), nodePool=pool, aggregator=AVLAggregate.sum())
+        plain.delete(0)
+        extended.delete(0)
+        plain.delete(0)
+        hits = pool.hits
+        extended.insert(0, 5)
+        plain.insert(0, 6)
+        plain.insert(0, 7)
+        self.assertEqual(hits + 3, pool.hits)
+        self.assertEqual(0, pool.size())
+        self.assertTrue(isValidAVLTreeList(plain))
+        self.assertTrue(isValidAVLTreeList(extended))
+        self.assertEqual(sum(range(1, 10)) + 5, extended.aggregate(0, 10))
+
+    def test_aggregate(self):
+        random.seed(13)
+        aggregators = [(AVLAggregate.sum(), sum),
+                       (AVLAggregate.min(), lambda lst: min(lst, default=float('inf'))),
+                       (AVLAggregate.max(), lambda lst: max(lst, default=float('-inf'))),
+                       (AVLAggregate.count_if(lambda x: x % 3 == 0), lambda lst: sum(1 for x in lst if x % 3 == 0))]
+        for aggregator, expected in aggregators:
+            values = [random.randrange(100) for _ in range(50)]
+            tree = AVLTreeList.from_iterable(values, nodePool=AVLNodePool(), aggregator=aggregator)
+            for step in range(400):
+                op = random.random()
+                if op < 0.3 or not values:
+                    i = random.randint(0, len(values))
+                    val = random.randrange(100)
+                    tree.insert(i, val)
+                    values.insert(i, val)
+                elif op < 0.5:
+                    i = random.randint(0, len(values) - 1)
+                    tree.delete(i)
+                    del values[i]
+                elif op < 0.65:
+                    i = random.randint(0, len(values) - 1)
+                    val = random.randrange(100)
+                    tree.setValue(i, val)
+                    values[i] = val
+                elif op < 0.75:
+                    i = random.randint(0, len(values))
+                    batch = [random.randrange(100) for _ in range(random.randint(0, 10))]
+                    tree.insert_many(i, batch)
+                    values[i:i] = batch
+                elif op < 0.85:
+                    i = random.randint(0, len(values) - 1)
+                    j = random.randint(i, min(len(values), i + 8))
+                    tree.delete_range(i, j)
+                    del values[i:j]
+                else:
+                    i = random.randint(0, len(values) - 1)
+                    left, val, right = tree.split(i)
+                    self.assertEqual(expected(values[:i]), left.aggregate(0, left.length()))
+                    self.assertEqual(expected(values[i + 1:]), right.aggregate(0, right.length()))
+                    right.insert(0, val)
+                    left.concat(right)
+                    tree = left
+                for _ in range(3):
+                    i = random.randint(0, len(values))
+                    j = random.randint(i, len(values))
+                    self.assertEqual(expected(values[i:j]), tree.aggregate(i, j))
+
+        # concatenating a list with another aggregator recomputes its aggregates
+        tree = AVLTreeList.from_iterable([1, 2, 3], aggregator=AVLAggregate.sum())
+        other = AVLTreeList.from_iterable([4, 5, 6], aggregator=AVLAggregate.max())
+        tree.concat(other)
+        self.assertEqual(21, tree.aggregate(0, 6))
+        self.assertEqual(9, tree.aggregate(3, 5))
+        with self.assertRaises(ValueError):
+            AVLTreeList.from_iterable([1]).aggregate(0, 1)
+
+    def test_reverse(self):
+        random.seed(14)
+        for useFinger in [False, True]:
+            values = list(range(200))
+            tree = AVLTreeList.from_iterable(values, useFinger=useFinger, valueIndex=AVLValueIndex(),
+                                             aggregator=AVLAggregate.sum())
+            tree.reverse(5, 5)
+            tree.reverse(5, 6)
+            self.assertEqual(values, tree.listToArray())
+            for step in range(600):
+                op = random.random()
+                if op < 0.35 and values:
+                    i = random.randint(0, len(values))
+                    j = random.randint(i, len(values))
+                    tree.reverse(i, j)
+                    values[i:j] = values[i:j][::-1]
+                elif op < 0.55 or not values:
+                    i = random.randint(0, len(values))
+                    tree.insert(i, 1000 + step)
+                    values.insert(i, 1000 + step)
+                elif op < 0.7:
+                    i = random.randint(0, len(values) - 1)
+                    tree.delete(i)
+                    del values[i]
+                elif op < 0.8:
+                    i = random.randint(0, len(values))
+                    j = random.randint(i, min(len(values), i + 10))
+                    tree.delete_range(i, j)
+                    del values[i:j]
+                elif op < 0.9:
+                    i = random.randint(0, len(values) - 1)
+                    left, val, right = tree.split(i)
+                    self.assertEqual(values[:i], left.listToArray())
+                    self.assertEqual(values[i + 1:], right.listToArray())
+                    left.insert(left.length(), val)
+                    left.concat(right)
+                    tree = left
+                else:
+                    i = random.randint(0, len(values) - 1)
+                    self.assertEqual(values[i], tree.retrieve(i))
+                    self.assertEqual(values[i], tree[i])
+                self.assertTrue(isValidAVLTreeList(tree))
+                if values:
+                    self.assertEqual(values[0], tree.first())
+                    self.assertEqual(values[-1], tree.last())
+                    val = random.choice(values)
+                    self.assertEqual(values.index(val), tree.search(val))
+                    i = random.randint(0, len(values))
+                    j = random.randint(i, len(values))
+                    self.assertEqual(sum(values[i:j]), tree.aggregate(i, j))
+            self.assertEqual(values, tree.listToArray())
+            self.assertEqual(values[::-1], list(reversed(tree)))
+            self.assertEqual([tree.retrieve(i) for i in range(len(values))], values)
+
+        tree = AVLTreeList.from_iterable("abcdef")
+        tree.reverse(0, 6)
+        self.assertEqual(list("fedcba"), tree.listToArray())
+        self.assertEqual("f", tree.first())
+        self.assertEqual("a", tree.last())
+        tree.reverse(1, 4)
+        self.assertEqual(list("fcdeba"), tree.listToArray())
+
+    def test_rangeUpdates(self):
+        random.seed(15)
+        aggregators = [(AVLAggregate.sum(), sum),
+                       (AVLAggregate.min(), lambda lst: min(lst, default=float('inf'))),
+                       (AVLAggregate.max(), lambda lst: max(lst, default=float('-inf'))),
+                       (None, None)]
+        for aggregator, expected in aggregators:
+            values = [random.randrange(50) for _ in range(150)]
+            tree = AVLTreeList.from_iterable(values, useFinger=aggregator is None, valueIndex=AVLValueIndex(),
+                                             aggregator=aggregator)
+            for step in range(500):
+                op = random.random()
+                i = random.randint(0, len(values))
+                j = random.randint(i, min(len(values), i + random.choice([3, 30, 300])))
+                if op < 0.25:
+                    val = random.randrange(50)
+                    tree.assign_range(i, j, val)
+                    values[i:j] = [val] * (j - i)
+                elif op < 0.5:
+                    delta = random.randrange(-5, 6)
+                    tree.add_range(i, j, delta)
+                    values[i:j] = [x + delta for x in values[i:j]]
+                elif op < 0.6:
+                    tree.reverse(i, j)
+                    values[i:j] = values[i:j][::-1]
+                elif op < 0.75 or not values:
+                    val = random.randrange(50)
+                    tree.insert(i, val)
+                    values.insert(i, val)
+                elif op < 0.85:
+                    i = random.randint(0, len(values) - 1)
+                    tree.delete(i)
+                    del values[i]
+                else:
+                    i = random.randint(0, len(values) - 1)
+                    self.assertEqual(values[i], tree.retrieve(i))
+                    left, val, right = tree.split(i)
+                    self.assertEqual(values[:i], left.listToArray())
+                    self.assertEqual(values[i + 1:], right.listToArray())
+                    right.insert(0, val)
+                    left.concat(right)
+                    tree = left
+                self.assertTrue(isValidAVLTreeList(tree))
+                if values:
+                    self.assertEqual(values[0], tree.first())
+                    self.assertEqual(values[-1], tree.last())
+                    val = random.choice(values)
+                    self.assertEqual(values.index(val), tree.search(val))
+                    self.assertEqual(len(values) - 1 - values[::-1].index(val), tree.rfind(val))
+                    if aggregator is not None:
+                        i = random.randint(0, len(values))
+                        j = random.randint(i, len(values))
+                        self.assertEqual(expected(values[i:j]), tree.aggregate(i, j))
+            self.assertEqual(values, tree.listToArray())
+
+        tree = AVLTreeList.from_iterable(range(10), aggregator=AVLAggregate.count_if(lambda x: x == 7))
+        tree.assign_range(2, 6, 7)
+        self.assertEqual(5, tree.aggregate(0, 10))
+        with self.assertRaises(ValueError):
+            tree.add_range(0, 3, 1)
+        # the default repeat combines the aggregate of the value with itself
+        concat = AVLAggregate(lambda a, b: a + b, "")
+        tree = AVLTreeList.from_iterable("abcdefg", aggregator=concat)
+        tree.assign_range(1, 6, "x")
+        self.assertEqual("axxxxxg", tree.aggregate(0, 7))
+        # a non commutative aggregate is kept in both orders, so a reversal swaps it
+        tree.reverse(0, 3)
+        self.assertEqual("xxaxxxg", tree.aggregate(0, 7))
+        tree.reverseList()
+        self.assertEqual("gxxxaxx", tree.aggregate(0, 7))
+        tree.setAggregator(None)
+        tree.reverse(0, 7)
+        tree.setAggregator(concat)
+        self.assertEqual("xxaxxxg", tree.aggregate(0, 7))
+        self.assertEqual("", tree.aggregate(3, 3))
+
+    def test_reverseNonCommutative(self):
+        random.seed(14)
+        concat = AVLAggregate(lambda a, b: a + b, "")
+        values = [chr(ord('a') + k) for k in range(40)]
+        tree = AVLTreeList.from_iterable(values, aggregator=concat)
+        for step in range(500):
+            i = random.randint(0, len(values))
+            j = random.randint(i, len(values))
+            op = random.randrange(5)
+            if op == 0:
+                tree.reverse(i, j)
+                values[i:j] = values[i:j][::-1]
+            elif op == 1:
+                tree.reverseList()
+                values.reverse()
+            elif op == 2 and i < j:
+                tree.assign_range(i, j, "z")
+                values[i:j] = ["z"] * (j - i)
+            elif op == 3 and i < len(values):
+                tree.delete(i)
+                values.pop(i)
+            else:
+                val = chr(ord('a') + step % 26)
+                tree.insert(i, val)
+                values.insert(i, val)
+            self.assertTrue(isValidAVLTreeList(tree))
+            self.assertEqual(values, tree.listToArray())
+            i = random.randint(0, len(values))
+            j = random.randint(i, len(values))
+            self.assertEqual("".join(values[i:j]), tree.aggregate(i, j))
+        # the lists of the same aggregator share its pair aggregator, so concat keeps the aggregates
+        other = AVLTreeList.from_iterable("xyz", aggregator=concat)
+        self.assertIs(tree.aggregator, other.aggregator)
+        other.reverseList()
+        tree.concat(other)
+        self.assertEqual("".join(values) + "zyx", tree.aggregate(0, tree.length()))
+
+    def test_concatInPlace(self):
+        random.seed(16)
+        for step in range(300):
+            n1 = random.choice([0, 1, 2, random.randrange(200)])
+            n2 = random.choice([0, 1, 2, random.randrange(200)])
+            values1 = list(range(n1))
+            values2 = list(range(n1, n1 + n2))
+            tree1 = AVLTreeList.from_iterable(values1)
+            tree2 = AVLTreeList.from_iterable(values2)
+            if n2 > 1 and random.random() < 0.3:
+                tree2.reverse(0, n2)
+                values2.reverse()
+            nodes = set(tree1.iterNodes()) | set(tree2.iterNodes())
+            h1 = tree1.getRoot().getHeight() if n1 else -1
+            h2 = tree2.getRoot().getHeight() if n2 else -1
+            self.assertEqual(abs(h1 - h2), tree1.concat(tree2))
+            self.assertTrue(isValidAVLTreeList(tree1))
+            self.assertEqual(values1 + values2, tree1.listToArray())
+            # the nodes are reused, none is allocated
+            self.assertEqual(nodes, set(tree1.iterNodes()))
+
+    def test_splitKernel(self):
+        random.seed(17)
+        for step in range(200):
+            n = random.randint(1, 300)
+            tree = AVLTreeList.from_iterable(range(n), aggregator=AVLAggregate.sum())
+            if n > 1 and random.random() < 0.5:
+                tree.reverse(0, n)
+            values = tree.listToArray()
+            i = random.randrange(n)
+            created = []
+            createEmptyList = tree.createEmptyList
+            tree.createEmptyList = lambda: created.append(1) or createEmptyList()
+            left, val, right = tree.split(i)
+            # only the 2 result lists are created
+            self.assertEqual(2, len(created))
+            self.assertEqual(values[i], val)
+            for part, expected in [(left, values[:i]), (right, values[i + 1:])]:
+                self.assertTrue(isValidAVLTreeList(part))
+                self.assertEqual(expected, part.listToArray())
+                self.assertEqual(sum(expected), part.aggregate(0, part.length()))
+
+    def test_fork(self):
+        random.seed(19)
+        for step in range(40):
+            n = random.randint(0, 150)
+            trees = [AVLTreeList.from_iterable(range(n), aggregator=AVLAggregate.sum())]
+            models = [list(range(n))]
+            for op in range(60):
+                k = random.randrange(len(trees))
+                tree, model = trees[k], models[k]
+                length = len(model)
+                choice = random.randrange(9)
+                if choice == 0 and len(trees) < 6:
+                    trees.append(tree.fork())
+                    models.append(list(model))
+                elif choice == 1:
+                    i = random.randint(0, length)
+                    tree.insert(i, op)
+                    model.insert(i, op)
+                elif choice == 2 and length:
+                    i = random.randrange(length)
+                    tree.delete(i)
+                    del model[i]
+                elif choice == 3 and length:
+                    i = random.randrange(length)
+                    tree.setValue(i, -op)
+                    model[i] = -op
+                elif choice == 4:
+                    i = random.randint(0, length)
+                    j = random.randint(i, length)
+                    tree.reverse(i, j)
+                    model[i:j] = model[i:j][::-1]
+                elif choice == 5:
+                    i = random.randint(0, length)
+                    j = random.randint(i, length)
+                    tree.add_range(i, j, op)
+                    model[i:j] = [value + op for value in model[i:j]]
+                elif choice == 6:
+                    i = random.randint(0, length)
+                    j = random.randint(i, length)
+                    tree.delete_range(i, j)
+                    del model[i:j]
+                elif choice == 7:
+                    i = random.randint(0, length)
+                    tree.insert_many(i, range(op, op + 5))
+                    model[i:i] = range(op, op + 5)
+                elif choice == 8 and 0 < length < 300:
+                    # a list can be concatenated with its own fork
+                    other = tree.fork()
+                    tree.concat(other)
+                    model.extend(model)
+                for tree, model in zip(trees, models):
+                    self.assertTrue(isValidAVLTreeList(tree))
+                    self.assertEqual(model, tree.listToArray())
+                    self.assertEqual(model[:1], [tree.first()] if model else [])
+                    self.assertEqual(model[-1:], [tree.last()] if model else [])
+                    self.assertEqual(sum(model), tree.aggregate(0, len(model)))
+                    if model:
+                        i = random.randrange(len(model))
+                        self.assertEqual(model[i], tree.retrieve(i))
+
+        with self.assertRaises(ValueError):
+            AVLTreeList(valueIndex=AVLValueIndex()).fork()
+
+    def test_forkCopiesLazily(self):
+        tree = AVLTreeList.from_iterable(range(1 << 12))
+        fork = tree.fork()
+        self.assertIs(tree.getRoot(), fork.getRoot())
+        original = set(tree.iterNodes())
+        fork.insert(100, "x")
+        fork.delete(3000)
+        self.assertEqual(list(range(1 << 12)), tree.listToArray())
+        copied = [node for node in fork.iterNodes() if node not in original]
+        # the paths to the 2 ends and to the 2 modified positions, with the sons of their nodes
+        self.assertLess(len(copied), 8 * (tree.getRoot().getHeight() + 1))
+        self.assertTrue(isValidAVLTreeList(tree))
+        self.assertTrue(isValidAVLTreeList(fork))
+
+    def test_forkDropped(self):
+        tree = AVLTreeList.from_iterable(range(1000), aggregator=AVLAggregate.sum(), useFinger=True)
+        fork = tree.fork()
+        tree.insert(10, -5)
+        fork.delete(500)
+        self.assertTrue(tree.shared)
+        left, val, right = fork.split(300)
+        del fork
+        # the halves of the fork still share nodes with tree
+        tree.delete(10)
+        self.assertTrue(tree.shared)
+        del left, right
+        gc.collect()
+        tree.insert(700, 7)
+        self.assertFalse(tree.shared)
+        self.assertTrue(isValidAVLTreeList(tree))
+        self.assertTrue(all(node.owner is None for node in tree.iterNodes()))
+        tree.retrieve(600)
+        self.assertIsNotNone(tree.finger)
+        expected = list(range(1000))
+        expected.insert(700, 7)
+        self.assertEqual(expected, tree.listToArray())
+        self.assertEqual(sum(range(1000)), tree.aggregate(0, 700) + tree.aggregate(701, 1001))
+
+        # a list concatenated with its own fork holds some nodes twice, and stays shared
+        tree = AVLTreeList.from_iterable(range(100))
+        tree.concat(tree.fork())
+        gc.collect()
+        tree.insert(0, -1)
+        self.assertTrue(tree.shared)
+        self.assertEqual([-1] + list(range(100)) * 2, tree.listToArray())
+
+    def test_applyBatch(self):
+        random.seed(21)
+        for step in range(150):
+            n = random.randint(0, 200)
+            options = random.choice([{}, {"useFinger": True}, {"nodePool": AVLNodePool()},
+                                     {"valueIndex": AVLValueIndex()}])
+            tree = AVLTreeList.from_iterable(range(n), aggregator=AVLAggregate.sum(), **options)
+            if n > 1 and random.random() < 0.3:
+                tree.reverse(0, n)
+            model = tree.listToArray()
+            ops = []
+            for op in range(random.randint(0, 80)):
+                choice = random.randrange(3)
+                # a batch may also keep hitting the same area
+                hot = random.random() < 0.5
+                if choice == 0 or not model:
+                    i = 0 if hot else random.randint(0, len(model))
+                    ops.append(("insert", i, op))
+                    model.insert(i, op)
+                elif choice == 1:
+                    i = 0 if hot else random.randrange(len(model))
+                    ops.append(("delete", i))
+                    del model[i]
+                else:
+                    i = random.randrange(len(model))
+                    ops.append(("set", i, -op))
+                    model[i] = -op
+            tree.apply_batch(ops)
+            self.assertTrue(isValidAVLTreeList(tree))
+            self.assertEqual(model, tree.listToArray())
+            self.assertEqual(sum(model), tree.aggregate(0, len(model)))
+            if model:
+                self.assertEqual(0, tree.search(model[0]))
+            if tree.useFinger and model:
+                i = random.randrange(len(model))
+                self.assertEqual(model[i], tree.retrieve(i))
+
+        tree = AVLTreeList.from_iterable(range(10))
+        with self.assertRaises(ValueError):
+            tree.apply_batch([("insert", 0, 1), ("append", 3)])
+        self.assertEqual(list(range(10)), tree.listToArray())
+        # the indices are checked against the length that the previous operations leave, before any change
+        for ops in ([("insert", 0, 1), ("delete", 50)], [("delete", 9), ("set", 9, 1)], [("insert", 11, 1)],
+                    [("insert", -1, 1)], [("insert", 10, 1), ("delete", 10), ("delete", 10)]):
+            with self.assertRaises(IndexError):
+                tree.apply_batch(ops)
+            self.assertEqual(list(range(10)), tree.listToArray())
+        tree.apply_batch([("insert", 10, 10), ("set", 10, 11), ("delete", 10)])
+        self.assertEqual(list(range(10)), tree.listToArray())
+
+        # a long batch in the same place is rebalanced on the way, and ends up as a valid AVL tree
+        tree.apply_batch([("insert", 5, i) for i in range(1000)])
+        self.assertTrue(isValidAVLTreeList(tree))
+        self.assertLessEqual(tree.getRoot().getHeight(), 15)
+
+    def test_reBalanceStopsClimbing(self):
+        # the rebalancing of the lecture, which recomputes every ancestor up to the root
+        def fullClimbReBalance(tree, node):
+            balanceOps = 0
+            while node is not None:
+                balanceFactor = node.getBalanceFactor()
+                height = node.getHeight()
+                if abs(balanceFactor) == 2:
+                    balanceOps += tree.rotate(node, balanceFactor)
+                    node = node.getParent()
+                else:
+                    node.recomputeHeight()
+                    tree.recomputeNode(node)
+                    if node.getHeight() != height:
+                        balanceOps += 1
+                node = node.getParent()
+            return balanceOps
+
+        random.seed(22)
+        for aggregator in [None, AVLAggregate.sum()]:
+            tree = AVLTreeList(aggregator=aggregator)
+            reference = AVLTreeList(aggregator=aggregator)
+            reference.reBalance = lambda node: fullClimbReBalance(reference, node)
+            for step in range(3000):
+                length = tree.length()
+                if length and random.random() < 0.4:
+                    i = random.randrange(length)
+                    self.assertEqual(reference.delete(i), tree.delete(i))
+                else:
+                    i = random.randint(0, length)
+                    self.assertEqual(reference.insert(i, step), tree.insert(i, step))
+            self.assertTrue(isValidAVLTreeList(tree))
+            self.assertEqual(reference.listToArray(), tree.listToArray())
+            self.assertTrue(treesEqual(reference, tree))
+            if aggregator is not None:
+                self.assertEqual(sum(tree.listToArray()), tree.aggregate(0, tree.length()))
+
+    def test_stats(self):
+        rnd = random.Random(23)
+        ops = [(rnd.randint(0, i), i) for i in range(300)]
+        for useFinger in [False, True]:
+            plain = AVLTreeList(useFinger=useFinger)
+            tree = AVLTreeList(useFinger=useFinger)
+            stats = tree.enable_stats()
+            for i, val in ops:
+                self.assertEqual(plain.insert(i, val), tree.insert(i, val))
+            for i in range(100):
+                self.assertEqual(plain.delete(i), tree.delete(i))
+            for i in range(0, 200, 7):
+                self.assertEqual(plain.retrieve(i), tree.retrieve(i))
+            self.assertEqual(plain.listToArray(), tree.listToArray())
+            self.assertTrue(isValidAVLTreeList(tree))
+
+            self.assertEqual(300, stats.get('insert', 'calls'))
+            self.assertEqual(300, stats.get('insert', 'nodeAllocations'))
+            self.assertEqual(299, stats.get('insert', 'reBalance'))
+            self.assertEqual(100, stats.get('delete', 'calls'))
+            self.assertLessEqual(stats.get('delete', 'swapNodes'), 100)
+            rotations = sum(stats.get('insert', kind) for kind in
+                            ['rightRotation', 'leftRotation', 'leftThenRightRotation', 'rightThenLeftRotation'])
+            self.assertGreater(rotations, 0)
+            self.assertLessEqual(rotations, 299)
+            self.assertGreaterEqual(stats.get('retrieve', 'descentNodes'), stats.get('retrieve', 'calls'))
+            # every insert descends to its parent (or to the neighbour of the finger)
+            self.assertGreaterEqual(stats.get('insert', 'descentNodes'), 299)
+            # the nested calls of listToArray are not counted as operations of their own
+            self.assertEqual({'calls': 1}, stats.report()['listToArray'])
+
+            # lists derived from the list count into the same statistics
+            left, val, right = tree.split(50)
+            left.concat(right)
+            self.assertEqual(1, stats.get('split', 'calls'))
+            self.assertEqual(1, stats.get('concat', 'calls'))
+
+            left.disable_stats()
+            self.assertIsNone(left.stats)
+            left.insert(0, "a")
+            self.assertEqual(300, stats.get('insert', 'calls'))
+            stats.reset()
+            self.assertEqual({}, stats.report())
+
+        # the counts are of the operation itself: a retrieve from the root visits the node and its ancestors
+        tree = AVLTreeList.from_iterable(range(1000))
+        stats = tree.enable_stats()
+        for i in range(0, 1000, 7):
+            node, visited = tree.retrieveNode(i), 1
+            while node.getParent() is not None:
+                node, visited = node.getParent(), visited + 1
+            stats.reset()
+            tree.retrieve(i)
+            self.assertEqual({'calls': 1, 'descentNodes': visited}, stats.report()['retrieve'])
+        # the walks of successor and predecessor are counted by the levels between the node and its neighbour
+        def depth(node):
+            return 0 if node.getParent() is None else depth(node.getParent()) + 1
+        for i in range(1, 999, 13):
+            node = tree.retrieveNode(i)
+            stats.reset()
+            neighbours = tree.successor(node), tree.predecessor(node)
+            self.assertEqual(abs(depth(node) - depth(neighbours[0])), stats.get(None, 'successorSteps'))
+            self.assertEqual(abs(depth(node) - depth(neighbours[1])), stats.get(None, 'predecessorSteps'))
+        # the list holds its statistics only, so it is freed without the garbage collector
+        gc.disable()
+        try:
+            ref = weakref.ref(tree)
+            del tree
+            self.assertIsNone(ref())
+        finally:
+            gc.enable()
+
+    def test_splitCostReport(self):
+        rnd = random.Random(25)
+        n = 1000
+        for i in [0, 1, n // 2, rnd.randrange(n), n - 1]:
+            tree = AVLTreeList.from_iterable(range(n))
+            height = tree.getRoot().getHeight()
+            node = tree.retrieveNode(i)
+            depth = 0
+            while node.getParent() is not None:
+                node = node.getParent()
+                depth += 1
+            left, val, right, report = tree.split(i, costReport=True)
+            self.assertEqual(i, val)
+            self.assertEqual(list(range(i)), left.listToArray())
+            self.assertEqual(list(range(i + 1, n)), right.listToArray())
+            # a join with every ancestor of the i'th node
+            self.assertEqual(depth, report['joins'])
+            self.assertEqual(depth, len(report['heightDiffs']))
+            self.assertEqual(sum(report['heightDiffs']) + depth, report['totalCost'])
+            self.assertEqual(max([diff + 1 for diff in report['heightDiffs']] + [0]), report['maxCost'])
+            self.assertLessEqual(report['totalCost'], 3 * (height + 1))
+            self.assertEqual(2, report['allocatedLists'])
+            self.assertEqual(0, report['allocatedNodes'])
+
+        tree = AVLTreeList.from_iterable(range(n))
+        fork = tree.fork()
+        left, val, right, report = tree.split(n // 3, costReport=True)
+        self.assertTrue(isValidAVLTreeList(left))
+        self.assertTrue(isValidAVLTreeList(right))
+        self.assertEqual(list(range(n)), fork.listToArray())
+        self.assertGreater(report['allocatedNodes'], 0)
+        self.assertEqual(3, len(AVLTreeList.from_iterable(range(n)).split(5)))
+
     if __name__ == "__main__":
         unittest.main()
@@ -0,0 +1,113 @@
+import random
+import unittest
+from ArrayAVLTreeList import ArrayAVLTreeList, ArrayNodeStore
+from AVLTreeList import AVLTreeList
+from utils.tester_utils import isValidArrayAVLTreeList
+
+
+class Test_Array_AVL_Tree_List(unittest.TestCase):
+    def test_empty(self):
+        tree = ArrayAVLTreeList()
+        self.assertTrue(tree.empty())
+        self.assertEqual(0, tree.length())
+        self.assertEqual(None, tree.first())
+        self.assertEqual(None, tree.last())
+        self.assertEqual([], tree.listToArray())
+        self.assertEqual(-1, tree.search("a"))
+
+    def test_insert_delete_retrieve(self):
+        random.seed(2)
+        tree = ArrayAVLTreeList()
+        reference = AVLTreeList()
+        values = []
+        for i in range(500):
+            index = random.randint(0, len(values))
+            # same shape as AVLTreeList, so the same number of balancing operations
+            self.assertEqual(reference.insert(index, str(i)), tree.insert(index, str(i)))
+            values.insert(index, str(i))
+        self.assertTrue(isValidArrayAVLTreeList(tree))
+        self.assertEqual(values, tree.listToArray())
+        for i in range(300):
+            index = random.randint(0, len(values) - 1)
+            self.assertEqual(reference.delete(index), tree.delete(index))
+            values.pop(index)
+            self.assertEqual(values[0], tree.first())
+            self.assertEqual(values[-1], tree.last())
+        self.assertTrue(isValidArrayAVLTreeList(tree))
+        self.assertEqual(values, [tree.retrieve(i) for i in range(tree.length())])
+        self.assertEqual(values.index(values[100]), tree.search(values[100]))
+
+    def test_freeSlotsAreReused(self):
+        tree = ArrayAVLTreeList()
+        for i in range(10):
+            tree.insert(i, i)
+        for i in range(5):
+            tree.delete(0)
+        slots = len(tree.store.values)
+        for i in range(5):
+            tree.insert(0, i)
+        self.assertEqual(slots, len(tree.store.values))
+        self.assertEqual(10, tree.store.usedSlots())
+        self.assertTrue(isValidArrayAVLTreeList(tree))
+
+    def test_split_concat(self):
+        random.seed(3)
+        for n in [1, 2, 3, 10, 100, 257]:
+            values = list(range(n))
+            for i in {0, n // 2, n - 1, random.randrange(n)}:
+                tree = ArrayAVLTreeList.fromList(values)
+                self.assertTrue(isValidArrayAVLTreeList(tree))
+                left, val, right = tree.split(i)
+                self.assertIs(tree.store, left.store)
+                self.assertTrue(isValidArrayAVLTreeList(left))
+                self.assertTrue(isValidArrayAVLTreeList(right))
+                self.assertEqual(values[:i], left.listToArray())
+                self.assertEqual(i, val)
+                self.assertEqual(values[i + 1:], right.listToArray())
+                left.concat(right)
+                self.assertTrue(isValidArrayAVLTreeList(left))
+                self.assertEqual(values[:i] + values[i + 1:], left.listToArray())
+
+    def test_concat(self):
+        tree1 = ArrayAVLTreeList.fromList(list(range(100)))
+        tree2 = ArrayAVLTreeList.fromList(list(range(100, 103)))
+        self.assertEqual(5, tree1.concat(tree2))
+        self.assertTrue(isValidArrayAVLTreeList(tree1))
+        self.assertEqual(list(range(103)), tree1.listToArray())
+
+        store = ArrayNodeStore()
+        empty = ArrayAVLTreeList(store)
+        self.assertEqual(3, empty.concat(ArrayAVLTreeList.fromList(["a", "b", "c", "d"], store)))
+        self.assertEqual(["a", "b", "c", "d"], empty.listToArray())
+        self.assertTrue(isValidArrayAVLTreeList(empty))
+
+        single = ArrayAVLTreeList.fromList(["a"], store)
+        single.concat(ArrayAVLTreeList.fromList(["b", "c", "d", "e", "f", "g", "h"], store))
+        self.assertTrue(isValidArrayAVLTreeList(single))
+        self.assertEqual(list("abcdefgh"), single.listToArray())
+
+
+    def test_concatConsumesInput(self):
+        other = ArrayNodeStore()
+        tree1 = ArrayAVLTreeList.fromList(list(range(10)))
+        tree2 = ArrayAVLTreeList.fromList(list(range(10, 30)), other)
+        tree1.concat(tree2)
+        self.assertEqual(list(range(30)), tree1.listToArray())
+        self.assertTrue(tree2.empty())
+        self.assertEqual(0, other.usedSlots())
+        self.assertEqual(30, tree1.store.usedSlots())
+
+        tree3 = ArrayAVLTreeList.fromList(list(range(30, 35)), tree1.store)
+        tree1.concat(tree3)
+        self.assertTrue(tree3.empty())
+        self.assertTrue(isValidArrayAVLTreeList(tree1))
+
+    def test_search(self):
+        tree = ArrayAVLTreeList.fromList(list("abcabc"))
+        self.assertEqual(1, tree.search("b"))
+        self.assertEqual(0, tree.search("a"))
+        self.assertEqual(-1, tree.search("d"))
+        self.assertEqual(-1, ArrayAVLTreeList().search("a"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+import gc
+import threading
+import unittest
+from AVLTreeList import AVLTreeList
+from ConcurrentAVLTreeList import ConcurrentAVLTreeList, ReadWriteLock
+from utils.tester_utils import isValidAVLTreeList
+
+
+class Test_Concurrent_AVL_Tree_List(unittest.TestCase):
+    def test_operations(self):
+        tree = ConcurrentAVLTreeList()
+        self.assertTrue(tree.empty())
+        for i in range(10):
+            tree.insert(i, i)
+        tree.delete(0)
+        tree.setValue(0, "a")
+        self.assertEqual(["a", 2, 3, 4, 5, 6, 7, 8, 9], tree.listToArray())
+        self.assertEqual(9, tree.length())
+        self.assertEqual("a", tree.first())
+        self.assertEqual(9, tree.last())
+        self.assertEqual(4, tree.retrieve(3))
+        self.assertEqual(4, tree.search(5))
+        self.assertEqual(tree.listToArray(), list(tree))
+
+        left, val, right = tree.split(4)
+        self.assertTrue(tree.empty())
+        self.assertEqual(5, val)
+        self.assertEqual(["a", 2, 3, 4], left.listToArray())
+        left.concat(right)
+        self.assertTrue(right.empty())
+        self.assertEqual(["a", 2, 3, 4, 6, 7, 8, 9], left.listToArray())
+        with self.assertRaises(ValueError):
+            left.concat(left)
+
+    def test_readsAfterPushDown(self):
+        lst = AVLTreeList.from_iterable(range(100))
+        lst.reverse(0, 100)
+        tree = ConcurrentAVLTreeList(lst)
+        self.assertTrue(tree.readsModify())
+        self.assertEqual(99, tree.retrieve(0))
+        # the first read pushed down the reversal, the reads that follow run under the read lock
+        self.assertFalse(tree.readsModify())
+        self.assertEqual(list(range(99, -1, -1)), list(tree))
+        # iterating does not fork the list
+        self.assertFalse(tree.lst.shared)
+
+        snapshot = tree.snapshot()
+        tree.insert(0, "a")
+        self.assertTrue(tree.lst.shared)
+        del snapshot
+        gc.collect()
+        # the reads do not unshare the list, the next write does
+        self.assertEqual("a", tree.retrieve(0))
+        self.assertTrue(tree.lst.shared)
+        tree.delete(0)
+        self.assertFalse(tree.lst.shared)
+        self.assertTrue(isValidAVLTreeList(tree.lst))
+
+    def test_snapshotDropped(self):
+        tree = ConcurrentAVLTreeList(AVLTreeList.from_iterable(range(10)))
+        snapshot = tree.snapshot()
+        self.assertTrue(snapshot.shared)
+        del tree
+        gc.collect()
+        # the snapshot unshares itself once the facade is gone
+        snapshot.insert(0, -1)
+        self.assertFalse(snapshot.shared)
+        self.assertEqual(list(range(-1, 10)), snapshot.listToArray())
+        self.assertTrue(isValidAVLTreeList(snapshot))
+
+    def test_readsWithStats(self):
+        tree = ConcurrentAVLTreeList(AVLTreeList.from_iterable(range(10)))
+        self.assertFalse(tree.readsModify())
+        tree.lst.enable_stats()
+        # the counters of the stats are not thread-safe, so the reads are serialized
+        self.assertTrue(tree.readsModify())
+        self.assertEqual(3, tree.retrieve(3))
+        self.assertEqual(1, tree.lst.stats.get('retrieve', 'calls'))
+
+    def test_readWriteLock(self):
+        lock = ReadWriteLock()
+        lock.acquireRead()
+        lock.acquireRead()
+        acquired = []
+        writer = threading.Thread(target=lambda: (lock.acquireWrite(), acquired.append(1), lock.releaseWrite()))
+        writer.start()
+        writer.join(0.1)
+        # the writer waits for both readers
+        self.assertEqual([], acquired)
+        lock.releaseRead()
+        lock.releaseRead()
+        writer.join()
+        self.assertEqual([1], acquired)
+
+    def test_concurrentReadsAndWrites(self):
+        # every state of the list is a decreasing run of consecutive numbers
+        n = 200
+        for reversed_ in [False, True]:
+            lst = AVLTreeList.from_iterable(range(n)) if reversed_ else AVLTreeList.from_iterable(range(n - 1, -1, -1))
+            if reversed_:
+                # the first read of a list with pending reversals pushes them down
+                lst.reverse(0, n)
+            tree = ConcurrentAVLTreeList(lst)
+            errors = []
+
+            def write():
+                for top in range(n, n + 300):
+                    tree.insert(0, top)
+                    tree.delete(tree.length() - 1)
+
+            def read():
+                for step in range(50):
+                    values = list(tree)
+                    if values != list(range(values[0], values[0] - len(values), -1)):
+                        errors.append(values)
+                    value = tree.retrieve(step)
+                    if not isinstance(value, int):
+                        errors.append(value)
+
+            threads = [threading.Thread(target=write)] + [threading.Thread(target=read) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual([], errors)
+            self.assertEqual(list(range(n + 299, 299, -1)), tree.listToArray())
+            self.assertTrue(isValidAVLTreeList(tree.lst))
+
+    if __name__ == "__main__":
+        unittest.main()
@@ -1,6 +1,6 @@
 import unittest
 import AVLTreeList as file
-from AVLTreeList import AVLNode
+from AVLTreeList import AVLNode, AVLExtendedNode, VIRTUAL_NODE
 
 class Test_Node_AVL(unittest.TestCase):
     def test_getHeight_setHeight(self):
@@ -219,5 +219,33 @@ class Test_Node_AVL(unittest.TestCase):
         self.assertEqual(False, node.isLeaf())
         self.assertEqual(True, rson.isLeaf())
 
+    def test_virtualNode(self):
+        self.assertFalse(VIRTUAL_NODE.isRealNode())
+        self.assertEqual(-1, VIRTUAL_NODE.getHeight())
+        self.assertEqual(0, VIRTUAL_NODE.getSize())
+        self.assertEqual(None, VIRTUAL_NODE.getValue())
+        # the parent of the shared virtual node is ignored
+        VIRTUAL_NODE.setParent(AVLNode("parent"))
+        self.assertEqual(None, VIRTUAL_NODE.getParent())
+        with self.assertRaises(AttributeError):
+            VIRTUAL_NODE.setHeight(0)
+        with self.assertRaises(AttributeError):
+            VIRTUAL_NODE.size = 1
+
+    def test_slots(self):
+        node = AVLNode("3")
+        self.assertFalse(hasattr(node, "__dict__"))
+        with self.assertRaises(AttributeError):
+            node.color = "red"
+        # the optional fields are slots of AVLExtendedNode only, and read as None on a plain node
+        self.assertIsNone(node.agg)
+        self.assertIsNone(node.owner)
+        with self.assertRaises(AttributeError):
+            node.agg = 3
+        extended = AVLExtendedNode("3")
+        self.assertFalse(hasattr(extended, "__dict__"))
+        extended.agg = 3
+        self.assertEqual(3, extended.agg)
+
     if __name__ == "__main__":
         unittest.main()
@@ -0,0 +1,91 @@
+import random
+import unittest
+from PersistentAVLTreeList import PersistentAVLTreeList
+from utils.tester_utils import isValidPersistentAVLTreeList
+
+
+def treeNodes(tree):
+    nodes = set()
+    stack = [tree.root]
+    while stack:
+        node = stack.pop()
+        if node.isRealNode():
+            nodes.add(node)
+            stack.append(node.left)
+            stack.append(node.right)
+    return nodes
+
+
+class Test_Persistent_AVL_Tree_List(unittest.TestCase):
+    def test_empty(self):
+        tree = PersistentAVLTreeList()
+        self.assertTrue(tree.empty())
+        self.assertEqual(0, tree.length())
+        self.assertEqual(None, tree.getRoot())
+        self.assertEqual(None, tree.first())
+        self.assertEqual(None, tree.last())
+        self.assertEqual([], tree.listToArray())
+        self.assertEqual(-1, tree.search("a"))
+        self.assertIs(tree, tree.snapshot())
+
+    def test_versions(self):
+        random.seed(18)
+        versions = [(PersistentAVLTreeList(), [])]
+        for step in range(1500):
+            tree, values = random.choice(versions[-20:])
+            values = list(values)
+            op = random.random()
+            if op < 0.45 or not values:
+                i = random.randint(0, len(values))
+                tree = tree.insert(i, step)
+                values.insert(i, step)
+            elif op < 0.75:
+                i = random.randrange(len(values))
+                tree = tree.delete(i)
+                del values[i]
+            else:
+                i = random.randrange(len(values))
+                left, val, right = tree.split(i)
+                self.assertEqual(values[i], val)
+                self.assertEqual(values[:i], left.listToArray())
+                self.assertEqual(values[i + 1:], right.listToArray())
+                tree = left.insert(left.length(), val).concat(right)
+            self.assertTrue(isValidPersistentAVLTreeList(tree))
+            versions.append((tree, values))
+        # every version still holds its own items
+        for tree, values in versions:
+            self.assertEqual(values, tree.listToArray())
+            if values:
+                self.assertEqual(values[0], tree.first())
+                self.assertEqual(values[-1], tree.last())
+                i = random.randrange(len(values))
+                self.assertEqual(values[i], tree.retrieve(i))
+                self.assertEqual(values.index(values[i]), tree.search(values[i]))
+
+    def test_pathCopying(self):
+        n = 2 ** 12
+        tree = PersistentAVLTreeList.fromList(list(range(n)))
+        self.assertTrue(isValidPersistentAVLTreeList(tree))
+        nodes = treeNodes(tree)
+        # an update creates O(logn) nodes and shares all the others with the previous version
+        for update in [tree.insert(1000, "x"), tree.delete(1000), tree.split(1000)[0],
+                       tree.concat(PersistentAVLTreeList.fromList(["y"] * 100))]:
+            self.assertTrue(isValidPersistentAVLTreeList(update))
+            self.assertLessEqual(len(treeNodes(update) - nodes), 4 * 12 + 100)
+        self.assertEqual(list(range(n)), tree.listToArray())
+
+    def test_concat(self):
+        random.seed(19)
+        for step in range(200):
+            values1 = list(range(random.randrange(100)))
+            values2 = list(range(100, 100 + random.randrange(300)))
+            tree1 = PersistentAVLTreeList.fromList(values1)
+            tree2 = PersistentAVLTreeList.fromList(values2)
+            joined = tree1.concat(tree2)
+            self.assertTrue(isValidPersistentAVLTreeList(joined))
+            self.assertEqual(values1 + values2, joined.listToArray())
+            self.assertEqual(values1, tree1.listToArray())
+            self.assertEqual(values2, tree2.listToArray())
+
+    if __name__ == "__main__":
+        unittest.main()
@@ -0,0 +1,7 @@
+"""Benchmarks of the AVL tree lists
+
+Every module is run from the root of the repository with python -m benchmarks.<module>,
+or as a script (python benchmarks/<module>.py) from any directory.
+benchmarks.suite is the reproducible suite of the list operations, with JSON output for comparing commits,
+the other modules compare a single optimization with the implementation it replaced.
+"""
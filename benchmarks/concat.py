@@ -0,0 +1,53 @@
+"""Benchmark of concatenating many mid-size AVLTreeLists
+
+Compares concat with the former implementation, which deleted the last node of self with a full delete
+and joined through AVLTreeList.join (allocating a new list for the result).
+
+Run from the root of the repository, or as a script (python benchmarks/concat.py) from any directory:
+    python -m benchmarks.concat [number of lists, default 2000] [size of a list, default 500]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from AVLTreeList import AVLTreeList
+
+
+def deleteJoinConcat(self, lst):
+    """the concat of AVLTreeList before it detached the connector in place"""
+    if lst.empty():
+        return
+    if self.empty():
+        self.adoptList(lst)
+        return
+    x = self.get_Last()
+    self.pushDownPath(x)
+    self.deleteNode(x)
+    joinedTree = AVLTreeList.join(self, x, lst)[0]
+    self.adoptList(joinedTree)
+
+
+def timeConcats(concat, count, size):
+    lists = [AVLTreeList.from_iterable(range(size)) for _ in range(count)]
+    start = time.perf_counter()
+    result = lists[0]
+    for lst in lists[1:]:
+        concat(result, lst)
+    elapsed = time.perf_counter() - start
+    assert result.length() == count * size
+    return elapsed
+
+
+def main(count=2000, size=500):
+    print("%d lists of %d items" % (count, size))
+    before = timeConcats(deleteJoinConcat, count, size)
+    after = timeConcats(AVLTreeList.concat, count, size)
+    print("%22s %14s %14s" % ("", "total [ms]", "concats/s"))
+    print("%22s %14.1f %14.0f" % ("delete + join", before * 1e3, (count - 1) / before))
+    print("%22s %14.1f %14.0f" % ("in place", after * 1e3, (count - 1) / after))
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:3]])
@@ -0,0 +1,67 @@
+"""Benchmark of the read throughput of ConcurrentAVLTreeList as the number of reader threads grows
+
+Every reader thread does the same number of random retrieves, optionally while a writer thread keeps
+inserting and deleting. On a CPython build with the GIL the throughput can not grow with the threads,
+on a free-threaded build (python3.13t and later) the readers run in parallel under the read lock.
+
+Run from the root of the repository, or as a script (python benchmarks/concurrency.py) from any directory:
+    python -m benchmarks.concurrency [maximal number of threads, default 8] [size of the list, default 100000]
+"""
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from AVLTreeList import AVLTreeList
+from ConcurrentAVLTreeList import ConcurrentAVLTreeList
+
+
+def timeReaders(tree, threadCount, reads, withWriter):
+    n = tree.length()
+    done = threading.Event()
+
+    def read(seed):
+        rnd = random.Random(seed)
+        for _ in range(reads):
+            tree.retrieve(rnd.randrange(n))
+
+    def write():
+        while not done.is_set():
+            tree.insert(0, -1)
+            tree.delete(0)
+
+    readers = [threading.Thread(target=read, args=(seed,)) for seed in range(threadCount)]
+    writer = threading.Thread(target=write) if withWriter else None
+    if writer is not None:
+        writer.start()
+    start = time.perf_counter()
+    for thread in readers:
+        thread.start()
+    for thread in readers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    done.set()
+    if writer is not None:
+        writer.join()
+    return threadCount * reads / elapsed
+
+
+def main(maxThreads=8, size=100000, reads=50000):
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print("python %s, GIL %s, %d items, %d retrieves per thread"
+          % (sys.version.split()[0], "enabled" if gil else "disabled", size, reads))
+    tree = ConcurrentAVLTreeList(AVLTreeList.from_iterable(range(size)))
+    print("%8s %18s %18s" % ("threads", "reads/s", "reads/s + writer"))
+    threadCount = 1
+    while threadCount <= maxThreads:
+        alone = timeReaders(tree, threadCount, reads, False)
+        withWriter = timeReaders(tree, threadCount, reads, True)
+        print("%8d %18.0f %18.0f" % (threadCount, alone, withWriter))
+        threadCount *= 2
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:3]])
@@ -0,0 +1,106 @@
+"""Memory per element of AVLTreeList
+
+Compares the current node layout (__slots__ nodes sharing a single virtual node) with the
+previous layout, in which every node had a __dict__ and every insert allocated the node
+together with two virtual sons of its own, and with the columnar ArrayAVLTreeList engine.
+The extended layout is the one of the lists that maintain an aggregate (or share nodes with
+a fork), whose nodes have 2 more slots (AVLExtendedNode).
+
+Run from the root of the repository, or as a script (python benchmarks/memory.py) from any directory:
+    python -m benchmarks.memory
+"""
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from AVLTreeList import AVLTreeList, AVLAggregate
+from ArrayAVLTreeList import ArrayAVLTreeList
+
+
+"""The node layout AVLTreeList used before AVLNode had __slots__"""
+
+
+class DictAVLNode(object):
+    def __init__(self, value):
+        self.value = value
+        self.left = None
+        self.right = None
+        self.parent = None
+        self.size = 0
+        self.height = -1
+
+
+"""allocates an element per value the way insert used to: a real node and 2 virtual sons per element
+
+@rtype: list
+@returns: the allocated nodes, so they stay alive while memory is measured
+"""
+
+
+def allocateDictLayout(values):
+    nodes = []
+    for value in values:
+        node = DictAVLNode(value)
+        virtualL = DictAVLNode("")
+        virtualR = DictAVLNode("")
+        node.left, node.right = virtualL, virtualR
+        virtualL.parent = virtualR.parent = node
+        nodes.append(node)
+    return nodes
+
+
+def allocateSlotsLayout(values):
+    tree = AVLTreeList()
+    for i in range(len(values)):
+        tree.insert(i, values[i])
+    return tree
+
+
+def allocateExtendedLayout(values):
+    # an aggregate that is always None, so only the nodes are measured
+    tree = AVLTreeList(aggregator=AVLAggregate(lambda a, b: None, None, lift=lambda value: None))
+    for i in range(len(values)):
+        tree.insert(i, values[i])
+    return tree
+
+
+def allocateArrayLayout(values):
+    tree = ArrayAVLTreeList()
+    for i in range(len(values)):
+        tree.insert(i, values[i])
+    return tree
+
+
+"""returns the number of bytes allocated per element by allocate(values) for n values
+
+The element values (the strings) are allocated in both layouts, so they are allocated
+before measuring and are not part of the result.
+"""
+
+
+def bytesPerElement(allocate, n):
+    values = [str(i) for i in range(n)]
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = allocate(values)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept, values
+    return (after - before) / n
+
+
+def main(sizes=(10 ** 3, 10 ** 4, 10 ** 5)):
+    print("%10s %22s %22s %25s %22s" % ("n", "dict layout [B/elem]", "slots layout [B/elem]",
+                                        "extended layout [B/elem]", "array layout [B/elem]"))
+    for n in sizes:
+        dictBytes = bytesPerElement(allocateDictLayout, n)
+        slotsBytes = bytesPerElement(allocateSlotsLayout, n)
+        extendedBytes = bytesPerElement(allocateExtendedLayout, n)
+        arrayBytes = bytesPerElement(allocateArrayLayout, n)
+        print("%10d %22.1f %22.1f %25.1f %22.1f" % (n, dictBytes, slotsBytes, extendedBytes, arrayBytes))
+
+
+if __name__ == "__main__":
+    main()
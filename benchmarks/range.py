@@ -0,0 +1,36 @@
+"""Benchmark of extracting the items [i, j) of an AVLTreeList
+
+Compares list(tree.range(i, j)) with k = j - i separate retrieve calls (O(k logn))
+and with slicing the result of listToArray (O(n)).
+
+Run from the root of the repository, or as a script (python benchmarks/range.py) from any directory:
+    python -m benchmarks.range [n, default 10^5]
+"""
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from AVLTreeList import AVLTreeList
+
+
+def main(n=10 ** 5, seed=0):
+    random.seed(seed)
+    tree = AVLTreeList.from_iterable(range(n))
+    print("n = %d" % n)
+    print("%10s %18s %18s %18s" % ("k", "retrieve [ms]", "listToArray [ms]", "range [ms]"))
+    k = 10
+    while k <= n:
+        i = random.randrange(n - k + 1)
+        j = i + k
+        retrieves = min(timeit.repeat(lambda: [tree.retrieve(index) for index in range(i, j)], number=1, repeat=3))
+        listToArray = min(timeit.repeat(lambda: tree.listToArray()[i:j], number=1, repeat=3))
+        rangeTime = min(timeit.repeat(lambda: list(tree.range(i, j)), number=1, repeat=3))
+        print("%10d %18.3f %18.3f %18.3f" % (k, retrieves * 1e3, listToArray * 1e3, rangeTime * 1e3))
+        k *= 10
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 5)
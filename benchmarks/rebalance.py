@@ -0,0 +1,76 @@
+"""Benchmark of the rebalancing done by AVLTreeList.insert and delete
+
+Compares reBalance with the former version, which recomputed the balance factor, the height and the size
+of every ancestor up to the root, even after the heights stopped changing. The rebalance counts returned
+by both versions are checked to be identical.
+
+Run from the root of the repository, or as a script (python benchmarks/rebalance.py) from any directory:
+    python -m benchmarks.rebalance [maximal power of 10, default 6]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from AVLTreeList import AVLTreeList
+
+
+def fullClimbReBalance(tree, node):
+    """the reBalance of AVLTreeList before it stopped climbing once the heights did not change"""
+    balanceOps = 0
+    while node is not None:
+        balanceFactor = node.getBalanceFactor()
+        height = node.getHeight()
+        if abs(balanceFactor) == 2:
+            balanceOps += tree.rotate(node, balanceFactor)
+            node = node.getParent()
+        elif abs(balanceFactor) < 2:
+            node.recomputeHeight()
+            tree.recomputeNode(node)
+            if node.getHeight() != height:
+                balanceOps += 1
+        node = node.getParent()
+    return balanceOps
+
+
+def timeOperations(tree, ops):
+    balanceOps = []
+    start = time.perf_counter()
+    for i, val in ops:
+        if val is None:
+            balanceOps.append(tree.delete(i))
+        else:
+            balanceOps.append(tree.insert(i, val))
+    return time.perf_counter() - start, balanceOps
+
+
+def main(maxPower=6, operations=100000, seed=0):
+    print("%10s %22s %22s %8s" % ("n", "full climb [us/op]", "size-only [us/op]", "speedup"))
+    for power in range(3, maxPower + 1):
+        n = 10 ** power
+        rnd = random.Random(seed)
+        ops = []
+        length = n
+        for step in range(operations):
+            # alternate inserts and deletes so the size stays around n
+            if step % 2:
+                ops.append((rnd.randrange(length), None))
+                length -= 1
+            else:
+                ops.append((rnd.randint(0, length), step))
+                length += 1
+
+        before = AVLTreeList.from_iterable(range(n))
+        before.reBalance = lambda node: fullClimbReBalance(before, node)
+        after = AVLTreeList.from_iterable(range(n))
+        beforeTime, beforeOps = timeOperations(before, ops)
+        afterTime, afterOps = timeOperations(after, ops)
+        assert beforeOps == afterOps
+        print("%10d %22.2f %22.2f %8.2f" % (n, beforeTime / operations * 1e6, afterTime / operations * 1e6,
+                                           beforeTime / afterTime))
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:2]])
@@ -0,0 +1,52 @@
+"""Micro benchmark of AVLTreeList.retrieve
+
+Compares the iterative retrieve with the previous implementation, which defined a nested
+recursive closure on every call.
+
+Run from the root of the repository, or as a script (python benchmarks/retrieve.py) from any directory:
+    python -m benchmarks.retrieve [maximal power of 10, default 6]
+"""
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from AVLTreeList import AVLTreeList
+
+
+"""The previous retrieve: a new closure per call and a recursive call per level of the tree"""
+
+
+def recursiveRetrieve(tree, i):
+    root = tree.getRoot()
+
+    def retrieveRec(node, j):
+        loc = node.left.size + 1
+
+        if loc == j:
+            return node.getValue()
+        elif j < loc:
+            return retrieveRec(node.left, j)
+        else:
+            return retrieveRec(node.right, j - loc)
+
+    return retrieveRec(root, i + 1)
+
+
+def main(maxPower=6, lookups=100000, seed=0):
+    random.seed(seed)
+    print("%10s %20s %20s %8s" % ("n", "recursive [ns/call]", "iterative [ns/call]", "speedup"))
+    for power in range(3, maxPower + 1):
+        n = 10 ** power
+        tree = AVLTreeList.from_iterable(range(n))
+        indices = [random.randrange(n) for _ in range(lookups)]
+        recursive = min(timeit.repeat(lambda: [recursiveRetrieve(tree, i) for i in indices], number=1, repeat=3))
+        iterative = min(timeit.repeat(lambda: [tree.retrieve(i) for i in indices], number=1, repeat=3))
+        print("%10d %20.0f %20.0f %8.2f" % (n, recursive / lookups * 1e9, iterative / lookups * 1e9,
+                                           recursive / iterative))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 6)
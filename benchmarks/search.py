@@ -0,0 +1,44 @@
+"""Benchmark of searching an AVLTreeList without a value index
+
+Compares the streaming search with the former implementation, which copied the whole list
+with listToArray before scanning it, for a match near the front, a match in the middle and a missing value.
+
+Run from the root of the repository, or as a script (python benchmarks/search.py) from any directory:
+    python -m benchmarks.search [n, default 10^5]
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from AVLTreeList import AVLTreeList
+
+
+def listToArraySearch(tree, val):
+    """the search of AVLTreeList before it streamed the nodes"""
+    if tree.empty():
+        return -1
+    if tree.first() == val:
+        return 0
+    i = 0
+    for x in tree.listToArray():
+        if x == val:
+            return i
+        i += 1
+    return -1
+
+
+def main(n=10 ** 5):
+    tree = AVLTreeList.from_iterable(range(n))
+    print("n = %d" % n)
+    print("%10s %20s %20s" % ("case", "listToArray [ms]", "streaming [ms]"))
+    for case, val in [("front", 10), ("middle", n // 2), ("absent", -1)]:
+        assert listToArraySearch(tree, val) == tree.search(val)
+        before = min(timeit.repeat(lambda: listToArraySearch(tree, val), number=1, repeat=5))
+        after = min(timeit.repeat(lambda: tree.search(val), number=1, repeat=5))
+        print("%10s %20.3f %20.3f" % (case, before * 1e3, after * 1e3))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 5)
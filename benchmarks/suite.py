@@ -0,0 +1,220 @@
+"""Reproducible benchmark suite of AVLTreeList
+
+Runs insert, delete, retrieve, search, split, concat and listToArray on lists of 10^3 to 10^maxPower
+items, with fixed seeds, so two runs do the same operations at the same indices. Every operation is run
+twice on a fresh list: once timed (wall clock), and once counted, with the operation statistics of the
+list enabled [see AVLTreeList.enable_stats], which is how the rotations by kind and the other counts are
+reported. The counts are deterministic, so a change in them between two commits is a change in behavior,
+while the times are compared with a tolerance.
+
+The results are printed as a table, and written as JSON with --output. A run compared to a former
+JSON output with --compare exits with status 1 if an operation got slower than the tolerance allows.
+
+Run from the root of the repository, or as a script (python benchmarks/suite.py) from any directory:
+    python -m benchmarks.suite [--max-power 5] [--operations 1000] [--seed 0] [--output results.json]
+                               [--compare baseline.json] [--tolerance 0.2]
+Lists of 10^7 items (--max-power 7) take a few GB of memory and several minutes to build.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+# the root of the repository
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from AVLTreeList import AVLTreeList
+
+
+ROTATIONS = ('rightRotation', 'leftRotation', 'leftThenRightRotation', 'rightThenLeftRotation')
+
+
+def insertArgs(rnd, n, ops):
+    return [(rnd.randint(0, n + k), k) for k in range(ops)]
+
+
+def insertRun(tree, args):
+    start = time.perf_counter()
+    for i, val in args:
+        tree.insert(i, val)
+    return time.perf_counter() - start
+
+
+def deleteArgs(rnd, n, ops):
+    return [rnd.randrange(n - k) for k in range(min(ops, n // 2))]
+
+
+def deleteRun(tree, args):
+    start = time.perf_counter()
+    for i in args:
+        tree.delete(i)
+    return time.perf_counter() - start
+
+
+def retrieveArgs(rnd, n, ops):
+    return [rnd.randrange(n) for _ in range(ops)]
+
+
+def retrieveRun(tree, args):
+    start = time.perf_counter()
+    for i in args:
+        tree.retrieve(i)
+    return time.perf_counter() - start
+
+
+def linearArgs(rnd, n, ops):
+    """the operations that scan the list are repeated less as n grows, so every size takes about as long"""
+    return [rnd.randrange(n) for _ in range(max(1, min(ops, ops * 1000 // n)))]
+
+
+def searchRun(tree, args):
+    start = time.perf_counter()
+    for val in args:
+        tree.search(val)
+    return time.perf_counter() - start
+
+
+def listToArrayRun(tree, args):
+    start = time.perf_counter()
+    for _ in args:
+        tree.listToArray()
+    return time.perf_counter() - start
+
+
+def splitRun(tree, args):
+    """splits the list at every index, and restores it (untimed) before the next split"""
+    elapsed = 0
+    for i in args:
+        start = time.perf_counter()
+        left, val, right = tree.split(i)
+        elapsed += time.perf_counter() - start
+        left.insert(left.length(), val)
+        left.concat(right)
+        tree = left
+    return elapsed
+
+
+def concatRun(tree, args):
+    """splits the list (untimed) at every index, and concatenates the parts back"""
+    elapsed = 0
+    for i in args:
+        left, val, right = tree.split(i)
+        left.insert(left.length(), val)
+        start = time.perf_counter()
+        left.concat(right)
+        elapsed += time.perf_counter() - start
+        tree = left
+    return elapsed
+
+
+"""The benchmarked operations: name, arguments generator (random, n, operations) and runner (list, arguments)"""
+WORKLOADS = [
+    ('insert', insertArgs, insertRun),
+    ('delete', deleteArgs, deleteRun),
+    ('retrieve', retrieveArgs, retrieveRun),
+    ('search', linearArgs, searchRun),
+    ('split', retrieveArgs, splitRun),
+    ('concat', retrieveArgs, concatRun),
+    ('listToArray', linearArgs, listToArrayRun),
+]
+
+
+def runWorkload(name, makeArgs, run, n, operations, seed):
+    # the seed depends on the operation and the size only, so a workload can be rerun on its own
+    rnd = random.Random("%s/%d/%d" % (name, n, seed))
+    args = makeArgs(rnd, n, operations)
+
+    seconds = run(AVLTreeList.from_iterable(range(n)), args)
+
+    tree = AVLTreeList.from_iterable(range(n))
+    stats = tree.enable_stats()
+    run(tree, args)
+    counts = stats.report().get(name, {})
+    return {
+        'operation': name,
+        'n': n,
+        'operations': len(args),
+        'seconds': seconds,
+        'usPerOperation': seconds / len(args) * 1e6,
+        'rotations': sum(counts.get(kind, 0) for kind in ROTATIONS),
+        'counts': counts,
+    }
+
+
+def gitCommit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=ROOT, stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def runSuite(maxPower=5, operations=1000, seed=0, names=None):
+    results = []
+    for power in range(3, maxPower + 1):
+        for name, makeArgs, run in WORKLOADS:
+            if names is None or name in names:
+                results.append(runWorkload(name, makeArgs, run, 10 ** power, operations, seed))
+    return {
+        'commit': gitCommit(),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'seed': seed,
+        'operations': operations,
+        'results': results,
+    }
+
+
+def compare(baseline, current, tolerance):
+    """prints the changes from a baseline run, and returns the number of operations that got slower"""
+    before = dict(((result['operation'], result['n']), result) for result in baseline['results'])
+    regressions = 0
+    print("compared to %s" % (baseline.get('commit') or "baseline"))
+    print("%12s %10s %10s %12s" % ("operation", "n", "time", "rotations"))
+    for result in current['results']:
+        old = before.get((result['operation'], result['n']))
+        if old is None:
+            continue
+        ratio = result['usPerOperation'] / old['usPerOperation'] if old['usPerOperation'] else 1.0
+        sameOps = old['operations'] == result['operations']
+        rotations = "%+d" % (result['rotations'] - old['rotations']) if sameOps else "n/a"
+        slower = ratio > 1 + tolerance
+        regressions += slower
+        print("%12s %10d %9.2fx %12s%s" % (result['operation'], result['n'], ratio, rotations,
+                                           "  REGRESSION" if slower else ""))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reproducible benchmark suite of AVLTreeList")
+    parser.add_argument('--max-power', type=int, default=5, help="largest list size is 10^max-power (3 to 7)")
+    parser.add_argument('--operations', type=int, default=1000, help="operations per workload and size")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--only', nargs='+', choices=[name for name, _, _ in WORKLOADS], help="workloads to run")
+    parser.add_argument('--output', help="file to write the results to, as JSON")
+    parser.add_argument('--compare', help="JSON results of a former run to compare to")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="allowed relative slowdown")
+    options = parser.parse_args(argv)
+
+    report = runSuite(options.max_power, options.operations, options.seed, options.only)
+    print("%12s %10s %8s %14s %10s" % ("operation", "n", "ops", "us/operation", "rotations"))
+    for result in report['results']:
+        print("%12s %10d %8d %14.2f %10d" % (result['operation'], result['n'], result['operations'],
+                                             result['usPerOperation'], result['rotations']))
+    if options.output:
+        with open(options.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    if options.compare:
+        with open(options.compare) as f:
+            baseline = json.load(f)
+        if compare(baseline, report, options.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
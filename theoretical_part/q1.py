@@ -1,7 +1,11 @@
-from AVLTreeList import AVLTreeList as AVLTreeList
+import os
 import random
 import sys
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import AVLTreeList
+
 
 def exp1():
     results = []
@@ -67,13 +71,14 @@ def exp3():
         results.append(cnt)
     return results
 
-f = open("/Users/orshemesh/DS_projects/resultsQ1.txt", 'w')
-
-res1 = exp1()
-res2 = exp2()
-res3 = exp3()
-for i in range(10):
-    f.write(str(res1[i])+","+str(res2[i])+","+str(res3[i])+"\n")
-
-f.close()
+if __name__ == "__main__":
+    # usage: python theoretical_part/q1.py [results file, default resultsQ1.txt]
+    random.seed(1)
+    path = sys.argv[1] if len(sys.argv) > 1 else "resultsQ1.txt"
+    res1 = exp1()
+    res2 = exp2()
+    res3 = exp3()
+    with open(path, 'w') as f:
+        for i in range(10):
+            f.write(str(res1[i])+","+str(res2[i])+","+str(res3[i])+"\n")
 
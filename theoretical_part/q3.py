@@ -1,30 +1,48 @@
 ########################################
-## Question 2 in the theoretical part ##
+## Question 3 in the theoretical part ##
 ########################################
-from AVLTreeList import AVLTreeList as AVLTreeList
-import math
+import argparse
+import os
 import random
-print("Results of the analysis:")
-for i in range(1,11):
-    ### each iteration represents a different size of the tree ####
-    tree1=AVLTreeList.AVLTreeList()
-    tree2=AVLTreeList.AVLTreeList()
-    for j in range(1000*(2**i)):
-        r=random.randrange(0, 1+j)
-        tree1.insert(r,r)
-        tree2.insert(r,r)
-    ##### Random split ####
-    r=random.randrange(0,tree1.length())
-    res1=tree1.splitExp(r)
-    avg1=res1[3]
-    max1=res1[4]
-    ##### Splitting the maximum node of the left son of the tree #####
-    res2=tree2.splitExp(tree2.getRoot().getLeft().getSize()-1)
-    avg2=res2[3]
-    max2=res2[4]
-    print("i = "+ str(i))
-    print("Maximum join cost of random splitted tree is: ",max1 )
-    print("Average join cost of random splitted tree is: ",avg1 )
-    print("Maximum join cost of split maximum of left sub-tree of the root: ",max2 )
-    print("Average join cost of split maximum of left sub-tree of the root: ",avg2 )
-    del tree1, tree2
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import AVLTreeList
+
+
+def main(maxI=10, seed=0):
+    random.seed(seed)
+    print("Results of the analysis:")
+    for i in range(1,maxI+1):
+        ### each iteration represents a different size of the tree ####
+        tree1=AVLTreeList.AVLTreeList()
+        tree2=AVLTreeList.AVLTreeList()
+        for j in range(1000*(2**i)):
+            r=random.randrange(0, 1+j)
+            tree1.insert(r,r)
+            tree2.insert(r,r)
+        ##### Random split ####
+        r=random.randrange(0,tree1.length())
+        res1=tree1.split(r, costReport=True)
+        avg1=res1[3]['averageCost']
+        max1=res1[3]['maxCost']
+        ##### Splitting the maximum node of the left son of the tree #####
+        res2=tree2.split(tree2.getRoot().getLeft().getSize()-1, costReport=True)
+        avg2=res2[3]['averageCost']
+        max2=res2[3]['maxCost']
+        print("i = "+ str(i))
+        print("Maximum join cost of random splitted tree is: ",max1 )
+        print("Average join cost of random splitted tree is: ",avg1 )
+        print("Maximum join cost of split maximum of left sub-tree of the root: ",max2 )
+        print("Average join cost of split maximum of left sub-tree of the root: ",avg2 )
+        del tree1, tree2
+
+
+if __name__ == "__main__":
+    # usage: python theoretical_part/q3.py [largest i, default 10] [--seed 0]
+    parser = argparse.ArgumentParser(description="Question 3 in the theoretical part")
+    parser.add_argument('maxI', type=int, nargs='?', default=10, help="largest i, the lists have 1000*2^i items")
+    parser.add_argument('--seed', type=int, default=0)
+    options = parser.parse_args()
+    main(options.maxI, options.seed)
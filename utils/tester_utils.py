@@ -1,6 +1,6 @@
 import math
 
-from AVLTreeList import AVLNode, AVLTreeList
+from AVLTreeList import AVLNode, AVLExtendedNode, AVLTreeList
 from utils.print_tree import printTreefinal
 
 
@@ -251,3 +251,132 @@ def treesEqual(tree1, tree2):
                                                                                    otherNode.getRight())
 
     return equalsRec(currentRoot, otherRoot)
+
+
+"""Checks that an AVLTreeList satisfies all of the AVL tree invariants
+For every real node: its size and height match its sons, its balance factor is in {-1, 0, 1}
+and its real sons point back to it. The root has no parent, and first/last point to the
+minimum/maximum of the tree (in list order, following the pending reversals of AVLNode.lazy).
+The nodes of a list with an aggregator are AVLExtendedNodes, which hold the aggregates.
+In a forked list, the parent pointers of the nodes that the list does not own are not checked (see AVLTreeList.fork).
+Only for testing, runs in O(n)
+
+@type tree: AVLTreeList
+@returns: True if tree is a valid AVLTreeList, False otherwise
+@rtype: boolean
+"""
+
+
+def isValidAVLTreeList(tree):
+    root = tree.getRoot()
+    if root is None or not root.isRealNode():
+        return tree.get_First() is None and tree.get_Last() is None
+    if root.getParent() is not None:
+        return False
+
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        left, right = node.getLeft(), node.getRight()
+        if node.getSize() != left.getSize() + right.getSize() + 1:
+            return False
+        if node.getHeight() != max(left.getHeight(), right.getHeight()) + 1:
+            return False
+        if abs(node.getBalanceFactor()) > 1:
+            return False
+        if tree.aggregator is not None and not isinstance(node, AVLExtendedNode):
+            return False
+        for son in (left, right):
+            if son.isRealNode():
+                if son.getParent() is not node and not (tree.shared and son.owner is not tree.owner):
+                    return False
+                stack.append(son)
+
+    return tree.get_First() is listEnd(root, True) and tree.get_Last() is listEnd(root, False)
+
+
+"""Returns the first or last node of a subtree in list order
+The sons of a node are in list order iff an even number of its ancestors have a pending reversal (AVLNode.lazy)
+
+@type root: AVLNode
+@type first: bool
+@param first: True for the first node, False for the last one
+@rtype: AVLNode
+"""
+
+
+def listEnd(root, first):
+    node, flipped = root, False
+    while True:
+        son = node.getLeft() if first != flipped else node.getRight()
+        if not son.isRealNode():
+            return node
+        flipped ^= node.lazy is not None and node.lazy[0]
+        node = son
+
+
+"""Checks that an ArrayAVLTreeList satisfies all of the AVL tree invariants, as isValidAVLTreeList
+Only for testing, runs in O(n)
+
+@type tree: ArrayAVLTreeList
+@returns: True if tree is a valid ArrayAVLTreeList, False otherwise
+@rtype: boolean
+"""
+
+
+def isValidArrayAVLTreeList(tree):
+    store = tree.store
+    if store.size[0] != 0 or store.height[0] != -1:
+        return False
+    root = tree.getRoot()
+    if root == 0:
+        return tree.first_node == 0 and tree.last_node == 0
+    if store.parent[root] != 0:
+        return False
+
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        left, right = store.left[node], store.right[node]
+        if store.size[node] != store.size[left] + store.size[right] + 1:
+            return False
+        if store.height[node] != max(store.height[left], store.height[right]) + 1:
+            return False
+        if abs(store.height[left] - store.height[right]) > 1:
+            return False
+        for son in (left, right):
+            if son:
+                if store.parent[son] != node:
+                    return False
+                stack.append(son)
+    return tree.first_node == tree.minimum(root) and tree.last_node == tree.maximum(root)
+
+
+"""Checks that a PersistentAVLTreeList satisfies the AVL tree invariants
+For every real node: its size and height match its sons and its balance factor is in {-1, 0, 1}.
+Only for testing, runs in O(n)
+
+@type tree: PersistentAVLTreeList
+@returns: True if tree is a valid PersistentAVLTreeList, False otherwise
+@rtype: boolean
+"""
+
+
+def isValidPersistentAVLTreeList(tree):
+    stack = [tree.root]
+    while stack:
+        node = stack.pop()
+        if not node.isRealNode():
+            if node.size != 0:
+                return False
+            continue
+        left, right = node.left, node.right
+        if node.size != left.size + right.size + 1:
+            return False
+        if node.height != max(left.height, right.height) + 1:
+            return False
+        if abs(left.height - right.height) > 1:
+            return False
+        stack.append(left)
+        stack.append(right)
+    return True